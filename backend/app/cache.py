@@ -0,0 +1,121 @@
+import time
+from collections import OrderedDict
+from collections.abc import Hashable, Iterable
+from dataclasses import dataclass
+
+from app.config import settings
+
+# Dashboard/ranking responses only change when a service writes, so entries
+# are tagged with the stores/keywords they were built from and dropped as soon
+# as one of those is written. The TTL only bounds staleness from writes made by
+# other processes, such as `app.worker` in COLLECT_MODE=queue, so it is
+# capped at CACHE_QUEUE_TTL_SECONDS in that mode.
+DASHBOARD_ALL_TAG = "dashboard:all"
+
+
+def store_tag(store_id: str) -> str:
+    return f"store:{store_id}"
+
+
+def keyword_tag(keyword_id: str) -> str:
+    return f"keyword:{keyword_id}"
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+    # Sets dropped because a tag was invalidated while the value was being read
+    stale_sets: int = 0
+
+
+class TTLCache:
+    """Bounded LRU cache with per-entry TTL and tag-based invalidation.
+
+    A read that overlaps a write could cache what it read before the write
+    landed, after the write's invalidation already ran. Callers take
+    `version()` before reading and pass it to `set`, which drops the value if
+    any of its tags was invalidated since.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._entries: OrderedDict[Hashable, tuple[float, object, frozenset[str]]] = OrderedDict()
+        self._tags: dict[str, set[Hashable]] = {}
+        # Bumped by every invalidate(); the value each tag was last invalidated
+        # at (one int per store/keyword ever written, so bounded by the data)
+        self._version = 0
+        self._invalidated_at: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> object | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+        expires_at, value, _ = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return value
+
+    def version(self) -> int:
+        return self._version
+
+    def set(self, key: Hashable, value: object, tags: Iterable[str] = (), version: int | None = None) -> None:
+        """Cache `value`; with `version`, only if none of `tags` was invalidated after it."""
+        tag_set = frozenset(tags)
+        if version is not None and any(self._invalidated_at.get(tag, 0) > version for tag in tag_set):
+            self.stats.stale_sets += 1
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.monotonic() + self.ttl, value, tag_set)
+        for tag in tag_set:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.maxsize:
+            self._remove(next(iter(self._entries)))
+            self.stats.evictions += 1
+
+    def invalidate(self, *tags: str) -> None:
+        """Drop every entry carrying any of `tags`."""
+        self._version += 1
+        for tag in tags:
+            self._invalidated_at[tag] = self._version
+            for key in list(self._tags.get(tag, ())):
+                self._remove(key)
+                self.stats.invalidations += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._tags.clear()
+
+    def _remove(self, key: Hashable) -> None:
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+response_cache = TTLCache(
+    maxsize=settings.CACHE_MAX_ENTRIES,
+    ttl=(
+        min(settings.CACHE_TTL_SECONDS, settings.CACHE_QUEUE_TTL_SECONDS)
+        if settings.COLLECT_MODE == "queue"
+        else settings.CACHE_TTL_SECONDS
+    ),
+)
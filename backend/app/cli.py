@@ -0,0 +1,113 @@
+"""Maintenance commands: python -m app.cli <command>."""
+
+import argparse
+import asyncio
+import logging
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from app.collector.archive import PageArchive
+from app.config import settings
+from app.deps import close_supabase, get_supabase
+from app.services import ranking_service, reparse_service
+
+logger = logging.getLogger(__name__)
+
+
+async def rebuild_latest_rank(args: argparse.Namespace) -> None:
+    """Recompute keyword_latest_rank from the full ranking_snapshots history."""
+    db = await get_supabase()
+    count = (await db.rpc("rebuild_keyword_latest_rank").execute()).data
+    logger.info("Rebuilt keyword_latest_rank for %s keywords", count)
+
+
+async def rebuild_daily_rollup(args: argparse.Namespace) -> None:
+    """Recompute ranking_daily from the full ranking_snapshots history."""
+    db = await get_supabase()
+    count = (await db.rpc("rebuild_ranking_daily").execute()).data
+    logger.info("Rebuilt ranking_daily with %s rows", count)
+
+
+async def maintain_snapshots(args: argparse.Namespace) -> None:
+    """Create upcoming snapshot partitions and apply the retention policy."""
+    db = await get_supabase()
+    await ranking_service.ensure_snapshot_partitions(db)
+    days = args.retention_days if args.retention_days is not None else settings.SNAPSHOT_RETENTION_DAYS
+    if days > 0:
+        dropped = await ranking_service.apply_snapshot_retention(db, days)
+        logger.info("Dropped %d snapshot partitions older than %d days", dropped, days)
+        pruned = await ranking_service.prune_serp_snapshots(db, days)
+        logger.info("Deleted %d SERP snapshots older than %d days", pruned, days)
+
+
+def _timestamp(value: str) -> datetime:
+    """ISO date or datetime; naive values are in SCHEDULER_TIMEZONE."""
+    at = datetime.fromisoformat(value)
+    return at if at.tzinfo else at.replace(tzinfo=ZoneInfo(settings.SCHEDULER_TIMEZONE))
+
+
+async def reparse_archive(args: argparse.Namespace) -> None:
+    """Re-parse archived pcmap pages into ranking_snapshots for a time range."""
+    archive_dir = args.archive_dir or settings.PAGE_ARCHIVE_DIR
+    if not archive_dir:
+        raise SystemExit("No archive: set PAGE_ARCHIVE_DIR or pass --archive-dir")
+    db = await get_supabase()
+    window = args.window_seconds or settings.COLLECT_INTERVAL_MINUTES * 30
+    stats = await reparse_service.reparse_archive(
+        db,
+        PageArchive(archive_dir),
+        args.start,
+        args.end,
+        window_seconds=window,
+        replace=args.replace,
+        processes=args.processes,
+        dry_run=args.dry_run,
+    )
+    logger.info("%s%s", "Dry run: " if args.dry_run else "", stats.summary())
+    if stats.deleted:
+        # Replaced snapshots are not subtracted from the rollups by triggers
+        await rebuild_daily_rollup(args)
+        await rebuild_latest_rank(args)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser(
+        "rebuild-latest-rank", help="backfill keyword_latest_rank from ranking_snapshots"
+    ).set_defaults(func=rebuild_latest_rank)
+    sub.add_parser(
+        "rebuild-daily-rollup", help="backfill ranking_daily from ranking_snapshots"
+    ).set_defaults(func=rebuild_daily_rollup)
+    maintain = sub.add_parser(
+        "maintain-snapshots", help="create future snapshot partitions and drop expired ones"
+    )
+    maintain.add_argument("--retention-days", type=int, default=None)
+    maintain.set_defaults(func=maintain_snapshots)
+    reparse = sub.add_parser(
+        "reparse-archive", help="re-parse archived pcmap pages into ranking_snapshots for a time range"
+    )
+    reparse.add_argument("--from", dest="start", type=_timestamp, required=True)
+    reparse.add_argument("--to", dest="end", type=_timestamp, required=True)
+    reparse.add_argument("--replace", action="store_true", help="replace overlapping snapshots, not only fill gaps")
+    reparse.add_argument("--window-seconds", type=int, default=None, help="default: half the collection interval")
+    reparse.add_argument("--processes", type=int, default=None)
+    reparse.add_argument("--archive-dir", default=None)
+    reparse.add_argument("--dry-run", action="store_true")
+    reparse.set_defaults(func=reparse_archive)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    asyncio.run(_run(args))
+
+
+async def _run(args: argparse.Namespace) -> None:
+    try:
+        await args.func(args)
+    finally:
+        await close_supabase()
+
+
+if __name__ == "__main__":
+    main()
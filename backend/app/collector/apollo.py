@@ -0,0 +1,98 @@
+"""pcmap __APOLLO_STATE__ parsing.
+
+Plain functions of the page HTML with only stdlib imports, so the parse pool
+can run them in worker processes. They return compact, picklable results
+instead of the full Apollo state.
+"""
+
+import json
+import re
+
+_APOLLO_STATE_RE = re.compile(r"window\.__APOLLO_STATE__\s*=\s*")
+_JSON_DECODER = json.JSONDecoder()
+
+# Fields of a list entry the collector reads; everything else stays in the worker.
+SEARCH_ENTRY_FIELDS = ("id", "visitorReviewCount", "blogCafeReviewCount")
+DETAIL_FIELDS = ("name", "category", "roadAddress", "address")
+
+
+class ApolloStateError(ValueError):
+    """The page assigns __APOLLO_STATE__ but the value is not valid JSON.
+
+    Raised rather than logged: in a parse pool worker the log would be lost,
+    so callers log it in the parent.
+    """
+
+
+def extract_state(html: str) -> dict | None:
+    """Extract window.__APOLLO_STATE__ JSON from the HTML page.
+
+    Decodes straight from the assignment offset with the C JSON scanner, which
+    stops at the end of the object, so the rest of the page is never walked
+    and braces inside JSON strings are handled correctly. Returns None when
+    the page has no Apollo state; raises ApolloStateError when it is corrupt.
+    """
+    m = _APOLLO_STATE_RE.search(html)
+    if not m:
+        return None
+    try:
+        state, _ = _JSON_DECODER.raw_decode(html, m.end())
+    except json.JSONDecodeError as e:
+        raise ApolloStateError(f"Failed to parse __APOLLO_STATE__ JSON: {e}") from None
+    return state if isinstance(state, dict) else None
+
+
+def ordered_refs(apollo: dict) -> list[str]:
+    """Apollo refs of the search result list, in rank order."""
+    for val in apollo.get("ROOT_QUERY", {}).values():
+        if isinstance(val, dict) and "items" in val:
+            items = val["items"]
+            if isinstance(items, list) and items:
+                first = items[0]
+                if isinstance(first, dict) and "RestaurantListSummary" in first.get("__ref", ""):
+                    return [item.get("__ref", "") for item in items if isinstance(item, dict)]
+    return []
+
+
+def parse_search_page(html: str) -> list[dict] | None:
+    """Result list of a pcmap list page, in rank order; None without Apollo state.
+
+    Each entry holds its `ref` plus SEARCH_ENTRY_FIELDS (an entry missing
+    from the state is just `{"ref": ref}`).
+    """
+    apollo = extract_state(html)
+    if apollo is None:
+        return None
+    entries = []
+    for ref in ordered_refs(apollo):
+        entry = apollo.get(ref)
+        compact = {"ref": ref}
+        if isinstance(entry, dict):
+            compact.update((field, entry[field]) for field in SEARCH_ENTRY_FIELDS if field in entry)
+        entries.append(compact)
+    return entries
+
+
+def parse_detail_page(html: str, place_id: str) -> dict | None:
+    """DETAIL_FIELDS of the place on a pcmap detail page.
+
+    Detail pages key the place as PlaceDetailBase:<id>; falls back to a scan
+    for any entry carrying this id in case the layout changes. Returns None
+    without Apollo state and an empty dict if the place is not in it.
+    """
+    apollo = extract_state(html)
+    if apollo is None:
+        return None
+    entry = apollo.get(f"PlaceDetailBase:{place_id}")
+    if not (isinstance(entry, dict) and entry.get("name")):
+        entry = next(
+            (
+                val
+                for val in apollo.values()
+                if isinstance(val, dict) and str(val.get("id")) == place_id and val.get("name")
+            ),
+            None,
+        )
+    if not entry:
+        return {}
+    return {field: entry.get(field) for field in DETAIL_FIELDS}
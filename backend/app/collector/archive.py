@@ -0,0 +1,120 @@
+import json
+import logging
+import os
+import threading
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from hashlib import sha256
+from pathlib import Path
+
+from app.collector.apollo import ApolloStateError, parse_search_page
+
+try:
+    import zstandard
+except ImportError:  # optional: pip install 'nplace-backend[archive]'
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "index.jsonl"
+BLOB_SUFFIX = ".html.zst"
+
+
+@dataclass
+class ArchivedPage:
+    at: datetime
+    kind: str
+    path: Path
+    keyword: str | None = None
+    start: int | None = None
+    place_id: str | None = None
+
+
+class PageArchive:
+    """zstd-compressed store of fetched pcmap pages, sharded by UTC day.
+
+    Layout under `root`:
+
+        YYYY/MM/DD/index.jsonl             one line per fetch, in fetch order
+        YYYY/MM/DD/ab/<sha256>.html.zst    page body, stored once per day
+
+    Blobs are content-addressed, so a page fetched unchanged many times a day
+    is kept once; the index still records every fetch. Blobs are written to a
+    temp file and renamed before their index line is appended, so readers
+    never see a line without its page.
+    """
+
+    def __init__(self, root: str | Path, level: int = 3) -> None:
+        if zstandard is None:
+            raise RuntimeError("PAGE_ARCHIVE_DIR requires zstandard (pip install 'nplace-backend[archive]')")
+        self.root = Path(root)
+        self._level = level
+        self._index_lock = threading.Lock()
+
+    def _day_dir(self, day: date) -> Path:
+        return self.root / f"{day:%Y}" / f"{day:%m}" / f"{day:%d}"
+
+    def store(self, html: str, kind: str, **meta: object) -> Path:
+        """Archive one fetched page; blocking, so call it in a thread."""
+        at = datetime.now(timezone.utc)
+        body = html.encode()
+        digest = sha256(body).hexdigest()
+        day_dir = self._day_dir(at.date())
+        path = day_dir / digest[:2] / f"{digest}{BLOB_SUFFIX}"
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(zstandard.ZstdCompressor(level=self._level).compress(body))
+            os.replace(tmp, path)
+
+        line = json.dumps({"at": at.isoformat(), "kind": kind, "sha256": digest, **meta}, ensure_ascii=False)
+        with self._index_lock, open(day_dir / INDEX_FILE, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+        return path
+
+    def iter_pages(self, start: datetime, end: datetime, kind: str | None = None) -> Iterator[ArchivedPage]:
+        """Index entries fetched in [start, end], day by day in fetch order."""
+        day = start.astimezone(timezone.utc).date()
+        last = end.astimezone(timezone.utc).date()
+        while day <= last:
+            day_dir = self._day_dir(day)
+            index = day_dir / INDEX_FILE
+            if index.exists():
+                with open(index, encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except json.JSONDecodeError:
+                            logger.warning("Skipping corrupt archive index line in %s", index)
+                            continue
+                        at = datetime.fromisoformat(entry["at"])
+                        if not start <= at <= end or (kind and entry["kind"] != kind):
+                            continue
+                        digest = entry["sha256"]
+                        yield ArchivedPage(
+                            at=at,
+                            kind=entry["kind"],
+                            path=day_dir / digest[:2] / f"{digest}{BLOB_SUFFIX}",
+                            keyword=entry.get("keyword"),
+                            start=entry.get("start"),
+                            place_id=entry.get("place_id"),
+                        )
+            day += timedelta(days=1)
+
+
+def read_page(path: str | Path) -> str:
+    with open(path, "rb") as f:
+        return zstandard.ZstdDecompressor().decompress(f.read()).decode()
+
+
+def parse_archived_search_page(path: str | Path) -> list[dict] | None:
+    """parse_search_page on an archived blob; runs in re-parse worker processes."""
+    try:
+        html = read_page(path)
+    except FileNotFoundError:
+        return None
+    try:
+        return parse_search_page(html)
+    except ApolloStateError:
+        return None
@@ -32,3 +32,13 @@ class BaseCollector(ABC):
     @abstractmethod
     async def find_store_rank(self, keyword: str, place_id: str) -> RankingResult | None:
         ...
+
+    @abstractmethod
+    async def find_store_ranks(
+        self,
+        keyword: str,
+        place_ids: set[str],
+        max_depth: int | None = None,
+        serp: list[RankingResult] | None = None,
+    ) -> dict[str, RankingResult | None]:
+        ...
@@ -0,0 +1,70 @@
+import time
+from collections import deque
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request while the circuit breaker is open."""
+
+    def __init__(self, retry_in: float) -> None:
+        super().__init__(f"Circuit open, retry in {retry_in:.0f}s")
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Stops requests to a source once its recent error rate spikes.
+
+    Opens when at least `error_rate` of the last `window` outcomes (and no fewer
+    than `min_requests`) failed. After `cooldown` seconds a single probe request
+    is let through: success closes the breaker, failure re-opens it.
+    """
+
+    def __init__(self, error_rate: float, min_requests: int, cooldown: float, window: int = 20) -> None:
+        self._error_rate = error_rate
+        self._min_requests = min_requests
+        self._cooldown = cooldown
+        self._outcomes: deque[bool] = deque(maxlen=max(window, min_requests))
+        self._opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    def retry_in(self) -> float:
+        if self._opened_at is None:
+            return 0.0
+        return max(0.0, self._opened_at + self._cooldown - time.monotonic())
+
+    def check(self) -> bool:
+        """Raise CircuitOpenError unless a request may be sent now.
+
+        Returns True when the caller's request is the half-open probe; it must
+        then either `record` an outcome or `cancel_probe`.
+        """
+        if self._opened_at is None:
+            return False
+        remaining = self.retry_in()
+        if remaining > 0 or self._probing:
+            raise CircuitOpenError(remaining or self._cooldown)
+        self._probing = True
+        return True
+
+    def cancel_probe(self) -> None:
+        """End a probe that produced no outcome; the next request probes again."""
+        self._probing = False
+
+    def record(self, ok: bool) -> None:
+        if self._probing:
+            self._probing = False
+            if ok:
+                self._opened_at = None
+                self._outcomes.clear()
+            else:
+                self._opened_at = time.monotonic()
+            return
+
+        self._outcomes.append(ok)
+        if self._opened_at is None and len(self._outcomes) >= self._min_requests:
+            failures = self._outcomes.count(False)
+            if failures / len(self._outcomes) >= self._error_rate:
+                self._opened_at = time.monotonic()
@@ -1,12 +1,22 @@
 import asyncio
-import json
 import logging
+import random
 import re
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 
 import httpx
 
+from app.collector.apollo import ApolloStateError, parse_detail_page, parse_search_page
+from app.collector.archive import PageArchive
 from app.collector.base import BaseCollector, RankingResult, StoreInfo
+from app.collector.circuit import CircuitBreaker
+from app.collector.parse_pool import ParsePool
+from app.collector.rate_limit import HostRateLimiter
 from app.config import settings
+from app.metrics import APOLLO_PARSE_SECONDS, PCMAP_FETCH_SECONDS
 
 logger = logging.getLogger(__name__)
 
@@ -30,49 +40,116 @@ SCRAPE_HEADERS = {
 
 REQUEST_DELAY = 1.5
 
+# Idle pooled connections are kept this long; Naver keeps them open for about
+# a minute, so consecutive keywords reuse the TLS session.
+KEEPALIVE_EXPIRY = 60.0
+
+# pcmap list pages hold this many places; deeper ranks need `start` paging.
+SEARCH_PAGE_SIZE = 50
+
+# Responses worth retrying; the throttling ones also slow the host down.
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+THROTTLE_STATUSES = {429, 503}
+
+# When set (e.g. by the scheduler's collection engine), every pcmap fetch
+# appends its latency in seconds to this list.
+fetch_timings: ContextVar[list[float] | None] = ContextVar("fetch_timings", default=None)
+
 _HTML_TAG_RE = re.compile(r"<[^>]+>")
-_APOLLO_STATE_RE = re.compile(r"window\.__APOLLO_STATE__\s*=\s*")
 
 
 def _strip_html(text: str) -> str:
     return _HTML_TAG_RE.sub("", text).strip()
 
 
-def _extract_apollo_state(html: str) -> dict | None:
-    """Extract window.__APOLLO_STATE__ JSON from the HTML page."""
-    m = _APOLLO_STATE_RE.search(html)
-    if not m:
+def _retry_after(response: httpx.Response) -> float | None:
+    """Seconds requested by a Retry-After header (delta-seconds or HTTP-date)."""
+    value = response.headers.get("Retry-After")
+    if not value:
         return None
-    start = m.end()
-    depth = 0
-    for i, ch in enumerate(html[start:], start):
-        if ch == "{":
-            depth += 1
-        elif ch == "}":
-            depth -= 1
-            if depth == 0:
-                try:
-                    return json.loads(html[start : i + 1])
-                except json.JSONDecodeError:
-                    logger.error("Failed to parse __APOLLO_STATE__ JSON")
-                    return None
-    return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def _backoff(attempt: int) -> float:
+    """Exponential backoff with full jitter for the given retry attempt."""
+    ceiling = min(settings.FETCH_BACKOFF_MAX_SECONDS, settings.FETCH_BACKOFF_SECONDS * 2**attempt)
+    return random.uniform(ceiling / 2, ceiling)
+
+
+def ranking_result(entry: dict, rank: int, total_results: int) -> RankingResult:
+    """RankingResult for a parse_search_page entry at `rank` (also used when re-parsing archived pages)."""
+    return RankingResult(
+        rank_position=rank,
+        total_results=total_results,
+        visitor_count=_safe_int(entry.get("visitorReviewCount")),
+        blog_review_count=_safe_int(entry.get("blogCafeReviewCount")),
+        place_id=str(entry.get("id", "")),
+    )
 
 
 class NaverMapCollector(BaseCollector):
     """Naver Map collector. Uses official API as primary, pcmap Apollo state as fallback."""
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport | None = None,
+        request_delay: float = REQUEST_DELAY,
+    ) -> None:
+        # `transport` lets benchmarks replay recorded responses (httpx.MockTransport).
+        self._transport = transport
         self._scrape_client: httpx.AsyncClient | None = None
         self._api_client: httpx.AsyncClient | None = None
+        self._rate_limiter = HostRateLimiter(
+            request_delay, settings.REQUEST_JITTER, max_delay=settings.FETCH_BACKOFF_MAX_SECONDS
+        )
+        # Shared by every pcmap fetch; the collection engine defers keywords
+        # while it is open instead of recording them as unranked.
+        self.circuit_breaker = CircuitBreaker(
+            settings.BREAKER_ERROR_RATE,
+            settings.BREAKER_MIN_REQUESTS,
+            settings.BREAKER_COOLDOWN_SECONDS,
+        )
+        self._parse_pool = ParsePool(settings.PARSE_PROCESSES, settings.PARSE_INLINE_MAX_KB * 1024)
+        # Raw pages kept for `python -m app.cli reparse-archive` after parser breakage.
+        self._archive = PageArchive(settings.PAGE_ARCHIVE_DIR) if settings.PAGE_ARCHIVE_DIR else None
+        # Pending archive writes; referenced so they are not garbage collected, drained by close()
+        self._archive_tasks: set[asyncio.Task] = set()
 
     @property
     def _has_api_keys(self) -> bool:
         return bool(settings.NAVER_CLIENT_ID and settings.NAVER_CLIENT_SECRET)
 
+    def _build_client(self, **kwargs) -> httpx.AsyncClient:
+        """HTTP/2 client with a keep-alive pool sized for COLLECT_CONCURRENCY.
+
+        HTTP/2 multiplexes concurrent fetches to a host over one connection;
+        gzip and (with the brotli extra installed) br responses are decoded
+        transparently.
+        """
+        return httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=settings.COLLECT_CONCURRENCY * 2,
+                max_keepalive_connections=settings.COLLECT_CONCURRENCY,
+                keepalive_expiry=KEEPALIVE_EXPIRY,
+            ),
+            transport=self._transport,
+            **kwargs,
+        )
+
     async def _get_api_client(self) -> httpx.AsyncClient:
         if self._api_client is None or self._api_client.is_closed:
-            self._api_client = httpx.AsyncClient(
+            self._api_client = self._build_client(
                 headers={
                     "X-Naver-Client-Id": settings.NAVER_CLIENT_ID,
                     "X-Naver-Client-Secret": settings.NAVER_CLIENT_SECRET,
@@ -83,18 +160,102 @@ class NaverMapCollector(BaseCollector):
 
     async def _get_scrape_client(self) -> httpx.AsyncClient:
         if self._scrape_client is None or self._scrape_client.is_closed:
-            self._scrape_client = httpx.AsyncClient(
+            self._scrape_client = self._build_client(
                 headers=SCRAPE_HEADERS,
                 timeout=httpx.Timeout(15.0),
                 follow_redirects=True,
             )
         return self._scrape_client
 
+    async def start(self) -> None:
+        """Create the HTTP clients and parse pool up front (the app and worker call this at startup).
+
+        Both are otherwise created on first use, which is what one-off
+        scripts and benchmarks rely on.
+        """
+        self._parse_pool.start()
+        await self._get_scrape_client()
+        if self._has_api_keys:
+            await self._get_api_client()
+
     async def _fetch_html(self, url: str, params: dict | None = None) -> str:
+        """GET a pcmap page, retrying transport errors, 429 and 5xx with backoff.
+
+        Raises CircuitOpenError without sending anything while the breaker is
+        open, and the last error once FETCH_MAX_RETRIES is exhausted.
+        """
         client = await self._get_scrape_client()
-        response = await client.get(url, params=params)
-        response.raise_for_status()
-        return response.text
+        attempt = 0
+        while True:
+            last_attempt = attempt >= settings.FETCH_MAX_RETRIES
+            probe = self.circuit_breaker.check()
+            # None until the request produced an outcome worth recording
+            ok: bool | None = None
+            try:
+                await self._rate_limiter.wait(url)
+                started = time.perf_counter()
+                try:
+                    response = await client.get(url, params=params)
+                except httpx.TransportError as e:
+                    PCMAP_FETCH_SECONDS.labels("error").observe(time.perf_counter() - started)
+                    ok = False
+                    if last_attempt:
+                        raise
+                    logger.warning("pcmap fetch failed (%s: %s), retrying", type(e).__name__, e)
+                    response = None
+                else:
+                    # Anything but a retryable status (including a 404 for an
+                    # unknown place) means the host is answering normally.
+                    ok = response.status_code not in RETRY_STATUSES
+            finally:
+                if ok is not None:
+                    self.circuit_breaker.record(ok)
+                elif probe:
+                    # Cancelled, or failed in a way that says nothing about
+                    # the host (redirect loop, bad encoding): don't leave the
+                    # breaker stuck half-open.
+                    self.circuit_breaker.cancel_probe()
+
+            if response is None:
+                await asyncio.sleep(_backoff(attempt))
+                attempt += 1
+                continue
+
+            elapsed = time.perf_counter() - started
+            PCMAP_FETCH_SECONDS.labels(str(response.status_code)).observe(elapsed)
+            timings = fetch_timings.get()
+            if timings is not None:
+                timings.append(elapsed)
+
+            if ok:
+                self._rate_limiter.record_success(url)
+                response.raise_for_status()
+                return response.text
+
+            retry_after = _retry_after(response)
+            if response.status_code in THROTTLE_STATUSES:
+                self._rate_limiter.record_throttle(url, retry_after)
+            if last_attempt or (retry_after or 0) > settings.FETCH_BACKOFF_MAX_SECONDS:
+                response.raise_for_status()
+            logger.warning("pcmap returned %d, retrying (attempt %d)", response.status_code, attempt + 1)
+            # The rate limiter already holds the host until Retry-After.
+            await asyncio.sleep(_backoff(attempt))
+            attempt += 1
+
+    def _archive_page(self, html: str, kind: str, **meta: object) -> None:
+        """Archive a fetched page in the background, off the collection path."""
+        if self._archive is None:
+            return
+        task = asyncio.create_task(self._store_page(html, kind, **meta))
+        self._archive_tasks.add(task)
+        task.add_done_callback(self._archive_tasks.discard)
+
+    async def _store_page(self, html: str, kind: str, **meta: object) -> None:
+        try:
+            await asyncio.to_thread(self._archive.store, html, kind, **meta)
+        except Exception:
+            # Archiving is best effort; never fail a collection over it
+            logger.exception("Failed to archive %s page", kind)
 
     # ------------------------------------------------------------------
     # Official API methods
@@ -109,6 +270,7 @@ class NaverMapCollector(BaseCollector):
         """
         display = min(display, NAVER_API_MAX_DISPLAY)
         client = await self._get_api_client()
+        await self._rate_limiter.wait(NAVER_API_URL)
         response = await client.get(
             NAVER_API_URL,
             params={"query": keyword, "display": display, "start": 1, "sort": "random"},
@@ -146,6 +308,7 @@ class NaverMapCollector(BaseCollector):
     async def _get_store_info_api(self, keyword: str) -> StoreInfo | None:
         """Try to get store info from official API by searching its name."""
         client = await self._get_api_client()
+        await self._rate_limiter.wait(NAVER_API_URL)
         response = await client.get(
             NAVER_API_URL,
             params={"query": keyword, "display": 1, "start": 1, "sort": "random"},
@@ -173,48 +336,36 @@ class NaverMapCollector(BaseCollector):
     # pcmap Apollo state parsing methods
     # ------------------------------------------------------------------
 
-    async def search_keyword_scrape(self, keyword: str, display: int = 50) -> list[RankingResult]:
-        """Search by parsing __APOLLO_STATE__ from pcmap.place.naver.com."""
-        logger.info("Fetching pcmap Apollo state for keyword: %s", keyword)
-        html = await self._fetch_html(SEARCH_URL, params={"query": keyword})
+    async def _search_page(self, keyword: str, start: int = 1) -> list[dict]:
+        """Fetch one pcmap list page; returns its compact result entries in rank order."""
+        logger.info("Fetching pcmap Apollo state for keyword: %s (start=%d)", keyword, start)
+        params = {"query": keyword}
+        if start > 1:
+            params.update(start=start, display=SEARCH_PAGE_SIZE)
+        html = await self._fetch_html(SEARCH_URL, params=params)
+        self._archive_page(html, "search", keyword=keyword, start=start)
 
-        apollo = _extract_apollo_state(html)
-        if not apollo:
+        try:
+            entries = await self._parse_pool.run(parse_search_page, html, timer=APOLLO_PARSE_SECONDS.labels("search"))
+        except ApolloStateError as e:
+            logger.error("%s (keyword: %s)", e, keyword)
+            entries = None
+        if entries is None:
             logger.warning("No __APOLLO_STATE__ found for keyword: %s", keyword)
             return []
-
-        # Get ordered item list from ROOT_QUERY
-        root_query = apollo.get("ROOT_QUERY", {})
-        ordered_refs: list[str] = []
-        for key, val in root_query.items():
-            if isinstance(val, dict) and "items" in val:
-                items = val["items"]
-                if isinstance(items, list) and items:
-                    first = items[0] if items else {}
-                    if isinstance(first, dict) and "RestaurantListSummary" in first.get("__ref", ""):
-                        ordered_refs = [item.get("__ref", "") for item in items if isinstance(item, dict)]
-                        break
-
-        if not ordered_refs:
+        if not entries:
             logger.warning("No ordered restaurant list found for keyword: %s", keyword)
-            return []
+        return entries
+
+    async def search_keyword_scrape(self, keyword: str, display: int = 50) -> list[RankingResult]:
+        """Search by parsing __APOLLO_STATE__ from pcmap.place.naver.com."""
+        entries = await self._search_page(keyword)
 
         results: list[RankingResult] = []
-        for rank, ref in enumerate(ordered_refs[:display], start=1):
-            entry = apollo.get(ref, {})
-            place_id = str(entry.get("id", ""))
-            if not place_id:
+        for rank, entry in enumerate(entries[:display], start=1):
+            if not entry.get("id"):
                 continue
-
-            results.append(
-                RankingResult(
-                    rank_position=rank,
-                    total_results=len(ordered_refs),
-                    visitor_count=_safe_int(entry.get("visitorReviewCount")),
-                    blog_review_count=_safe_int(entry.get("blogCafeReviewCount")),
-                    place_id=place_id,
-                )
-            )
+            results.append(ranking_result(entry, rank, len(entries)))
 
         logger.info("Apollo state returned %d results for keyword: %s", len(results), keyword)
         return results
@@ -226,19 +377,19 @@ class NaverMapCollector(BaseCollector):
         except httpx.HTTPStatusError as e:
             logger.error("Failed to fetch store info page: %s", e)
             return None
+        self._archive_page(html, "detail", place_id=place_id)
 
-        apollo = _extract_apollo_state(html)
-        if not apollo:
+        try:
+            entry = await self._parse_pool.run(
+                parse_detail_page, html, place_id, timer=APOLLO_PARSE_SECONDS.labels("detail")
+            )
+        except ApolloStateError as e:
+            logger.error("%s (place_id: %s)", e, place_id)
+            entry = None
+        if entry is None:
             logger.warning("No __APOLLO_STATE__ found for place_id: %s", place_id)
             return None
 
-        # Look for the entry matching this place_id
-        entry = None
-        for key, val in apollo.items():
-            if isinstance(val, dict) and str(val.get("id")) == place_id and val.get("name"):
-                entry = val
-                break
-
         if not entry:
             logger.warning("Could not find entry for place_id: %s in Apollo state", place_id)
             return None
@@ -288,22 +439,72 @@ class NaverMapCollector(BaseCollector):
         return info
 
     async def find_store_rank(self, keyword: str, place_id: str) -> RankingResult | None:
+        """Rank of one place; None means it is not in the results.
+
+        Fetch failures raise rather than returning None, so they are never
+        recorded as "not ranked".
+        """
         logger.info("Finding rank for place_id=%s, keyword=%s", place_id, keyword)
+        return (await self.find_store_ranks(keyword, {place_id}))[place_id]
+
+    async def find_store_ranks(
+        self,
+        keyword: str,
+        place_ids: set[str],
+        max_depth: int | None = None,
+        serp: list[RankingResult] | None = None,
+    ) -> dict[str, RankingResult | None]:
+        """Resolve ranks for several places from as few SERP fetches as possible.
+
+        Every store tracking the same keyword shares the pcmap requests. The
+        ordered refs are walked only until every place is found; further pages
+        are fetched only while some place is still missing and the walk is
+        shallower than `max_depth` (RANK_SEARCH_MAX_DEPTH by default). Places
+        not found map to None. A failed fetch raises.
+
+        When `serp` is given, every fetched page is walked in full and all of
+        its results are appended to it, in rank order. SERP capture only
+        finishes the page already fetched: no further page is requested once
+        every place is found, so it costs no extra requests.
+        """
+        max_depth = max_depth or settings.RANK_SEARCH_MAX_DEPTH
+        logger.info("Finding ranks for %d places, keyword=%s", len(place_ids), keyword)
+        ranks: dict[str, RankingResult | None] = dict.fromkeys(place_ids)
+        missing = set(place_ids)
+        seen: set[str] = set()
+        depth = 0
+
+        while missing and depth < max_depth:
+            entries = await self._search_page(keyword, start=depth + 1)
+            new_entries = [entry for entry in entries if entry["ref"] not in seen]
+            # A short page is the end of the list; a repeated one means the
+            # source ignored `start`.
+            for rank, entry in enumerate(new_entries[: max_depth - depth], start=depth + 1):
+                place_id = str(entry.get("id", ""))
+                if place_id in missing or (serp is not None and place_id):
+                    result = ranking_result(entry, rank, depth + len(entries))
+                    if serp is not None:
+                        serp.append(result)
+                    if place_id in missing:
+                        ranks[place_id] = result
+                        missing.discard(place_id)
+                        if not missing and serp is None:
+                            break
+            seen.update(entry["ref"] for entry in new_entries)
+            depth += len(new_entries)
+            if len(new_entries) < SEARCH_PAGE_SIZE:
+                break
 
-        # pcmap Apollo state gives full ranking with place_ids
-        try:
-            results = await self.search_keyword_scrape(keyword)
-            for result in results:
-                if result.place_id == place_id:
-                    logger.info("Found rank %d for place_id=%s", result.rank_position, place_id)
-                    return result
-            logger.info("Place %s not found in %d results for keyword: %s", place_id, len(results), keyword)
-            return None
-        except Exception:
-            logger.exception("pcmap search failed in find_store_rank for keyword: %s", keyword)
-            return None
+        logger.info(
+            "Found %d/%d places within rank %d for keyword: %s",
+            len(place_ids) - len(missing), len(place_ids), depth, keyword,
+        )
+        return ranks
 
     async def close(self) -> None:
+        if self._archive_tasks:
+            await asyncio.gather(*self._archive_tasks)
+        self._parse_pool.close()
         if self._api_client and not self._api_client.is_closed:
             await self._api_client.aclose()
         if self._scrape_client and not self._scrape_client.is_closed:
@@ -0,0 +1,95 @@
+import asyncio
+import logging
+import multiprocessing
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import TypeVar
+
+from prometheus_client import Histogram
+
+from app.metrics import PARSE_POOL_QUEUE_DEPTH, PARSE_POOL_WORKERS, PARSE_TASKS
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def _timed(fn: Callable[..., T], html: str, *args: object) -> tuple[T, float]:
+    """fn(html, *args) and its run time, measured where it runs (worker or inline)."""
+    started = time.perf_counter()
+    result = fn(html, *args)
+    return result, time.perf_counter() - started
+
+
+class ParsePool:
+    """Runs CPU-bound page parsing off the event loop in worker processes.
+
+    Pages shorter than `inline_max_chars` are parsed inline: shipping them to
+    a process costs more than the parse. With `processes=0` everything is
+    parsed inline. Functions must be picklable module-level functions (see
+    app.collector.apollo) returning compact results.
+
+    Workers are spawned rather than forked, so they never inherit the parent's
+    event loop, sockets or threads. The pool is created on first use (or by
+    `start`) and recreated if a worker dies. The page that was running is
+    retried once in the new pool; if it breaks that one too, BrokenProcessPool
+    is raised rather than parsing a page that may crash the process inline.
+    """
+
+    def __init__(self, processes: int, inline_max_chars: int) -> None:
+        self._processes = processes
+        self._inline_max_chars = inline_max_chars
+        self._executor: ProcessPoolExecutor | None = None
+
+    def start(self) -> None:
+        if self._processes > 0 and self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._processes, mp_context=multiprocessing.get_context("spawn")
+            )
+            PARSE_POOL_WORKERS.set(self._processes)
+
+    async def run(self, fn: Callable[..., T], html: str, *args: object, timer: Histogram | None = None) -> T:
+        """fn(html, *args); its parse time (not queueing or IPC) is observed on `timer`."""
+        if self._processes <= 0 or len(html) <= self._inline_max_chars:
+            PARSE_TASKS.labels("inline").inc()
+            result, seconds = _timed(fn, html, *args)
+        else:
+            PARSE_TASKS.labels("pool").inc()
+            PARSE_POOL_QUEUE_DEPTH.inc()
+            try:
+                result, seconds = await self._submit(fn, html, *args)
+            finally:
+                PARSE_POOL_QUEUE_DEPTH.dec()
+        if timer is not None:
+            timer.observe(seconds)
+        return result
+
+    async def _submit(self, fn: Callable[..., T], html: str, *args: object) -> tuple[T, float]:
+        try:
+            return await self._in_pool(fn, html, *args)
+        except BrokenProcessPool:
+            logger.exception("Parse pool broke, restarting it and retrying the page")
+        try:
+            return await self._in_pool(fn, html, *args)
+        except BrokenProcessPool:
+            logger.error("Parse pool broke again on the same page, dropping it")
+            raise
+
+    async def _in_pool(self, fn: Callable[..., T], html: str, *args: object) -> tuple[T, float]:
+        self.start()
+        executor = self._executor
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, _timed, fn, html, *args)
+        except BrokenProcessPool:
+            if self._executor is executor:
+                self._executor = None
+                executor.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            PARSE_POOL_WORKERS.set(0)
@@ -0,0 +1,63 @@
+import asyncio
+import random
+import time
+
+import httpx
+
+
+class HostRateLimiter:
+    """Spaces out requests to the same host by an adaptive delay plus random jitter.
+
+    Each caller reserves the next free slot for its host and sleeps until it,
+    so any number of concurrent tasks still hit a host at most once per delay.
+
+    The per-host delay follows AIMD on the request rate: a throttled response
+    doubles it (up to `max_delay`), each success shrinks it by `recovery`
+    until it is back at the configured `delay`. A Retry-After also holds the
+    host's next slot until that time.
+    """
+
+    def __init__(
+        self,
+        delay: float,
+        jitter: float = 0.0,
+        max_delay: float = 60.0,
+        recovery: float | None = None,
+    ) -> None:
+        self._delay = delay
+        self._jitter = jitter
+        self._max_delay = max(max_delay, delay)
+        self._recovery = recovery if recovery is not None else max(delay / 10, 0.05)
+        self._next_slot: dict[str, float] = {}
+        self._host_delay: dict[str, float] = {}
+
+    def delay(self, url: str) -> float:
+        return self._host_delay.get(httpx.URL(url).host, self._delay)
+
+    async def wait(self, url: str) -> None:
+        host = httpx.URL(url).host
+        now = time.monotonic()
+        slot = max(now, self._next_slot.get(host, 0.0))
+        delay = self._host_delay.get(host, self._delay)
+        self._next_slot[host] = slot + delay + random.uniform(0.0, self._jitter)
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    def record_success(self, url: str) -> None:
+        host = httpx.URL(url).host
+        delay = self._host_delay.get(host)
+        if delay is None:
+            return
+        delay -= self._recovery
+        if delay <= self._delay:
+            del self._host_delay[host]
+        else:
+            self._host_delay[host] = delay
+
+    def record_throttle(self, url: str, retry_after: float | None = None) -> None:
+        host = httpx.URL(url).host
+        delay = self._host_delay.get(host, self._delay)
+        self._host_delay[host] = min(self._max_delay, max(delay * 2, self._recovery))
+        if retry_after:
+            resume = time.monotonic() + retry_after
+            self._next_slot[host] = max(self._next_slot.get(host, 0.0), resume)
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 
 
@@ -7,6 +9,82 @@ class Settings(BaseSettings):
     SUPABASE_ANON_KEY: str
     NAVER_CLIENT_ID: str = ""
     NAVER_CLIENT_SECRET: str = ""
+    DB_TIMEOUT_SECONDS: float = 30.0
+
+    # Collection engine: max keywords fetched in parallel, and random extra
+    # delay (seconds) added on top of the collector's per-host REQUEST_DELAY.
+    COLLECT_CONCURRENCY: int = 8
+    REQUEST_JITTER: float = 0.5
+
+    # Scheduler: each keyword is collected every COLLECT_INTERVAL_MINUTES
+    # (must divide 1440), phased by its collection_minute slot.
+    COLLECT_INTERVAL_MINUTES: int = 60
+    SCHEDULER_TIMEZONE: str = "Asia/Seoul"
+
+    # "inline" collects inside the API process; "queue" makes the scheduler
+    # only enqueue due slots for `python -m app.worker` processes, so several
+    # API processes can run the scheduler without collecting twice.
+    # RUN_SCHEDULER=false starts the API without any scheduled jobs.
+    COLLECT_MODE: Literal["inline", "queue"] = "inline"
+    RUN_SCHEDULER: bool = True
+    WORKER_BATCH_SIZE: int = 50
+    WORKER_LEASE_SECONDS: int = 300
+    WORKER_MAX_ATTEMPTS: int = 3
+    WORKER_RETRY_DELAY_SECONDS: int = 60
+    WORKER_POLL_SECONDS: float = 5.0
+    COLLECTION_JOBS_RETENTION_DAYS: int = 7
+
+    # Raw ranking_snapshots partitions older than this are dropped daily
+    # (their daily aggregates are kept). 0 keeps raw history forever.
+    SNAPSHOT_RETENTION_DAYS: int = 180
+    SNAPSHOT_PARTITIONS_AHEAD: int = 3
+    # "intervals" extends the previous snapshot's valid_to instead of writing
+    # a new row when nothing changed (same Asia/Seoul day only); reads expand
+    # intervals back into one point per collection.
+    SNAPSHOT_STORAGE: Literal["points", "intervals"] = "points"
+
+    # Ranks are searched this deep; beyond one page (50) the collector pages
+    # further only for stores not found on the earlier pages.
+    RANK_SEARCH_MAX_DEPTH: int = 50
+
+    # pcmap fetch retries (exponential backoff, honoring Retry-After) and the
+    # circuit breaker that pauses collection when the error rate spikes.
+    FETCH_MAX_RETRIES: int = 3
+    FETCH_BACKOFF_SECONDS: float = 2.0
+    FETCH_BACKOFF_MAX_SECONDS: float = 60.0
+    BREAKER_ERROR_RATE: float = 0.5
+    BREAKER_MIN_REQUESTS: int = 10
+    BREAKER_COOLDOWN_SECONDS: float = 300.0
+    BREAKER_MAX_RESCHEDULES: int = 3
+
+    # Apollo pages larger than PARSE_INLINE_MAX_KB are parsed in a pool of
+    # PARSE_PROCESSES worker processes, off the event loop; 0 parses inline.
+    PARSE_PROCESSES: int = 2
+    PARSE_INLINE_MAX_KB: int = 128
+
+    # When set, every fetched pcmap page is archived here (zstd, needs the
+    # "archive" extra) for `python -m app.cli reparse-archive`.
+    PAGE_ARCHIVE_DIR: str = ""
+
+    # Parsed place details are refetched after this age; the scheduler
+    # refreshes tracked stores in batches of PLACE_REFRESH_BATCH.
+    PLACE_CACHE_TTL_HOURS: float = 24 * 7
+    PLACE_REFRESH_BATCH: int = 20
+
+    # Dashboard event stream: per-client backlog before a client is told to
+    # resync, and the keep-alive comment interval.
+    EVENTS_QUEUE_SIZE: int = 256
+    EVENTS_HEARTBEAT_SECONDS: float = 15.0
+    # With COLLECT_MODE=queue the API polls for worker-written ranks this
+    # often and relays them to event clients (and its response cache).
+    EVENTS_RELAY_SECONDS: float = 5.0
+
+    # In-process response cache for dashboard and ranking reads. Worker
+    # writes (COLLECT_MODE=queue) do not invalidate it, so entries then live
+    # at most CACHE_QUEUE_TTL_SECONDS.
+    CACHE_TTL_SECONDS: float = 300.0
+    CACHE_QUEUE_TTL_SECONDS: float = 30.0
+    CACHE_MAX_ENTRIES: int = 1024
 
     model_config = {"env_file": ".env", "env_file_encoding": "utf-8"}
 
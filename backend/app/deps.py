@@ -1,12 +1,38 @@
-from supabase import Client, create_client
+import asyncio
+
+import httpx
+from supabase import AsyncClient, AsyncClientOptions, acreate_client
 
 from app.config import settings
+from app.metrics import instrument_db_client
+
+_client: AsyncClient | None = None
+_client_lock = asyncio.Lock()
 
-_client: Client | None = None
 
+async def get_supabase() -> AsyncClient:
+    """Shared async Supabase client.
 
-def get_supabase() -> Client:
+    PostgREST calls go through one long-lived httpx.AsyncClient, so requests
+    reuse pooled keep-alive connections and never block the event loop.
+    """
     global _client
     if _client is None:
-        _client = create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_KEY)
+        async with _client_lock:
+            if _client is None:
+                _client = await acreate_client(
+                    settings.SUPABASE_URL,
+                    settings.SUPABASE_SERVICE_KEY,
+                    options=AsyncClientOptions(
+                        postgrest_client_timeout=httpx.Timeout(settings.DB_TIMEOUT_SECONDS),
+                    ),
+                )
+                instrument_db_client(_client.postgrest.session)
     return _client
+
+
+async def close_supabase() -> None:
+    global _client
+    if _client is not None:
+        await _client.postgrest.aclose()
+        _client = None
@@ -0,0 +1,102 @@
+import asyncio
+import json
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from app.config import settings
+from app.metrics import EVENT_RESYNCS, EVENT_SUBSCRIBERS
+
+# Fields of a ranking_snapshots row sent in a "rank" event.
+RANK_EVENT_FIELDS = (
+    "tracked_keyword_id",
+    "rank_position",
+    "total_results",
+    "visitor_count",
+    "blog_review_count",
+    "collected_at",
+)
+
+
+@dataclass(frozen=True)
+class Event:
+    name: str
+    data: dict
+
+    def encode(self) -> str:
+        """Server-Sent Events wire format."""
+        return f"event: {self.name}\ndata: {json.dumps(self.data, default=str, ensure_ascii=False)}\n\n"
+
+
+RESYNC = Event("resync", {})
+
+
+class Subscription:
+    """One client's bounded event queue.
+
+    A client that falls `maxsize` events behind is not allowed to hold up
+    publishers or grow memory: its backlog is dropped and replaced by a
+    single "resync" event, after which it should refetch the dashboard once.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self._queue: asyncio.Queue[Event] = asyncio.Queue(maxsize)
+
+    def put(self, event: Event) -> None:
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._queue.put_nowait(RESYNC)
+            EVENT_RESYNCS.inc()
+
+    async def get(self, timeout: float) -> Event | None:
+        """Next event, or None after `timeout` seconds without one."""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventBroker:
+    """In-process pub/sub for dashboard updates.
+
+    Publishing never blocks: each subscriber has its own bounded queue (see
+    Subscription). Only writes made by this process are published directly;
+    with COLLECT_MODE=queue, `queue_service.relay_worker_snapshots` polls
+    for the ranks written by `app.worker` processes and publishes them.
+    """
+
+    def __init__(self, queue_size: int) -> None:
+        self._queue_size = queue_size
+        self._subscribers: set[Subscription] = set()
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(self._queue_size)
+        self._subscribers.add(subscription)
+        EVENT_SUBSCRIBERS.set(len(self._subscribers))
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+        EVENT_SUBSCRIBERS.set(len(self._subscribers))
+
+    def publish(self, event: Event) -> None:
+        for subscription in self._subscribers:
+            subscription.put(event)
+
+    def publish_snapshots(self, rows: Iterable[dict]) -> None:
+        """One "rank" event per written ranking_snapshots row."""
+        if not self._subscribers:
+            return
+        for row in rows:
+            data = {field: row.get(field) for field in RANK_EVENT_FIELDS}
+            # An extended interval row (SNAPSHOT_STORAGE=intervals) was last observed at valid_to
+            data["collected_at"] = row.get("valid_to") or data["collected_at"]
+            self.publish(Event("rank", data))
+
+
+event_broker = EventBroker(settings.EVENTS_QUEUE_SIZE)
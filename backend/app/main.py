@@ -1,17 +1,42 @@
-from contextlib import asynccontextmanager
+import asyncio
+import time
+from contextlib import asynccontextmanager, suppress
+from dataclasses import asdict
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
+from app.cache import response_cache
+from app.collector.naver_map import collector
+from app.config import settings
+from app.deps import close_supabase, get_supabase
+from app.metrics import HTTP_REQUEST_SECONDS
+from app.pagination import NEXT_CURSOR_HEADER
 from app.routers import dashboard, keywords, rankings, stores
 from app.scheduler.jobs import start_scheduler, stop_scheduler
+from app.services import queue_service
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    start_scheduler()
+    db = await get_supabase()
+    # One collector (and connection pool) serves both the scheduler and
+    # on-demand /collect requests.
+    await collector.start()
+    if settings.RUN_SCHEDULER:
+        start_scheduler()
+    # Workers write ranks in other processes; relay them to this one's event clients
+    relay = asyncio.create_task(queue_service.relay_worker_snapshots(db)) if settings.COLLECT_MODE == "queue" else None
     yield
-    stop_scheduler()
+    if relay:
+        relay.cancel()
+        with suppress(asyncio.CancelledError):
+            await relay
+    if settings.RUN_SCHEDULER:
+        stop_scheduler()
+    await collector.close()
+    await close_supabase()
 
 
 app = FastAPI(title="N-Place Platform", version="0.1.0", lifespan=lifespan)
@@ -22,8 +47,23 @@ app.add_middleware(
     allow_credentials=False,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
+
+@app.middleware("http")
+async def time_requests(request: Request, call_next):
+    started = time.perf_counter()
+    response = await call_next(request)
+    # Label by route template (/api/keywords/{keyword_id}/rankings), not the
+    # raw path, to keep label cardinality bounded.
+    route = request.scope.get("route")
+    HTTP_REQUEST_SECONDS.labels(
+        request.method, getattr(route, "path", "unmatched"), str(response.status_code)
+    ).observe(time.perf_counter() - started)
+    return response
+
+
 app.include_router(stores.router)
 app.include_router(keywords.router)
 app.include_router(rankings.router)
@@ -33,3 +73,13 @@ app.include_router(dashboard.router)
 @app.get("/health")
 async def health():
     return {"status": "ok"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+@app.get("/cache/stats")
+async def cache_stats():
+    return {"entries": len(response_cache), **asdict(response_cache.stats)}
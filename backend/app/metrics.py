@@ -0,0 +1,145 @@
+"""Prometheus metrics, served by the API at /metrics.
+
+The worker process can expose the same registry with --metrics-port.
+"""
+
+import functools
+import time
+from collections.abc import Awaitable, Callable
+from contextvars import ContextVar
+from typing import ParamSpec, TypeVar
+
+import httpx
+from prometheus_client import Counter, Gauge, Histogram
+from prometheus_client.core import REGISTRY, CounterMetricFamily, GaugeMetricFamily
+
+from app.cache import response_cache
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+# Network round trips; parse and DB calls are mostly in the low milliseconds.
+FETCH_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 15.0)
+FAST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+PCMAP_FETCH_SECONDS = Histogram(
+    "nplace_pcmap_fetch_seconds", "pcmap request latency", ["status"], buckets=FETCH_BUCKETS
+)
+APOLLO_PARSE_SECONDS = Histogram(
+    "nplace_apollo_parse_seconds",
+    "__APOLLO_STATE__ parse time, measured in the parsing process (excludes pool queueing and IPC)",
+    ["page"],
+    buckets=FAST_BUCKETS,
+)
+DB_SECONDS = Histogram(
+    "nplace_db_seconds", "PostgREST round-trip time by service function", ["function"], buckets=FAST_BUCKETS
+)
+JOB_SECONDS = Histogram(
+    "nplace_job_duration_seconds",
+    "Scheduled job and worker batch duration",
+    ["job"],
+    buckets=(0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0),
+)
+COLLECTED_KEYWORDS = Counter(
+    "nplace_collected_keywords", "Tracked keywords per collection outcome", ["outcome"]
+)
+PARSE_TASKS = Counter(
+    "nplace_parse_tasks", "Apollo pages parsed, inline or in the parse pool", ["path"]
+)
+PARSE_POOL_QUEUE_DEPTH = Gauge(
+    "nplace_parse_pool_queue_depth", "Pages submitted to the parse pool and not yet parsed"
+)
+PARSE_POOL_WORKERS = Gauge("nplace_parse_pool_workers", "Parse pool worker processes")
+EVENT_SUBSCRIBERS = Gauge("nplace_event_subscribers", "Connected dashboard event streams")
+EVENT_RESYNCS = Counter(
+    "nplace_event_resyncs", "Event backlogs dropped for slow clients, replaced by a resync event"
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "nplace_http_request_duration_seconds",
+    "API request duration by route",
+    ["method", "route", "status"],
+    buckets=FAST_BUCKETS + (5.0, 10.0),
+)
+
+# Service function whose PostgREST calls are being timed; the outermost
+# decorated function wins so helpers are attributed to their caller.
+_db_function: ContextVar[str | None] = ContextVar("db_function", default=None)
+
+
+def db_timed(fn: Callable[P, Awaitable[T]]) -> Callable[P, Awaitable[T]]:
+    """Attribute PostgREST round trips made inside `fn` to it in DB_SECONDS."""
+    label = f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+    @functools.wraps(fn)
+    async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+        if _db_function.get() is not None:
+            return await fn(*args, **kwargs)
+        token = _db_function.set(label)
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            _db_function.reset(token)
+
+    return wrapper
+
+
+def job_timed(name: str) -> Callable[[Callable[P, Awaitable[T]]], Callable[P, Awaitable[T]]]:
+    """Record each run of the decorated coroutine in JOB_SECONDS."""
+
+    def decorator(fn: Callable[P, Awaitable[T]]) -> Callable[P, Awaitable[T]]:
+        @functools.wraps(fn)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+            with JOB_SECONDS.labels(name).time():
+                return await fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+async def _db_request_started(request: httpx.Request) -> None:
+    request.extensions["nplace_started"] = time.perf_counter()
+
+
+async def _db_response_received(response: httpx.Response) -> None:
+    started = response.request.extensions.get("nplace_started")
+    if started is not None:
+        DB_SECONDS.labels(_db_function.get() or "other").observe(time.perf_counter() - started)
+
+
+def instrument_db_client(session: httpx.AsyncClient) -> None:
+    """Time every request the PostgREST session sends."""
+    hooks = session.event_hooks
+    hooks["request"].append(_db_request_started)
+    hooks["response"].append(_db_response_received)
+    session.event_hooks = hooks
+
+
+def observe_collection(ranked: int, not_found: int, failed: int, deferred: int, write_failed: int) -> None:
+    for outcome, count in (
+        ("ranked", ranked),
+        ("not_found", not_found),
+        ("failed", failed),
+        ("deferred", deferred),
+        ("write_failed", write_failed),
+    ):
+        COLLECTED_KEYWORDS.labels(outcome).inc(count)
+
+
+class _ResponseCacheCollector:
+    """Exports the in-process response cache's counters at scrape time."""
+
+    def collect(self):
+        stats = response_cache.stats
+        for name, value in (
+            ("hits", stats.hits),
+            ("misses", stats.misses),
+            ("evictions", stats.evictions),
+            ("expirations", stats.expirations),
+            ("invalidations", stats.invalidations),
+        ):
+            yield CounterMetricFamily(f"nplace_response_cache_{name}", f"Response cache {name}", value=value)
+        yield GaugeMetricFamily("nplace_response_cache_entries", "Response cache entries", value=len(response_cache))
+
+
+REGISTRY.register(_ResponseCacheCollector())
@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Literal
 
 from pydantic import BaseModel
 
@@ -11,3 +12,37 @@ class RankingResponse(BaseModel):
     visitor_count: int | None = None
     blog_review_count: int | None = None
     collected_at: datetime
+
+
+Resolution = Literal["hour", "day", "week"]
+
+
+class RankingAggregateResponse(BaseModel):
+    tracked_keyword_id: str
+    bucket: datetime
+    samples: int
+    min_rank: int | None = None
+    max_rank: int | None = None
+    avg_rank: float | None = None
+    not_found_ratio: float
+    visitor_count: int | None = None
+    blog_review_count: int | None = None
+    collected_at: datetime
+
+
+class CompetitorResponse(BaseModel):
+    rank_position: int
+    naver_place_id: str
+    name: str | None = None
+    visitor_count: int | None = None
+    blog_review_count: int | None = None
+    collected_at: datetime
+
+
+class CompetitorRankResponse(BaseModel):
+    naver_place_id: str
+    rank_position: int | None = None
+    total_results: int | None = None
+    visitor_count: int | None = None
+    blog_review_count: int | None = None
+    collected_at: datetime
@@ -1,10 +1,14 @@
 from datetime import datetime
+from typing import Annotated, Literal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, StringConstraints
+
+# stores.naver_place_id is VARCHAR(20)
+NaverPlaceId = Annotated[str, StringConstraints(strip_whitespace=True, pattern=r"^\d{1,20}$")]
 
 
 class StoreCreate(BaseModel):
-    naver_place_id: str
+    naver_place_id: NaverPlaceId
 
 
 class StoreResponse(BaseModel):
@@ -16,3 +20,14 @@ class StoreResponse(BaseModel):
     naver_place_url: str | None = None
     created_at: datetime
     updated_at: datetime
+
+
+class StoreBulkCreate(BaseModel):
+    naver_place_ids: list[NaverPlaceId] = Field(min_length=1, max_length=500)
+
+
+class StoreBulkItem(BaseModel):
+    naver_place_id: str
+    status: Literal["created", "exists", "failed"]
+    store: StoreResponse | None = None
+    error: str | None = None
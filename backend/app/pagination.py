@@ -0,0 +1,53 @@
+import base64
+import json
+import re
+from datetime import datetime
+
+from fastapi import HTTPException, Response
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+MAX_PAGE_SIZE = 1000
+
+# Row IDs that can appear in a cursor: UUIDs, ranking_points "<uuid>:<n>" and
+# ranking_history "daily:<date>". Nothing that could break out of a filter.
+_CURSOR_ID = re.compile(r"[0-9A-Za-z-]+(:[0-9A-Za-z-]+)?")
+
+
+def encode_cursor(sort_value: datetime | str, row_id: str) -> str:
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps([sort_value, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, str]:
+    """(sort value, row id) of a cursor, re-serialized so they are safe to put in a filter."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort_value, row_id = json.loads(raw)
+        sort_value = datetime.fromisoformat(sort_value).isoformat()
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(row_id, str) or not _CURSOR_ID.fullmatch(row_id):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return sort_value, row_id
+
+
+def keyset_filter(sort_column: str, cursor: str) -> str:
+    """PostgREST `or` filter for the rows after `cursor` in (sort_column DESC, id DESC) order."""
+    sort_value, row_id = decode_cursor(cursor)
+    return (
+        f'{sort_column}.lt."{sort_value}",'
+        f'and({sort_column}.eq."{sort_value}",id.lt."{row_id}")'
+    )
+
+
+def set_next_cursor(response: Response, items: list, limit: int | None, sort_attr: str) -> None:
+    """Advertise the next page in a header when the page came back full.
+
+    Keeping the cursor out of the body leaves list endpoints returning plain
+    arrays for callers that don't paginate.
+    """
+    if limit and len(items) == limit:
+        last = items[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(getattr(last, sort_attr), last.id)
@@ -1,7 +1,12 @@
-from fastapi import APIRouter, Depends
-from supabase import Client
+from collections.abc import AsyncIterator
 
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+from supabase import AsyncClient
+
+from app.config import settings
 from app.deps import get_supabase
+from app.events import event_broker
 from app.models.dashboard import DashboardStore
 from app.services import dashboard_service
 
@@ -9,5 +14,33 @@ router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
 
 
 @router.get("", response_model=list[DashboardStore])
-async def get_all_dashboard(db: Client = Depends(get_supabase)):
+async def get_all_dashboard(db: AsyncClient = Depends(get_supabase)):
     return await dashboard_service.get_all_dashboard(db)
+
+
+@router.get("/events")
+async def dashboard_events(request: Request):
+    """Server-Sent Events: load /api/dashboard once, then apply these.
+
+    - `rank`: a snapshot was written (tracked_keyword_id, rank_position, ...)
+    - `collection`: a scheduled collection run finished
+    - `resync`: this client fell behind and missed events; refetch the dashboard
+    """
+
+    async def stream() -> AsyncIterator[str]:
+        subscription = event_broker.subscribe()
+        try:
+            # Tells the browser how long to wait before reconnecting
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                event = await subscription.get(settings.EVENTS_HEARTBEAT_SECONDS)
+                # A comment line keeps proxies from closing an idle stream
+                yield event.encode() if event else ": ping\n\n"
+        finally:
+            event_broker.unsubscribe(subscription)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
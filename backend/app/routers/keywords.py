@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends
-from supabase import Client
+from fastapi import APIRouter, Depends, Query, Response
+from supabase import AsyncClient
 
 from app.deps import get_supabase
 from app.models.keywords import KeywordCreate, KeywordResponse, KeywordUpdate
+from app.pagination import MAX_PAGE_SIZE, set_next_cursor
 from app.services import keyword_service
 
 router = APIRouter(tags=["keywords"])
@@ -14,7 +15,7 @@ router = APIRouter(tags=["keywords"])
     status_code=201,
 )
 async def add_keyword(
-    store_id: str, payload: KeywordCreate, db: Client = Depends(get_supabase)
+    store_id: str, payload: KeywordCreate, db: AsyncClient = Depends(get_supabase)
 ):
     return await keyword_service.add_keyword(db, store_id, payload)
 
@@ -23,22 +24,30 @@ async def add_keyword(
     "/api/stores/{store_id}/keywords",
     response_model=list[KeywordResponse],
 )
-async def list_keywords(store_id: str, db: Client = Depends(get_supabase)):
-    return await keyword_service.list_keywords(db, store_id)
+async def list_keywords(
+    store_id: str,
+    response: Response,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(None),
+    db: AsyncClient = Depends(get_supabase),
+):
+    keywords = await keyword_service.list_keywords(db, store_id, limit, cursor)
+    set_next_cursor(response, keywords, limit, "created_at")
+    return keywords
 
 
 @router.get("/api/keywords/{keyword_id}", response_model=KeywordResponse)
-async def get_keyword(keyword_id: str, db: Client = Depends(get_supabase)):
+async def get_keyword(keyword_id: str, db: AsyncClient = Depends(get_supabase)):
     return await keyword_service.get_keyword(db, keyword_id)
 
 
 @router.patch("/api/keywords/{keyword_id}", response_model=KeywordResponse)
 async def update_keyword(
-    keyword_id: str, payload: KeywordUpdate, db: Client = Depends(get_supabase)
+    keyword_id: str, payload: KeywordUpdate, db: AsyncClient = Depends(get_supabase)
 ):
     return await keyword_service.update_keyword(db, keyword_id, payload)
 
 
 @router.delete("/api/keywords/{keyword_id}", status_code=204)
-async def delete_keyword(keyword_id: str, db: Client = Depends(get_supabase)):
+async def delete_keyword(keyword_id: str, db: AsyncClient = Depends(get_supabase)):
     await keyword_service.delete_keyword(db, keyword_id)
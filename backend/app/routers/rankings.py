@@ -1,25 +1,129 @@
-from datetime import date
+import csv
+import io
+import json
+from collections.abc import AsyncIterator
+from datetime import date, datetime
+from typing import Literal
 
-from fastapi import APIRouter, Depends, Query
-from supabase import Client
+import httpx
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Response
+from fastapi.responses import StreamingResponse
+from supabase import AsyncClient
 
+from app.collector.circuit import CircuitOpenError
 from app.deps import get_supabase
-from app.models.rankings import RankingResponse
-from app.services import ranking_service
+from app.models.rankings import (
+    CompetitorRankResponse,
+    CompetitorResponse,
+    RankingAggregateResponse,
+    RankingResponse,
+    Resolution,
+)
+from app.pagination import MAX_PAGE_SIZE, set_next_cursor
+from app.services import competitor_service, ranking_service
+
+EXPORT_COLUMNS = [
+    "id",
+    "tracked_keyword_id",
+    "rank_position",
+    "total_results",
+    "visitor_count",
+    "blog_review_count",
+    "collected_at",
+]
 
 router = APIRouter(prefix="/api/keywords", tags=["rankings"])
 
 
 @router.post("/{keyword_id}/collect", response_model=RankingResponse, status_code=201)
-async def collect_ranking(keyword_id: str, db: Client = Depends(get_supabase)):
-    return await ranking_service.collect_ranking(db, keyword_id)
+async def collect_ranking(keyword_id: str, db: AsyncClient = Depends(get_supabase)):
+    try:
+        return await ranking_service.collect_ranking(db, keyword_id)
+    except CircuitOpenError as e:
+        raise HTTPException(
+            status_code=503,
+            detail="Naver is throttling collection, try again later",
+            headers={"Retry-After": str(int(e.retry_in) + 1)},
+        ) from e
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=502, detail="Failed to fetch ranking from Naver") from e
 
 
-@router.get("/{keyword_id}/rankings", response_model=list[RankingResponse])
+@router.get(
+    "/{keyword_id}/rankings",
+    response_model=list[RankingResponse] | list[RankingAggregateResponse],
+)
 async def get_rankings(
     keyword_id: str,
+    response: Response,
     from_: date | None = Query(None, alias="from"),
     to: date | None = Query(None),
-    db: Client = Depends(get_supabase),
+    resolution: Resolution | None = Query(None),
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(None),
+    db: AsyncClient = Depends(get_supabase),
+):
+    if resolution:
+        return await ranking_service.get_ranking_series(db, keyword_id, resolution, from_, to)
+    rankings = await ranking_service.get_rankings(db, keyword_id, from_, to, limit, cursor)
+    set_next_cursor(response, rankings, limit, "collected_at")
+    return rankings
+
+
+@router.get("/{keyword_id}/rankings/export")
+async def export_rankings(
+    keyword_id: str,
+    from_: date | None = Query(None, alias="from"),
+    to: date | None = Query(None),
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+    db: AsyncClient = Depends(get_supabase),
+):
+    rows = ranking_service.iter_rankings(db, keyword_id, from_, to)
+    if format == "csv":
+        body, media_type = _csv_lines(rows), "text/csv"
+    else:
+        body, media_type = _ndjson_lines(rows), "application/x-ndjson"
+    filename = f"rankings-{keyword_id}.{format}"
+    return StreamingResponse(
+        body, media_type=media_type, headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.get("/{keyword_id}/competitors", response_model=list[CompetitorResponse])
+async def get_competitors_above(
+    keyword_id: str,
+    at: datetime | None = Query(None),
+    db: AsyncClient = Depends(get_supabase),
 ):
-    return await ranking_service.get_rankings(db, keyword_id, from_, to)
+    return await competitor_service.get_competitors_above(db, keyword_id, at)
+
+
+@router.get("/{keyword_id}/competitors/{place_id}/rankings", response_model=list[CompetitorRankResponse])
+async def get_competitor_rankings(
+    keyword_id: str,
+    place_id: str = Path(pattern=r"^\d+$"),
+    from_: date | None = Query(None, alias="from"),
+    to: date | None = Query(None),
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncClient = Depends(get_supabase),
+):
+    return await competitor_service.get_competitor_rankings(db, keyword_id, place_id, from_, to, limit)
+
+
+async def _ndjson_lines(rows: AsyncIterator[dict]) -> AsyncIterator[str]:
+    async for row in rows:
+        yield json.dumps({col: row.get(col) for col in EXPORT_COLUMNS}, ensure_ascii=False) + "\n"
+
+
+async def _csv_lines(rows: AsyncIterator[dict]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS, extrasaction="ignore")
+    writer.writeheader()
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    async for row in rows:
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
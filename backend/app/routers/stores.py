@@ -1,34 +1,62 @@
-from fastapi import APIRouter, Depends
-from supabase import Client
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from supabase import AsyncClient
 
+from app.collector.circuit import CircuitOpenError
 from app.deps import get_supabase
 from app.models.dashboard import DashboardSummary
-from app.models.stores import StoreCreate, StoreResponse
+from app.models.stores import StoreBulkCreate, StoreBulkItem, StoreCreate, StoreResponse
+from app.pagination import MAX_PAGE_SIZE, set_next_cursor
 from app.services import dashboard_service, store_service
 
 router = APIRouter(prefix="/api/stores", tags=["stores"])
 
 
+def _throttled(e: CircuitOpenError) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Naver is throttling requests, try again later",
+        headers={"Retry-After": str(int(e.retry_in) + 1)},
+    )
+
+
 @router.post("", response_model=StoreResponse, status_code=201)
-async def create_store(payload: StoreCreate, db: Client = Depends(get_supabase)):
-    return await store_service.create_store(db, payload)
+async def create_store(payload: StoreCreate, db: AsyncClient = Depends(get_supabase)):
+    try:
+        return await store_service.create_store(db, payload)
+    except CircuitOpenError as e:
+        raise _throttled(e) from e
+
+
+@router.post("/bulk", response_model=list[StoreBulkItem])
+async def create_stores_bulk(payload: StoreBulkCreate, db: AsyncClient = Depends(get_supabase)):
+    try:
+        return await store_service.create_stores_bulk(db, payload)
+    except CircuitOpenError as e:
+        raise _throttled(e) from e
 
 
 @router.get("", response_model=list[StoreResponse])
-async def list_stores(db: Client = Depends(get_supabase)):
-    return await store_service.list_stores(db)
+async def list_stores(
+    response: Response,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(None),
+    db: AsyncClient = Depends(get_supabase),
+):
+    stores = await store_service.list_stores(db, limit, cursor)
+    set_next_cursor(response, stores, limit, "created_at")
+    return stores
 
 
 @router.get("/{store_id}", response_model=StoreResponse)
-async def get_store(store_id: str, db: Client = Depends(get_supabase)):
+async def get_store(store_id: str, db: AsyncClient = Depends(get_supabase)):
     return await store_service.get_store(db, store_id)
 
 
 @router.delete("/{store_id}", status_code=204)
-async def delete_store(store_id: str, db: Client = Depends(get_supabase)):
+async def delete_store(store_id: str, db: AsyncClient = Depends(get_supabase)):
     await store_service.delete_store(db, store_id)
 
 
 @router.get("/{store_id}/dashboard", response_model=DashboardSummary)
-async def get_dashboard(store_id: str, db: Client = Depends(get_supabase)):
+async def get_dashboard(store_id: str, db: AsyncClient = Depends(get_supabase)):
     return await dashboard_service.get_dashboard(db, store_id)
@@ -0,0 +1,154 @@
+import asyncio
+import logging
+import statistics
+import time
+from dataclasses import dataclass, field
+
+from supabase import AsyncClient
+
+from app.collector.base import BaseCollector
+from app.collector.circuit import CircuitOpenError
+from app.collector.naver_map import fetch_timings
+from app.config import settings
+from app.events import Event, event_broker
+from app.metrics import observe_collection
+from app.services import ranking_service
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CollectionStats:
+    keywords: int = 0
+    searches: int = 0
+    failed: int = 0
+    not_found: int = 0
+    written: int = 0
+    write_failed: int = 0
+    elapsed: float = 0.0
+    fetch_latencies: list[float] = field(default_factory=list)
+    # Keyword rows skipped because the circuit breaker was open, and how long
+    # until it lets requests through again.
+    deferred: list[dict] = field(default_factory=list)
+    resume_in: float = 0.0
+
+    @property
+    def keywords_per_second(self) -> float:
+        return self.keywords / self.elapsed if self.elapsed else 0.0
+
+    def latency_percentile(self, pct: int) -> float | None:
+        if not self.fetch_latencies:
+            return None
+        if len(self.fetch_latencies) == 1:
+            return self.fetch_latencies[0]
+        return statistics.quantiles(self.fetch_latencies, n=100, method="inclusive")[pct - 1]
+
+    def observe(self) -> None:
+        """Add this run's per-keyword outcomes to the Prometheus counters."""
+        collected = self.keywords - self.failed - len(self.deferred)
+        observe_collection(
+            ranked=collected - self.not_found,
+            not_found=self.not_found,
+            failed=self.failed,
+            deferred=len(self.deferred),
+            write_failed=self.write_failed,
+        )
+
+    def summary(self) -> str:
+        p50 = self.latency_percentile(50)
+        p95 = self.latency_percentile(95)
+        return (
+            f"{self.keywords} keywords ({self.searches} searches, {self.failed} failed, "
+            f"{self.not_found} not found, "
+            f"{len(self.deferred)} deferred, "
+            f"{self.written} written, {self.write_failed} write failures) "
+            f"in {self.elapsed:.1f}s, {self.keywords_per_second:.2f} keywords/s, "
+            f"fetch p50={_fmt_ms(p50)} p95={_fmt_ms(p95)}"
+        )
+
+
+def _fmt_ms(seconds: float | None) -> str:
+    return "n/a" if seconds is None else f"{seconds * 1000:.0f}ms"
+
+
+async def run_collection(
+    db: AsyncClient,
+    keywords: list[dict],
+    concurrency: int | None = None,
+    *,
+    collector: BaseCollector | None = None,
+) -> CollectionStats:
+    """Collect rankings for tracked_keywords rows with at most `concurrency` searches in flight.
+
+    Rows must be joined with stores(naver_place_id). Politeness towards Naver is
+    enforced by the collector's per-host rate limiter, so raising concurrency
+    only overlaps slow responses rather than increasing the request rate.
+
+    Snapshot rows are buffered and written in multi-row chunks instead of one
+    insert per keyword. Failed searches write nothing; keywords skipped while
+    the collector's circuit breaker is open end up in `stats.deferred`.
+    `collector` defaults to the shared pcmap collector (benchmarks pass a replay one).
+    """
+    groups = ranking_service.group_by_keyword(keywords)
+    stats = CollectionStats(keywords=len(keywords), searches=len(groups))
+    semaphore = asyncio.Semaphore(concurrency or settings.COLLECT_CONCURRENCY)
+    pending: list[dict] = []
+    pending_serps: list[dict] = []
+
+    async def flush() -> None:
+        rows, serps = pending[:], pending_serps[:]
+        pending.clear()
+        pending_serps.clear()
+        # SERPs first: insert_snapshots invalidates the keywords' cached
+        # competitor responses, which must not be refilled from the old SERP.
+        if serps:
+            await ranking_service.insert_serps(db, serps)
+        inserted, failed = await ranking_service.insert_snapshots(db, rows)
+        stats.written += len(inserted)
+        stats.write_failed += len(failed)
+
+    async def collect(keyword: str, targets: list[dict]) -> None:
+        async with semaphore:
+            try:
+                rows, serp_row = await ranking_service.rank_keyword_group(keyword, targets, collector=collector)
+                pending.extend(rows)
+                if serp_row:
+                    pending_serps.append(serp_row)
+                stats.not_found += sum(1 for row in rows if row["rank_position"] is None)
+                logger.info("Collected ranking for keyword '%s' (%d tracked)", keyword, len(targets))
+            except CircuitOpenError as e:
+                stats.deferred.extend(targets)
+                stats.resume_in = max(stats.resume_in, e.retry_in)
+                return
+            except Exception:
+                stats.failed += len(targets)
+                logger.exception("Failed to collect ranking for keyword '%s'", keyword)
+                return
+            if len(pending) >= ranking_service.SNAPSHOT_INSERT_CHUNK:
+                await flush()
+
+    # Tasks inherit the context, so every fetch reports into this run's list.
+    token = fetch_timings.set(stats.fetch_latencies)
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(collect(kw, targets) for kw, targets in groups.items()))
+        if pending:
+            await flush()
+    finally:
+        stats.elapsed = time.perf_counter() - started
+        fetch_timings.reset(token)
+        stats.observe()
+
+    # Lets dashboards know the run is over (its ranks were streamed as written)
+    event_broker.publish(
+        Event(
+            "collection",
+            {
+                "keywords": stats.keywords,
+                "written": stats.written,
+                "failed": stats.failed,
+                "deferred": len(stats.deferred),
+            },
+        )
+    )
+    return stats
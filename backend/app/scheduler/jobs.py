@@ -1,39 +1,197 @@
 import logging
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
 
+from apscheduler.executors.asyncio import AsyncIOExecutor
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from supabase import AsyncClient
 
+from app.config import settings
 from app.deps import get_supabase
-from app.services import ranking_service
+from app.metrics import job_timed
+from app.scheduler.engine import CollectionStats, run_collection
+from app.services import place_service, queue_service, ranking_service
 
 logger = logging.getLogger(__name__)
 
-scheduler = AsyncIOScheduler()
+MINUTES_PER_DAY = 24 * 60
 
+# The time the running job was scheduled to fire (set by FireTimeExecutor).
+scheduled_fire_time: ContextVar[datetime | None] = ContextVar("scheduled_fire_time", default=None)
 
+
+class FireTimeExecutor(AsyncIOExecutor):
+    """AsyncIOExecutor that exposes each run's scheduled fire time.
+
+    APScheduler 3 does not pass it to the job, and the clock may already be
+    in a later minute when a run starts late. Each run gets its own task,
+    created with `scheduled_fire_time` set, so a job can read it.
+    """
+
+    def _do_submit_job(self, job, run_times):
+        # submit_job counted one instance for all of run_times; each task releases one
+        self._instances[job.id] += len(run_times) - 1
+        for run_time in run_times:
+            token = scheduled_fire_time.set(run_time)
+            try:
+                super()._do_submit_job(job, [run_time])
+            finally:
+                scheduled_fire_time.reset(token)
+
+
+scheduler = AsyncIOScheduler(
+    timezone=ZoneInfo(settings.SCHEDULER_TIMEZONE), executors={"default": FireTimeExecutor()}
+)
+
+
+def due_minutes(minute_of_day: int, interval: int) -> list[int]:
+    """All collection_minute slots that fire at `minute_of_day` for the given interval."""
+    phase = minute_of_day % interval
+    return list(range(phase, MINUTES_PER_DAY, interval))
+
+
+@job_timed("collect_due_rankings")
+async def collect_due_rankings() -> None:
+    """Per-minute tick: collect only the keywords whose slot is due now.
+
+    tracked_keywords.collection_minute (see migration 002) spreads keywords
+    with the same collection_time over the following hour, so each tick loads
+    a small slice instead of one hourly sweep over everything.
+
+    The slot is the tick's scheduled fire time, not the clock: a tick that
+    starts late (a busy loop, or a catch-up run) still collects its own minute.
+
+    With COLLECT_MODE=queue the slice is only enqueued for the workers.
+    """
+    tz = ZoneInfo(settings.SCHEDULER_TIMEZONE)
+    fire_time = scheduled_fire_time.get() or datetime.now(tz)
+    slot = fire_time.astimezone(tz).replace(second=0, microsecond=0)
+    slots = due_minutes(slot.hour * 60 + slot.minute, settings.COLLECT_INTERVAL_MINUTES)
+
+    db = await get_supabase()
+    if settings.COLLECT_MODE == "queue":
+        queued = await queue_service.enqueue_jobs(db, slot, slots)
+        if queued:
+            logger.info("Collection slot %02d:%02d queued %d jobs", slot.hour, slot.minute, queued)
+        return
+
+    keywords = await ranking_service.list_active_keywords(db, slots)
+    if not keywords:
+        return
+
+    stats = await run_collection(db, keywords)
+    logger.info("Collection slot %02d:%02d finished: %s", slot.hour, slot.minute, stats.summary())
+    _reschedule_deferred(stats)
+
+
+@job_timed("collect_all_rankings")
 async def collect_all_rankings() -> None:
-    # TODO(PoC): Per-keyword collection_time is ignored for now.
-    # All active keywords are collected on a single hourly interval.
-    db = get_supabase()
-    result = db.table("tracked_keywords").select("id").eq("is_active", True).execute()
+    """Collect every active keyword at once, regardless of its slot."""
+    db = await get_supabase()
+    stats = await run_collection(db, await ranking_service.list_active_keywords(db))
+    logger.info("Collection run finished: %s", stats.summary())
+    _reschedule_deferred(stats)
 
-    for kw in result.data:
-        try:
-            await ranking_service.collect_ranking(db, kw["id"])
-            logger.info("Collected ranking for keyword %s", kw["id"])
-        except Exception:
-            logger.exception("Failed to collect ranking for keyword %s", kw["id"])
+
+@job_timed("collect_deferred_rankings")
+async def collect_deferred_rankings(keywords: list[dict], attempt: int) -> None:
+    """Retry keywords skipped while the collector's circuit breaker was open."""
+    db = await get_supabase()
+    stats = await run_collection(db, keywords)
+    logger.info("Deferred collection (attempt %d) finished: %s", attempt, stats.summary())
+    _reschedule_deferred(stats, attempt + 1)
+
+
+def _reschedule_deferred(stats: CollectionStats, attempt: int = 1) -> None:
+    if not stats.deferred:
+        return
+    if attempt > settings.BREAKER_MAX_RESCHEDULES:
+        logger.warning("Dropping %d deferred keywords after %d reschedules", len(stats.deferred), attempt - 1)
+        return
+    run_date = datetime.now(ZoneInfo(settings.SCHEDULER_TIMEZONE)) + timedelta(seconds=stats.resume_in + 1)
+    scheduler.add_job(collect_deferred_rankings, "date", run_date=run_date, args=[stats.deferred, attempt])
+    logger.warning("Circuit open: %d keywords rescheduled for %s", len(stats.deferred), run_date.strftime("%H:%M:%S"))
+
+
+async def _claim_run(db: AsyncClient, job: str) -> bool:
+    """Whether this process should run a maintenance job's current run.
+
+    Runs started outside the scheduler (no fire time) always proceed.
+    """
+    fire_time = scheduled_fire_time.get()
+    if fire_time is None:
+        return True
+    if await queue_service.claim_scheduled_run(db, job, fire_time):
+        return True
+    logger.debug("Skipping %s at %s: another process runs it", job, fire_time)
+    return False
+
+
+@job_timed("maintain_snapshot_storage")
+async def maintain_snapshot_storage() -> None:
+    """Daily: create upcoming monthly partitions and drop ones past retention."""
+    db = await get_supabase()
+    if not await _claim_run(db, "maintain_snapshot_storage"):
+        return
+    await ranking_service.ensure_snapshot_partitions(db)
+    if settings.SNAPSHOT_RETENTION_DAYS > 0:
+        dropped = await ranking_service.apply_snapshot_retention(db, settings.SNAPSHOT_RETENTION_DAYS)
+        logger.info("Snapshot retention dropped %d partitions", dropped)
+        pruned = await ranking_service.prune_serp_snapshots(db, settings.SNAPSHOT_RETENTION_DAYS)
+        if pruned:
+            logger.info("Snapshot retention deleted %d SERP snapshots", pruned)
+    pruned = await queue_service.prune_jobs(db, settings.COLLECTION_JOBS_RETENTION_DAYS)
+    if pruned:
+        logger.info("Pruned %d finished collection jobs", pruned)
+
+
+@job_timed("refresh_place_details")
+async def refresh_place_details() -> None:
+    """Keep stores' names/categories/addresses current, a small batch at a time."""
+    db = await get_supabase()
+    if not await _claim_run(db, "refresh_place_details"):
+        return
+    refreshed = await place_service.refresh_tracked_stores(db, settings.PLACE_REFRESH_BATCH)
+    if refreshed:
+        logger.info("Refreshed place details for %d stores", refreshed)
 
 
 def start_scheduler() -> None:
+    interval = settings.COLLECT_INTERVAL_MINUTES
+    if interval <= 0 or MINUTES_PER_DAY % interval:
+        raise ValueError(f"COLLECT_INTERVAL_MINUTES must divide {MINUTES_PER_DAY}, got {interval}")
+
     scheduler.add_job(
-        collect_all_rankings,
-        "interval",
-        hours=1,
+        collect_due_rankings,
+        "cron",
+        minute="*",
         id="collect_rankings",
         replace_existing=True,
+        # A slow slot must not cause the next minute's slice to be skipped.
+        max_instances=5,
+        coalesce=False,
+        misfire_grace_time=30,
+    )
+    scheduler.add_job(
+        maintain_snapshot_storage,
+        "cron",
+        hour=4,
+        minute=30,
+        id="maintain_snapshot_storage",
+        replace_existing=True,
+    )
+    # Cron rather than interval: every process then fires at the same times,
+    # so the run can be claimed once per fire time (see _claim_run).
+    scheduler.add_job(
+        refresh_place_details,
+        "cron",
+        minute="*/10",
+        id="refresh_place_details",
+        replace_existing=True,
     )
     scheduler.start()
-    logger.info("Scheduler started")
+    logger.info("Scheduler started (interval=%dmin)", interval)
 
 
 def stop_scheduler() -> None:
@@ -0,0 +1,59 @@
+from datetime import date, datetime
+
+from supabase import AsyncClient
+
+from app.cache import keyword_tag, response_cache
+from app.metrics import db_timed
+from app.models.rankings import CompetitorRankResponse, CompetitorResponse
+
+
+@db_timed
+async def get_competitors_above(
+    db: AsyncClient, keyword_id: str, at: datetime | None = None
+) -> list[CompetitorResponse]:
+    """Places ranked above the tracked store in the latest stored SERP (as of `at`).
+
+    If the store is not in that SERP, every stored result is returned.
+    """
+    cache_key = ("competitors_above", keyword_id, at)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    version = response_cache.version()
+
+    params = {"p_keyword_id": keyword_id, "p_at": at.isoformat() if at else None}
+    result = await db.rpc("serp_above", params).execute()
+    competitors = [CompetitorResponse(**r) for r in result.data]
+    response_cache.set(cache_key, competitors, [keyword_tag(keyword_id)], version=version)
+    return competitors
+
+
+@db_timed
+async def get_competitor_rankings(
+    db: AsyncClient,
+    keyword_id: str,
+    place_id: str,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    limit: int | None = None,
+) -> list[CompetitorRankResponse]:
+    """Rank history of any place in the tracked keyword's stored SERPs, newest first."""
+    cache_key = ("competitor_rankings", keyword_id, place_id, date_from, date_to, limit)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    version = response_cache.version()
+
+    params = {
+        "p_keyword_id": keyword_id,
+        "p_place_id": place_id,
+        "p_from": date_from.isoformat() if date_from else None,
+        "p_to": date_to.isoformat() + "T23:59:59" if date_to else None,
+    }
+    query = db.rpc("serp_rank_history", params)
+    if limit:
+        query = query.limit(limit)
+    result = await query.execute()
+    rankings = [CompetitorRankResponse(naver_place_id=place_id, **r) for r in result.data]
+    response_cache.set(cache_key, rankings, [keyword_tag(keyword_id)], version=version)
+    return rankings
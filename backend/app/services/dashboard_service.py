@@ -1,5 +1,9 @@
-from supabase import Client
+from collections import defaultdict
 
+from supabase import AsyncClient
+
+from app.cache import DASHBOARD_ALL_TAG, keyword_tag, response_cache, store_tag
+from app.metrics import db_timed
 from app.models.dashboard import (
     DashboardKeyword,
     DashboardStore,
@@ -9,39 +13,73 @@ from app.models.dashboard import (
 from app.models.rankings import RankingResponse
 
 
-async def get_dashboard(db: Client, store_id: str) -> DashboardSummary:
-    store_result = db.table("stores").select("*").eq("id", store_id).single().execute()
-    store = store_result.data
+@db_timed
+async def _fetch_dashboard_keywords(db: AsyncClient, store_id: str | None = None) -> list[dict]:
+    """Keywords with latest/previous rank from the dashboard_keywords view, in one round trip."""
+    query = db.table("dashboard_keywords").select("*")
+    if store_id is not None:
+        query = query.eq("store_id", store_id)
+    return (await query.order("created_at").execute()).data
 
-    kw_result = (
-        db.table("tracked_keywords")
-        .select("*")
-        .eq("store_id", store_id)
-        .order("created_at")
-        .execute()
+
+def _latest_ranking(kw: dict) -> RankingResponse | None:
+    if kw.get("latest_snapshot_id") is None:
+        return None
+    return RankingResponse(
+        id=kw["latest_snapshot_id"],
+        tracked_keyword_id=kw["id"],
+        rank_position=kw.get("latest_rank"),
+        total_results=kw.get("latest_total_results"),
+        visitor_count=kw.get("latest_visitor_count"),
+        blog_review_count=kw.get("latest_blog_review_count"),
+        collected_at=kw["latest_collected_at"],
     )
 
-    keywords_with_rank: list[KeywordWithRank] = []
-    for kw in kw_result.data:
-        latest = (
-            db.table("ranking_snapshots")
-            .select("*")
-            .eq("tracked_keyword_id", kw["id"])
-            .order("collected_at", desc=True)
-            .limit(1)
-            .execute()
-        )
-        latest_rank = RankingResponse(**latest.data[0]) if latest.data else None
-        keywords_with_rank.append(
-            KeywordWithRank(
-                id=kw["id"],
-                keyword=kw["keyword"],
-                is_active=kw["is_active"],
-                latest_rank=latest_rank,
-            )
+
+def _dashboard_keyword(kw: dict) -> DashboardKeyword:
+    latest_rank = kw.get("latest_rank")
+    prev_rank = kw.get("prev_rank")
+    rank_change = prev_rank - latest_rank if latest_rank is not None and prev_rank is not None else None
+    return DashboardKeyword(
+        id=kw["id"],
+        store_id=kw.get("store_id"),
+        keyword=kw["keyword"],
+        is_active=kw["is_active"],
+        collection_time=kw.get("collection_time"),
+        alert_enabled=kw.get("alert_enabled", False),
+        created_at=kw.get("created_at"),
+        updated_at=kw.get("updated_at"),
+        latest_rank=latest_rank,
+        prev_rank=prev_rank,
+        rank_change=rank_change,
+        latest_visitor_count=kw.get("latest_visitor_count"),
+        latest_blog_review_count=kw.get("latest_blog_review_count"),
+        latest_collected_at=kw.get("latest_collected_at"),
+    )
+
+
+@db_timed
+async def get_dashboard(db: AsyncClient, store_id: str) -> DashboardSummary:
+    cache_key = ("dashboard", store_id)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    version = response_cache.version()
+
+    store_result = await db.table("stores").select("*").eq("id", store_id).single().execute()
+    store = store_result.data
+
+    keywords_with_rank = [
+        KeywordWithRank(
+            id=kw["id"],
+            keyword=kw["keyword"],
+            is_active=kw["is_active"],
+            latest_rank=_latest_ranking(kw),
         )
+        for kw in await _fetch_dashboard_keywords(db, store_id)
+    ]
 
-    return DashboardSummary(
+    summary = DashboardSummary(
         store_id=store["id"],
         naver_place_id=store["naver_place_id"],
         name=store.get("name"),
@@ -51,80 +89,37 @@ async def get_dashboard(db: Client, store_id: str) -> DashboardSummary:
         keywords=keywords_with_rank,
         updated_at=store.get("updated_at"),
     )
+    tags = [store_tag(store_id), *(keyword_tag(kw.id) for kw in keywords_with_rank)]
+    response_cache.set(cache_key, summary, tags, version=version)
+    return summary
 
 
-async def get_all_dashboard(db: Client) -> list[DashboardStore]:
-    stores_result = db.table("stores").select("*").order("created_at", desc=True).execute()
+@db_timed
+async def get_all_dashboard(db: AsyncClient) -> list[DashboardStore]:
+    cache_key = ("dashboard", None)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    version = response_cache.version()
 
-    dashboard_stores: list[DashboardStore] = []
-    for store in stores_result.data:
-        kw_result = (
-            db.table("tracked_keywords")
-            .select("*")
-            .eq("store_id", store["id"])
-            .order("created_at")
-            .execute()
-        )
+    stores_result = await db.table("stores").select("*").order("created_at", desc=True).execute()
 
-        keywords: list[DashboardKeyword] = []
-        for kw in kw_result.data:
-            snapshots = (
-                db.table("ranking_snapshots")
-                .select("rank_position,visitor_count,blog_review_count,collected_at")
-                .eq("tracked_keyword_id", kw["id"])
-                .order("collected_at", desc=True)
-                .limit(2)
-                .execute()
-            )
-
-            latest_rank: int | None = None
-            prev_rank: int | None = None
-            rank_change: int | None = None
-            latest_visitor_count: int | None = None
-            latest_blog_review_count: int | None = None
-            latest_collected_at: str | None = None
-
-            if snapshots.data:
-                latest_snap = snapshots.data[0]
-                latest_rank = latest_snap.get("rank_position")
-                latest_visitor_count = latest_snap.get("visitor_count")
-                latest_blog_review_count = latest_snap.get("blog_review_count")
-                latest_collected_at = latest_snap.get("collected_at")
-                if len(snapshots.data) > 1:
-                    prev_rank = snapshots.data[1].get("rank_position")
-                if latest_rank is not None and prev_rank is not None:
-                    rank_change = prev_rank - latest_rank
-
-            keywords.append(
-                DashboardKeyword(
-                    id=kw["id"],
-                    store_id=kw.get("store_id"),
-                    keyword=kw["keyword"],
-                    is_active=kw["is_active"],
-                    collection_time=kw.get("collection_time"),
-                    alert_enabled=kw.get("alert_enabled", False),
-                    created_at=kw.get("created_at"),
-                    updated_at=kw.get("updated_at"),
-                    latest_rank=latest_rank,
-                    prev_rank=prev_rank,
-                    rank_change=rank_change,
-                    latest_visitor_count=latest_visitor_count,
-                    latest_blog_review_count=latest_blog_review_count,
-                    latest_collected_at=latest_collected_at,
-                )
-            )
-
-        dashboard_stores.append(
-            DashboardStore(
-                id=store["id"],
-                naver_place_id=store["naver_place_id"],
-                name=store.get("name"),
-                category=store.get("category"),
-                address=store.get("address"),
-                naver_place_url=store.get("naver_place_url"),
-                keywords=keywords,
-                updated_at=store.get("updated_at"),
-            )
-        )
+    keywords_by_store: dict[str, list[DashboardKeyword]] = defaultdict(list)
+    for kw in await _fetch_dashboard_keywords(db):
+        keywords_by_store[kw["store_id"]].append(_dashboard_keyword(kw))
 
+    dashboard_stores = [
+        DashboardStore(
+            id=store["id"],
+            naver_place_id=store["naver_place_id"],
+            name=store.get("name"),
+            category=store.get("category"),
+            address=store.get("address"),
+            naver_place_url=store.get("naver_place_url"),
+            keywords=keywords_by_store.get(store["id"], []),
+            updated_at=store.get("updated_at"),
+        )
+        for store in stores_result.data
+    ]
+    response_cache.set(cache_key, dashboard_stores, [DASHBOARD_ALL_TAG], version=version)
     return dashboard_stores
@@ -1,42 +1,60 @@
-from supabase import Client
+from supabase import AsyncClient
 
+from app.cache import DASHBOARD_ALL_TAG, keyword_tag, response_cache, store_tag
+from app.metrics import db_timed
 from app.models.keywords import KeywordCreate, KeywordResponse, KeywordUpdate
+from app.pagination import keyset_filter
 
 
-async def add_keyword(db: Client, store_id: str, payload: KeywordCreate) -> KeywordResponse:
+@db_timed
+async def add_keyword(db: AsyncClient, store_id: str, payload: KeywordCreate) -> KeywordResponse:
     row = {
         "store_id": store_id,
         "keyword": payload.keyword,
         "collection_time": payload.collection_time.isoformat() if payload.collection_time else None,
         "alert_enabled": payload.alert_enabled,
     }
-    result = db.table("tracked_keywords").insert(row).execute()
+    result = await db.table("tracked_keywords").insert(row).execute()
+    response_cache.invalidate(DASHBOARD_ALL_TAG, store_tag(store_id))
     return KeywordResponse(**result.data[0])
 
 
-async def get_keyword(db: Client, keyword_id: str) -> KeywordResponse:
-    result = db.table("tracked_keywords").select("*").eq("id", keyword_id).single().execute()
+@db_timed
+async def get_keyword(db: AsyncClient, keyword_id: str) -> KeywordResponse:
+    result = await db.table("tracked_keywords").select("*").eq("id", keyword_id).single().execute()
     return KeywordResponse(**result.data)
 
 
-async def list_keywords(db: Client, store_id: str) -> list[KeywordResponse]:
-    result = (
+@db_timed
+async def list_keywords(
+    db: AsyncClient, store_id: str, limit: int | None = None, cursor: str | None = None
+) -> list[KeywordResponse]:
+    query = (
         db.table("tracked_keywords")
         .select("*")
         .eq("store_id", store_id)
         .order("created_at", desc=True)
-        .execute()
+        .order("id", desc=True)
     )
+    if cursor:
+        query = query.or_(keyset_filter("created_at", cursor))
+    if limit:
+        query = query.limit(limit)
+    result = await query.execute()
     return [KeywordResponse(**r) for r in result.data]
 
 
-async def update_keyword(db: Client, keyword_id: str, payload: KeywordUpdate) -> KeywordResponse:
+@db_timed
+async def update_keyword(db: AsyncClient, keyword_id: str, payload: KeywordUpdate) -> KeywordResponse:
     updates = payload.model_dump(exclude_none=True)
     if "collection_time" in updates and updates["collection_time"] is not None:
         updates["collection_time"] = updates["collection_time"].isoformat()
-    result = db.table("tracked_keywords").update(updates).eq("id", keyword_id).execute()
+    result = await db.table("tracked_keywords").update(updates).eq("id", keyword_id).execute()
+    response_cache.invalidate(DASHBOARD_ALL_TAG, keyword_tag(keyword_id))
     return KeywordResponse(**result.data[0])
 
 
-async def delete_keyword(db: Client, keyword_id: str) -> None:
-    db.table("tracked_keywords").delete().eq("id", keyword_id).execute()
+@db_timed
+async def delete_keyword(db: AsyncClient, keyword_id: str) -> None:
+    await db.table("tracked_keywords").delete().eq("id", keyword_id).execute()
+    response_cache.invalidate(DASHBOARD_ALL_TAG, keyword_tag(keyword_id))
@@ -0,0 +1,141 @@
+import logging
+from datetime import datetime, timedelta, timezone
+
+from supabase import AsyncClient
+
+from app.cache import DASHBOARD_ALL_TAG, response_cache, store_tag
+from app.collector.base import StoreInfo
+from app.collector.circuit import CircuitOpenError
+from app.collector.naver_map import collector
+from app.config import settings
+from app.metrics import db_timed
+
+logger = logging.getLogger(__name__)
+
+
+def _cache_row(info: StoreInfo) -> dict:
+    return {
+        "naver_place_id": info.naver_place_id,
+        "name": info.name,
+        "category": info.category,
+        "address": info.address,
+        "naver_place_url": info.naver_place_url,
+        "fetched_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def _store_info(row: dict) -> StoreInfo:
+    return StoreInfo(
+        name=row["name"],
+        category=row.get("category"),
+        address=row.get("address"),
+        naver_place_url=row.get("naver_place_url") or "",
+        naver_place_id=row["naver_place_id"],
+    )
+
+
+def _stale_before() -> datetime:
+    return datetime.now(timezone.utc) - timedelta(hours=settings.PLACE_CACHE_TTL_HOURS)
+
+
+@db_timed
+async def refresh_place_info(db: AsyncClient, place_id: str) -> StoreInfo | None:
+    """Fetch place details from Naver and store them in place_info_cache."""
+    info = await collector.get_store_info(place_id)
+    if info:
+        await db.table("place_info_cache").upsert(_cache_row(info)).execute()
+    return info
+
+
+@db_timed
+async def get_place_info(db: AsyncClient, place_id: str) -> StoreInfo | None:
+    """Place details from place_info_cache, refetched only once the entry is stale.
+
+    If a refresh fails, the stale entry is served rather than nothing.
+    """
+    result = await db.table("place_info_cache").select("*").eq("naver_place_id", place_id).execute()
+    cached = result.data[0] if result.data else None
+    if cached and datetime.fromisoformat(cached["fetched_at"]) > _stale_before():
+        return _store_info(cached)
+
+    try:
+        info = await refresh_place_info(db, place_id)
+    except Exception:
+        if not cached:
+            raise
+        logger.exception("Refresh failed for place_id: %s, serving cached info", place_id)
+        return _store_info(cached)
+    if info is None and cached:
+        logger.warning("Refresh failed for place_id: %s, serving cached info", place_id)
+        return _store_info(cached)
+    return info
+
+
+def _retry_delay(failures: int) -> timedelta:
+    """Wait before retrying a place after `failures` failed refreshes in a row: 1h, 2h, 4h, ... up to the TTL."""
+    return timedelta(hours=min(settings.PLACE_CACHE_TTL_HOURS, 2 ** (failures - 1)))
+
+
+@db_timed
+async def _record_refresh_failure(db: AsyncClient, place_id: str, failures: int) -> None:
+    now = datetime.now(timezone.utc)
+    row = {
+        "naver_place_id": place_id,
+        "failures": failures,
+        "attempted_at": now.isoformat(),
+        "retry_at": (now + _retry_delay(failures)).isoformat(),
+    }
+    await db.table("place_refresh_failures").upsert(row).execute()
+
+
+@db_timed
+async def refresh_tracked_stores(db: AsyncClient, batch_size: int) -> int:
+    """Refresh the `batch_size` tracked stores with stale (or no) cached details, least recently tried first.
+
+    Failures are recorded with an exponential backoff, so places that keep
+    failing neither block the queue nor get retried every run. Only stores
+    whose name/category/address actually changed are written back to
+    `stores` (and their cached responses dropped). While the collector's
+    circuit breaker is open the batch stops without recording failures: the
+    outage is not the places' fault. Returns the number of stores refreshed.
+    """
+    now = datetime.now(timezone.utc).isoformat()
+    cutoff = _stale_before().isoformat()
+    queue = await (
+        db.table("store_place_refresh_queue")
+        .select("store_id, naver_place_id, name, category, address, failures")
+        .or_(f'fetched_at.is.null,fetched_at.lt."{cutoff}"')
+        .lte("retry_at", now)
+        .order("attempted_at", nullsfirst=True)
+        .limit(batch_size)
+        .execute()
+    )
+
+    refreshed = 0
+    for entry in queue.data:
+        place_id = entry["naver_place_id"]
+        try:
+            info = await refresh_place_info(db, place_id)
+        except CircuitOpenError as e:
+            logger.warning("Place refresh paused after %d stores: %s", refreshed, e)
+            break
+        except Exception:
+            logger.exception("Background refresh failed for place_id: %s", place_id)
+            info = None
+        if info is None:
+            await _record_refresh_failure(db, place_id, entry["failures"] + 1)
+            continue
+        if entry["failures"]:
+            await db.table("place_refresh_failures").delete().eq("naver_place_id", place_id).execute()
+        refreshed += 1
+
+        if (info.name, info.category, info.address) == (entry["name"], entry["category"], entry["address"]):
+            continue
+        await (
+            db.table("stores")
+            .update({"name": info.name, "category": info.category, "address": info.address})
+            .eq("id", entry["store_id"])
+            .execute()
+        )
+        response_cache.invalidate(DASHBOARD_ALL_TAG, store_tag(entry["store_id"]))
+    return refreshed
@@ -0,0 +1,160 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from supabase import AsyncClient
+
+from app.config import settings
+from app.events import event_broker
+from app.metrics import db_timed
+from app.services.ranking_service import invalidate_snapshots
+
+logger = logging.getLogger(__name__)
+
+# collected_at is the writing transaction's start, so a row can commit this
+# long after a later one; each relay poll looks back this far.
+RELAY_LOOKBACK = timedelta(seconds=60)
+
+
+@db_timed
+async def enqueue_jobs(db: AsyncClient, slot_at: datetime, collection_minutes: list[int]) -> int:
+    """Queue one collection job per active keyword in the given slots.
+
+    Jobs are unique per (keyword, slot_at), so every scheduler instance may
+    enqueue the same slot. Returns how many jobs were new.
+    """
+    params = {"p_slot_at": slot_at.isoformat(), "p_minutes": collection_minutes}
+    return (await db.rpc("enqueue_collection_jobs", params).execute()).data or 0
+
+
+
+@db_timed
+async def claim_scheduled_run(db: AsyncClient, job: str, fire_time: datetime) -> bool:
+    """Whether this process runs `job`'s run scheduled at `fire_time`.
+
+    Every API process schedules the same cron jobs; like enqueued slots, a
+    run is claimed once per (job, fire_time), so only the first one runs it.
+    """
+    params = {"p_job": job, "p_fire_time": fire_time.isoformat()}
+    return bool((await db.rpc("claim_scheduled_run", params).execute()).data)
+@db_timed
+async def lease_jobs(db: AsyncClient, worker_id: str, limit: int) -> list[dict]:
+    """Lease up to `limit` due jobs for this worker, grouped by keyword.
+
+    Rows are shaped like `ranking_service.list_active_keywords` rows (so they
+    can go straight to `group_by_keyword`) plus `job_id` and `lease_token`.
+    """
+    params = {
+        "p_worker": worker_id,
+        "p_limit": limit,
+        "p_lease_seconds": settings.WORKER_LEASE_SECONDS,
+        "p_max_attempts": settings.WORKER_MAX_ATTEMPTS,
+    }
+    rows = (await db.rpc("lease_collection_jobs", params).execute()).data
+    return [
+        {
+            "id": row["tracked_keyword_id"],
+            "keyword": row["keyword"],
+            "stores": {"naver_place_id": row["naver_place_id"]},
+            "job_id": row["job_id"],
+            "lease_token": row["lease_token"],
+            "slot_at": row["slot_at"],
+        }
+        for row in rows
+    ]
+
+
+@db_timed
+async def complete_jobs(
+    db: AsyncClient, lease_token: str, snapshots: list[dict], serps: list[dict] | None = None
+) -> list[dict]:
+    """Mark jobs done and write their snapshots (and SERPs) in one transaction.
+
+    Each snapshot row carries its `job_id`, each SERP row the `job_ids` it
+    was ranked for. Jobs whose lease has expired (and may have been taken by
+    another worker) are skipped along with their snapshots. Returns the
+    written ranking_snapshots rows (inserted or, in intervals mode, extended).
+    """
+    params = {
+        "p_lease_token": lease_token,
+        "p_snapshots": snapshots,
+        "p_serps": serps or [],
+        "p_extend_unchanged": settings.SNAPSHOT_STORAGE == "intervals",
+    }
+    inserted = (await db.rpc("complete_collection_jobs", params).execute()).data
+    if len(inserted) < len(snapshots):
+        logger.warning("Dropped %d results for jobs whose lease expired", len(snapshots) - len(inserted))
+    invalidate_snapshots(list({row["tracked_keyword_id"] for row in inserted}))
+    event_broker.publish_snapshots(inserted)
+    return inserted
+
+
+@db_timed
+async def renew_jobs(db: AsyncClient, lease_token: str) -> int:
+    """Extend the lease on this batch's unfinished jobs by WORKER_LEASE_SECONDS; returns how many."""
+    params = {"p_lease_token": lease_token, "p_lease_seconds": settings.WORKER_LEASE_SECONDS}
+    return (await db.rpc("renew_collection_jobs", params).execute()).data or 0
+
+
+@db_timed
+async def release_jobs(
+    db: AsyncClient,
+    lease_token: str,
+    job_ids: list[int],
+    error: str | None,
+    delay_seconds: float,
+    count_attempt: bool = True,
+) -> int:
+    """Hand leased jobs back for a later retry (or mark them failed once out of attempts)."""
+    params = {
+        "p_lease_token": lease_token,
+        "p_job_ids": job_ids,
+        "p_error": error,
+        "p_delay_seconds": int(delay_seconds),
+        "p_max_attempts": settings.WORKER_MAX_ATTEMPTS,
+        "p_count_attempt": count_attempt,
+    }
+    return (await db.rpc("release_collection_jobs", params).execute()).data or 0
+
+
+@db_timed
+async def prune_jobs(db: AsyncClient, days: int) -> int:
+    """Delete finished jobs whose slot is older than `days`; returns how many."""
+    return (await db.rpc("prune_collection_jobs", {"p_days": days}).execute()).data or 0
+
+
+@db_timed
+async def _latest_ranks_since(db: AsyncClient, since: datetime) -> list[dict]:
+    query = (
+        db.table("keyword_latest_rank")
+        .select("tracked_keyword_id, rank_position, total_results, visitor_count, blog_review_count, collected_at")
+        .gt("collected_at", since.isoformat())
+        .order("collected_at")
+    )
+    return (await query.execute()).data
+
+
+async def relay_worker_snapshots(db: AsyncClient) -> None:
+    """Bring snapshots written by `app.worker` processes into this API process.
+
+    Workers cannot reach this process's event broker or response cache, so
+    every EVENTS_RELAY_SECONDS the latest ranks that moved are published as
+    "rank" events and their cached responses dropped. Runs until cancelled.
+    """
+    watermark = datetime.now(timezone.utc)
+    relayed: dict[str, str] = {}
+    while True:
+        await asyncio.sleep(settings.EVENTS_RELAY_SECONDS)
+        try:
+            rows = await _latest_ranks_since(db, watermark - RELAY_LOOKBACK)
+        except Exception:
+            logger.exception("Failed to poll worker snapshots")
+            continue
+        fresh = [row for row in rows if relayed.get(row["tracked_keyword_id"]) != row["collected_at"]]
+        if rows:
+            watermark = max(watermark, datetime.fromisoformat(rows[-1]["collected_at"]))
+        # Only what the lookback can still return needs remembering
+        relayed = {row["tracked_keyword_id"]: row["collected_at"] for row in rows}
+        if fresh:
+            invalidate_snapshots(list({row["tracked_keyword_id"] for row in fresh}))
+            event_broker.publish_snapshots(fresh)
@@ -1,44 +1,330 @@
+import logging
+import re
+from collections import Counter, defaultdict
+from collections.abc import AsyncIterator
 from datetime import date
 
-from supabase import Client
+from supabase import AsyncClient
 
-from app.collector.naver_map import collector
-from app.models.rankings import RankingResponse
+from app.cache import DASHBOARD_ALL_TAG, keyword_tag, response_cache
+from app.collector import naver_map
+from app.collector.base import BaseCollector, RankingResult
+from app.config import settings
+from app.events import event_broker
+from app.metrics import db_timed
+from app.models.rankings import RankingAggregateResponse, RankingResponse, Resolution
+from app.pagination import decode_cursor, encode_cursor
 
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_INSERT_CHUNK = 500
+
+
+# The whitespace normalize_keyword() in migration 002 collapses: exactly the
+# characters str.isspace() accepts, spelled out so the database locale
+# cannot change it. Keep the two in sync (tests/test_ranking_service.py).
+KEYWORD_SPACE_RE = re.compile(
+    r"[\u0009-\u000d\u001c-\u0020\u0085\u00a0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000]+"
+)
+
+
+def normalize_keyword(keyword: str) -> str:
+    """Canonical SERP key: same text modulo case and whitespace hits the same pcmap page.
+
+    Matches the SQL normalize_keyword(), which also derives the keyword's
+    collection slot, so both sides group keywords the same way.
+    """
+    return KEYWORD_SPACE_RE.sub(" ", keyword).strip(" ").lower()
+
+
+def group_by_keyword(keywords: list[dict]) -> dict[str, list[dict]]:
+    """Group tracked_keywords rows (joined with stores(naver_place_id)) by normalized keyword."""
+    groups: dict[str, list[dict]] = defaultdict(list)
+    for kw in keywords:
+        groups[normalize_keyword(kw["keyword"])].append(kw)
+    return dict(groups)
 
-async def collect_ranking(db: Client, keyword_id: str) -> RankingResponse:
-    kw_result = db.table("tracked_keywords").select("*, stores(naver_place_id)").eq("id", keyword_id).single().execute()
-    kw = kw_result.data
-    place_id = kw["stores"]["naver_place_id"]
 
-    rank = await collector.find_store_rank(kw["keyword"], place_id)
+def search_spelling(targets: list[dict]) -> str:
+    """The spelling to search a keyword group with: its most common original form.
 
-    row = {
+    The normalized key only decides which rows share a SERP; pcmap is
+    queried with text a user actually typed, not a lowercased rewrite.
+    """
+    return Counter(kw["keyword"].strip() for kw in targets).most_common(1)[0][0]
+
+
+def _serp_row(keyword: str, serp: list[RankingResult]) -> dict | None:
+    """Pack a result list into one serp_snapshots row (array index = rank)."""
+    ranked = {r.rank_position: r for r in serp if r.rank_position and r.place_id.isdigit()}
+    if not ranked:
+        return None
+    depth = max(ranked)
+    entries = [ranked.get(rank) for rank in range(1, depth + 1)]
+    return {
+        "keyword": keyword,
+        "total_results": max(r.total_results or 0 for r in ranked.values()) or None,
+        "place_ids": [int(r.place_id) if r else None for r in entries],
+        "visitor_counts": [r.visitor_count if r else None for r in entries],
+        "blog_review_counts": [r.blog_review_count if r else None for r in entries],
+    }
+
+
+def snapshot_row(keyword_id: str, rank: RankingResult | None) -> dict:
+    return {
         "tracked_keyword_id": keyword_id,
         "rank_position": rank.rank_position if rank else None,
         "total_results": rank.total_results if rank else None,
         "visitor_count": rank.visitor_count if rank else None,
         "blog_review_count": rank.blog_review_count if rank else None,
     }
-    result = db.table("ranking_snapshots").insert(row).execute()
-    return RankingResponse(**result.data[0])
+
+
+def _ranking_response(row: dict) -> RankingResponse:
+    """The observation a written row records.
+
+    An extended row (SNAPSHOT_STORAGE=intervals) was last observed at
+    valid_to; ranking_history lists that point as "<id>:<n>".
+    """
+    if row.get("valid_to") and row.get("samples", 1) > 1:
+        row = {**row, "id": f"{row['id']}:{row['samples'] - 1}", "collected_at": row["valid_to"]}
+    return RankingResponse(**row)
+
+
+@db_timed
+async def collect_ranking(db: AsyncClient, keyword_id: str) -> RankingResponse:
+    kw_result = await db.table("tracked_keywords").select("*, stores(naver_place_id)").eq("id", keyword_id).single().execute()
+    kw = kw_result.data
+    place_id = kw["stores"]["naver_place_id"]
+
+    serp: list[RankingResult] = []
+    ranks = await naver_map.collector.find_store_ranks(kw["keyword"], {place_id}, serp=serp)
+
+    # SERP before the snapshot, so the invalidation below also covers it
+    serp_row = _serp_row(normalize_keyword(kw["keyword"]), serp)
+    if serp_row:
+        await insert_serps(db, [serp_row])
+    result = await _write_snapshots(db, [snapshot_row(keyword_id, ranks[place_id])])
+    invalidate_snapshots([keyword_id])
+    event_broker.publish_snapshots(result)
+    return _ranking_response(result[0])
+
+
+def invalidate_snapshots(keyword_ids: list[str]) -> None:
+    """Drop cached dashboard/ranking responses that new snapshots make stale."""
+    response_cache.invalidate(DASHBOARD_ALL_TAG, *(keyword_tag(k) for k in keyword_ids))
+
+
+@db_timed
+async def list_active_keywords(db: AsyncClient, collection_minutes: list[int] | None = None) -> list[dict]:
+    """Active tracked_keywords joined with their store's place ID, in one query.
+
+    When `collection_minutes` is given, only keywords in those scheduler slots
+    are returned.
+    """
+    query = (
+        db.table("tracked_keywords")
+        .select("id, keyword, stores(naver_place_id)")
+        .eq("is_active", True)
+    )
+    if collection_minutes is not None:
+        query = query.in_("collection_minute", collection_minutes)
+    return (await query.execute()).data
+
+
+async def rank_keyword_group(
+    keyword: str, targets: list[dict], *, collector: BaseCollector | None = None
+) -> tuple[list[dict], dict | None]:
+    """Rank one keyword for every store tracking it with a single SERP fetch.
+
+    `targets` are rows from `list_active_keywords`, as grouped by
+    `group_by_keyword`: `keyword` is the normalized group key, which keys
+    the SERP row, while pcmap is searched with `search_spelling(targets)`. Returns
+    ranking_snapshots rows ready for `insert_snapshots`, plus the full result
+    list as a serp_snapshots row for `insert_serps` (None if it was empty).
+    `collector` defaults to the shared pcmap collector.
+    """
+    place_ids = {kw["stores"]["naver_place_id"] for kw in targets}
+    serp: list[RankingResult] = []
+    ranks = await (collector or naver_map.collector).find_store_ranks(search_spelling(targets), place_ids, serp=serp)
+    rows = [snapshot_row(kw["id"], ranks.get(kw["stores"]["naver_place_id"])) for kw in targets]
+    return rows, _serp_row(keyword, serp)
+
+
+async def _write_snapshots(db: AsyncClient, rows: list[dict]) -> list[dict]:
+    if settings.SNAPSHOT_STORAGE == "intervals":
+        # record_snapshots extends unchanged keywords' latest row instead of inserting
+        params = {"p_rows": rows, "p_extend_unchanged": True}
+        return (await db.rpc("record_snapshots", params).execute()).data
+    return (await db.table("ranking_snapshots").insert(rows).execute()).data
+
+
+@db_timed
+async def insert_snapshots(db: AsyncClient, rows: list[dict], chunk_size: int = SNAPSHOT_INSERT_CHUNK) -> tuple[list[dict], list[dict]]:
+    """Write snapshot rows in multi-row inserts of `chunk_size`.
+
+    A chunk that fails is retried row by row, so one bad row only loses
+    itself. Returns (inserted, failed) rows; with SNAPSHOT_STORAGE=intervals
+    "inserted" also holds the extended rows of unchanged keywords.
+    """
+    inserted: list[dict] = []
+    failed: list[dict] = []
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start : start + chunk_size]
+        try:
+            inserted.extend(await _write_snapshots(db, chunk))
+            continue
+        except Exception:
+            logger.exception("Snapshot chunk insert failed (%d rows), retrying row by row", len(chunk))
+
+        for row in chunk:
+            try:
+                inserted.extend(await _write_snapshots(db, [row]))
+            except Exception:
+                logger.exception("Failed to insert snapshot for keyword %s", row["tracked_keyword_id"])
+                failed.append(row)
+
+    invalidate_snapshots(list({row["tracked_keyword_id"] for row in inserted}))
+    event_broker.publish_snapshots(inserted)
+    return inserted, failed
+
+
+@db_timed
+async def insert_serps(db: AsyncClient, rows: list[dict]) -> int:
+    """Write serp_snapshots rows in one insert; returns how many were stored.
+
+    Competitor history is secondary to our own ranks, so a failed write is
+    logged rather than failing the collection.
+    """
+    try:
+        return len((await db.table("serp_snapshots").insert(rows).execute()).data)
+    except Exception:
+        logger.exception("Failed to insert %d SERP snapshots", len(rows))
+        return 0
+
+
+@db_timed
+async def collect_keyword_group(db: AsyncClient, keyword: str, targets: list[dict]) -> list[RankingResponse]:
+    """Rank and store one keyword for every store tracking it."""
+    rows, serp_row = await rank_keyword_group(keyword, targets)
+    # SERP before the snapshots, whose write invalidates the cached competitor responses
+    if serp_row:
+        await insert_serps(db, [serp_row])
+    inserted, _ = await insert_snapshots(db, rows)
+    return [_ranking_response(r) for r in inserted]
+
+
+@db_timed
+async def ensure_snapshot_partitions(db: AsyncClient) -> None:
+    await db.rpc("ensure_snapshot_partitions", {"p_months_ahead": settings.SNAPSHOT_PARTITIONS_AHEAD}).execute()
+
+
+@db_timed
+async def apply_snapshot_retention(db: AsyncClient, raw_days: int) -> int:
+    """Drop monthly snapshot partitions entirely older than `raw_days`; returns how many."""
+    dropped = (await db.rpc("apply_snapshot_retention", {"p_raw_days": raw_days}).execute()).data
+    return dropped or 0
+
+
+@db_timed
+async def prune_serp_snapshots(db: AsyncClient, days: int) -> int:
+    """Delete serp_snapshots rows older than `days`; returns how many."""
+    return (await db.rpc("prune_serp_snapshots", {"p_days": days}).execute()).data or 0
 
 
 async def get_rankings(
-    db: Client,
+    db: AsyncClient,
     keyword_id: str,
     date_from: date | None = None,
     date_to: date | None = None,
+    limit: int | None = None,
+    cursor: str | None = None,
 ) -> list[RankingResponse]:
-    query = (
-        db.table("ranking_snapshots")
-        .select("*")
-        .eq("tracked_keyword_id", keyword_id)
-        .order("collected_at", desc=True)
-    )
-    if date_from:
-        query = query.gte("collected_at", date_from.isoformat())
-    if date_to:
-        query = query.lte("collected_at", date_to.isoformat() + "T23:59:59")
-    result = query.execute()
-    return [RankingResponse(**r) for r in result.data]
+    cache_key = ("rankings", keyword_id, date_from, date_to, limit, cursor)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    version = response_cache.version()
+
+    rows = await _fetch_ranking_history(db, keyword_id, date_from, date_to, limit, cursor)
+    rankings = [RankingResponse(**r) for r in rows]
+    response_cache.set(cache_key, rankings, [keyword_tag(keyword_id)], version=version)
+    return rankings
+
+
+@db_timed
+async def _fetch_ranking_history(
+    db: AsyncClient,
+    keyword_id: str,
+    date_from: date | None,
+    date_to: date | None,
+    limit: int | None,
+    cursor: str | None,
+) -> list[dict]:
+    # ranking_history stitches ranking_daily in front of the oldest raw
+    # snapshot, so ranges reaching past the retention window stay contiguous.
+    # The cursor and limit go into the function so each page is an index range
+    # scan, not a filter over the whole history.
+    before_at, before_id = decode_cursor(cursor) if cursor else (None, None)
+    params = {
+        "p_keyword_id": keyword_id,
+        "p_from": date_from.isoformat() if date_from else None,
+        "p_to": date_to.isoformat() + "T23:59:59" if date_to else None,
+        "p_before_at": before_at,
+        "p_before_id": before_id,
+        "p_limit": limit,
+    }
+    query = db.rpc("ranking_history", params).order("collected_at", desc=True).order("id", desc=True)
+    return (await query.execute()).data
+
+
+async def iter_rankings(
+    db: AsyncClient,
+    keyword_id: str,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    batch_size: int = 1000,
+) -> AsyncIterator[dict]:
+    """Yield raw ranking rows newest first, one keyset page at a time.
+
+    Only one page is held in memory, so exporting years of history stays flat.
+    """
+    cursor: str | None = None
+    while True:
+        rows = await _fetch_ranking_history(db, keyword_id, date_from, date_to, batch_size, cursor)
+        for row in rows:
+            yield row
+        if len(rows) < batch_size:
+            return
+        cursor = encode_cursor(rows[-1]["collected_at"], rows[-1]["id"])
+
+
+@db_timed
+async def get_ranking_series(
+    db: AsyncClient,
+    keyword_id: str,
+    resolution: Resolution,
+    date_from: date | None = None,
+    date_to: date | None = None,
+) -> list[RankingAggregateResponse]:
+    """Rank history aggregated per hour/day/week bucket in the database.
+
+    Day and week buckets read the ranking_daily rollup, so long ranges cost
+    one row per bucket instead of one per hourly snapshot.
+    """
+    cache_key = ("ranking_series", keyword_id, resolution, date_from, date_to)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    version = response_cache.version()
+
+    params = {
+        "p_keyword_id": keyword_id,
+        "p_resolution": resolution,
+        "p_from": date_from.isoformat() if date_from else None,
+        "p_to": date_to.isoformat() if date_to else None,
+    }
+    result = await db.rpc("ranking_series", params).execute()
+    series = [RankingAggregateResponse(tracked_keyword_id=keyword_id, **r) for r in result.data]
+    response_cache.set(cache_key, series, [keyword_tag(keyword_id)], version=version)
+    return series
@@ -0,0 +1,176 @@
+import asyncio
+import logging
+import multiprocessing
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from supabase import AsyncClient
+
+from app.collector.archive import ArchivedPage, PageArchive, parse_archived_search_page
+from app.collector.base import RankingResult
+from app.collector.naver_map import ranking_result
+from app.metrics import db_timed
+from app.services.ranking_service import SNAPSHOT_INSERT_CHUNK, group_by_keyword, normalize_keyword, snapshot_row
+
+logger = logging.getLogger(__name__)
+
+# Deeper pages of one rank walk are fetched right after its first page.
+WALK_MAX_SECONDS = 600
+# Walks whose pages are parsed concurrently before their rows are written.
+WALK_BATCH = 200
+
+
+@dataclass
+class Walk:
+    """Archived pages of one rank search: the start=1 page and any deeper pages."""
+
+    keyword: str
+    at: datetime
+    pages: list[ArchivedPage] = field(default_factory=list)
+
+
+@dataclass
+class ReparseStats:
+    walks: int = 0
+    pages: int = 0
+    # Walks whose first page still has no result list with the current parser
+    unparsed: int = 0
+    rows: int = 0
+    deleted: int = 0
+    inserted: int = 0
+    # Rows older than the oldest raw snapshot partition (only ranking_daily is left there)
+    skipped: int = 0
+
+    def summary(self) -> str:
+        return (
+            f"{self.walks} walks ({self.pages} pages, {self.unparsed} unparsed) -> "
+            f"{self.rows} rows, {self.inserted} inserted, {self.deleted} replaced, "
+            f"{self.skipped} before the raw retention horizon"
+        )
+
+
+def iter_walks(pages: Iterable[ArchivedPage]) -> Iterator[Walk]:
+    """Group archived search pages (in fetch order) into rank walks per normalized keyword."""
+    open_walks: dict[str, Walk] = {}
+    for page in pages:
+        keyword = normalize_keyword(page.keyword or "")
+        walk = open_walks.get(keyword)
+        if (page.start or 1) > 1:
+            if walk and (page.at - walk.at).total_seconds() <= WALK_MAX_SECONDS:
+                walk.pages.append(page)
+            continue
+        if walk:
+            yield walk
+        open_walks[keyword] = Walk(keyword, page.at, [page])
+    yield from open_walks.values()
+
+
+def rank_walk(pages: list[list[dict] | None], place_ids: set[str]) -> dict[str, RankingResult | None] | None:
+    """Ranks of `place_ids` across a walk's parsed pages, as find_store_ranks walks them.
+
+    Returns None when the first page has no result list, so a page the
+    parser still cannot read is never recorded as "not ranked".
+    """
+    if not pages or not pages[0]:
+        return None
+    ranks: dict[str, RankingResult | None] = dict.fromkeys(place_ids)
+    seen: set[str] = set()
+    depth = 0
+    for entries in pages:
+        if not entries:
+            break
+        new_entries = [entry for entry in entries if entry["ref"] not in seen]
+        for rank, entry in enumerate(new_entries, start=depth + 1):
+            place_id = str(entry.get("id", ""))
+            if place_id in ranks and ranks[place_id] is None:
+                ranks[place_id] = ranking_result(entry, rank, depth + len(entries))
+        seen.update(entry["ref"] for entry in new_entries)
+        depth += len(new_entries)
+    return ranks
+
+
+@db_timed
+async def _tracked_keywords(db: AsyncClient) -> list[dict]:
+    # Inactive keywords too: their history may fall inside the range.
+    return (await db.table("tracked_keywords").select("id, keyword, created_at, stores(naver_place_id)").execute()).data
+
+
+@db_timed
+async def write_reparsed(
+    db: AsyncClient, rows: list[dict], window_seconds: int, replace: bool
+) -> tuple[int, int, int]:
+    """Apply re-parsed rows via the reparse_snapshots RPC; returns (deleted, inserted, skipped)."""
+    params = {"p_rows": rows, "p_window_seconds": window_seconds, "p_replace": replace}
+    result = (await db.rpc("reparse_snapshots", params).execute()).data[0]
+    return result["deleted"], result["inserted"], result["skipped"]
+
+
+async def reparse_archive(
+    db: AsyncClient,
+    archive: PageArchive,
+    start: datetime,
+    end: datetime,
+    *,
+    window_seconds: int,
+    replace: bool = False,
+    processes: int | None = None,
+    dry_run: bool = False,
+) -> ReparseStats:
+    """Re-run archived search pages fetched in [start, end] through the current parser.
+
+    Pages are decompressed and parsed in a process pool, `WALK_BATCH` walks
+    at a time, so the archive is streamed rather than loaded. Each walk
+    yields one ranking_snapshots row per keyword tracking it at the time,
+    stamped with the page's fetch time. Rows fill gaps where no snapshot lies
+    within `window_seconds`; with `replace`, observations in the window are
+    replaced (rebuild the rollups afterwards). Rows older than the oldest raw
+    snapshot partition are skipped.
+    """
+    targets = group_by_keyword(await _tracked_keywords(db))
+    stats = ReparseStats()
+    loop = asyncio.get_running_loop()
+
+    async def flush(batch: list[Walk]) -> None:
+        paths = [str(page.path) for walk in batch for page in walk.pages]
+        parsed = iter(
+            await asyncio.gather(*(loop.run_in_executor(pool, parse_archived_search_page, path) for path in paths))
+        )
+        rows: list[dict] = []
+        for walk in batch:
+            pages = [next(parsed) for _ in walk.pages]
+            stats.walks += 1
+            stats.pages += len(pages)
+            keywords = [kw for kw in targets[walk.keyword] if datetime.fromisoformat(kw["created_at"]) <= walk.at]
+            ranks = rank_walk(pages, {kw["stores"]["naver_place_id"] for kw in keywords})
+            if ranks is None:
+                stats.unparsed += 1
+                continue
+            for kw in keywords:
+                row = snapshot_row(kw["id"], ranks[kw["stores"]["naver_place_id"]])
+                rows.append({**row, "collected_at": walk.at.isoformat()})
+
+        stats.rows += len(rows)
+        if dry_run:
+            return
+        for i in range(0, len(rows), SNAPSHOT_INSERT_CHUNK):
+            chunk = rows[i : i + SNAPSHOT_INSERT_CHUNK]
+            deleted, inserted, skipped = await write_reparsed(db, chunk, window_seconds, replace)
+            stats.deleted += deleted
+            stats.inserted += inserted
+            stats.skipped += skipped
+        logger.info("Re-parsed %s", stats.summary())
+
+    with ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context("spawn")) as pool:
+        batch: list[Walk] = []
+        for walk in iter_walks(archive.iter_pages(start, end, kind="search")):
+            if walk.keyword not in targets:
+                continue
+            batch.append(walk)
+            if len(batch) >= WALK_BATCH:
+                await flush(batch)
+                batch = []
+        if batch:
+            await flush(batch)
+    return stats
@@ -1,32 +1,133 @@
-from supabase import Client
+import asyncio
+import logging
 
-from app.collector.naver_map import collector
-from app.models.stores import StoreCreate, StoreResponse
+from supabase import AsyncClient
 
+from app.cache import DASHBOARD_ALL_TAG, keyword_tag, response_cache, store_tag
+from app.collector.base import StoreInfo
+from app.collector.circuit import CircuitOpenError
+from app.config import settings
+from app.metrics import db_timed
+from app.models.stores import StoreBulkCreate, StoreBulkItem, StoreCreate, StoreResponse
+from app.pagination import keyset_filter
+from app.services import place_service
 
-async def create_store(db: Client, payload: StoreCreate) -> StoreResponse:
-    info = await collector.get_store_info(payload.naver_place_id)
+logger = logging.getLogger(__name__)
 
-    row = {
-        "naver_place_id": payload.naver_place_id,
-        "name": info.name if info else payload.naver_place_id,
+
+def _store_row(place_id: str, info: StoreInfo | None) -> dict:
+    return {
+        "naver_place_id": place_id,
+        "name": info.name if info else place_id,
         "category": info.category if info else None,
         "address": info.address if info else None,
         "naver_place_url": info.naver_place_url if info else None,
     }
-    result = db.table("stores").insert(row).execute()
+
+
+@db_timed
+async def create_store(db: AsyncClient, payload: StoreCreate) -> StoreResponse:
+    info = await place_service.get_place_info(db, payload.naver_place_id)
+
+    result = await db.table("stores").insert(_store_row(payload.naver_place_id, info)).execute()
+    response_cache.invalidate(DASHBOARD_ALL_TAG)
     return StoreResponse(**result.data[0])
 
 
-async def get_store(db: Client, store_id: str) -> StoreResponse:
-    result = db.table("stores").select("*").eq("id", store_id).single().execute()
+@db_timed
+async def create_stores_bulk(db: AsyncClient, payload: StoreBulkCreate) -> list[StoreBulkItem]:
+    """Register many stores at once, e.g. all branches of a franchise.
+
+    Place IDs already in `stores` are reported as "exists". The rest are
+    enriched concurrently (bounded by COLLECT_CONCURRENCY, paced by the
+    collector's per-host rate limiter) and inserted in a single batch; if
+    that batch fails, row by row, so one bad row only fails itself.
+    CircuitOpenError propagates: the caller should retry the whole request.
+    """
+    place_ids = list(dict.fromkeys(payload.naver_place_ids))
+
+    existing_result = await db.table("stores").select("*").in_("naver_place_id", place_ids).execute()
+    items = {
+        r["naver_place_id"]: StoreBulkItem(naver_place_id=r["naver_place_id"], status="exists", store=StoreResponse(**r))
+        for r in existing_result.data
+    }
+
+    semaphore = asyncio.Semaphore(settings.COLLECT_CONCURRENCY)
+
+    async def enrich(place_id: str) -> dict | None:
+        async with semaphore:
+            try:
+                return _store_row(place_id, await place_service.get_place_info(db, place_id))
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                logger.exception("Store info lookup failed for place_id: %s", place_id)
+                items[place_id] = StoreBulkItem(naver_place_id=place_id, status="failed", error=str(e) or type(e).__name__)
+                return None
+
+    pending = [pid for pid in place_ids if pid not in items]
+    rows = [row for row in await asyncio.gather(*(enrich(pid) for pid in pending)) if row]
+
+    async def insert(batch: list[dict]) -> list[dict]:
+        # A concurrent registration may have won the race; ignore_duplicates
+        # skips those rows instead of failing the whole batch.
+        result = await (
+            db.table("stores")
+            .upsert(batch, on_conflict="naver_place_id", ignore_duplicates=True)
+            .execute()
+        )
+        return result.data
+
+    created: list[dict] = []
+    if rows:
+        try:
+            created = await insert(rows)
+        except Exception:
+            logger.exception("Bulk store insert failed (%d rows), retrying row by row", len(rows))
+            for row in rows:
+                try:
+                    created.extend(await insert([row]))
+                except Exception as e:
+                    logger.exception("Failed to insert store for place_id: %s", row["naver_place_id"])
+                    items[row["naver_place_id"]] = StoreBulkItem(
+                        naver_place_id=row["naver_place_id"], status="failed", error=str(e) or type(e).__name__
+                    )
+    for r in created:
+        items[r["naver_place_id"]] = StoreBulkItem(
+            naver_place_id=r["naver_place_id"], status="created", store=StoreResponse(**r)
+        )
+    if created:
+        response_cache.invalidate(DASHBOARD_ALL_TAG)
+
+    for row in rows:
+        items.setdefault(row["naver_place_id"], StoreBulkItem(naver_place_id=row["naver_place_id"], status="exists"))
+
+    return [items[pid] for pid in place_ids]
+
+
+@db_timed
+async def get_store(db: AsyncClient, store_id: str) -> StoreResponse:
+    result = await db.table("stores").select("*").eq("id", store_id).single().execute()
     return StoreResponse(**result.data)
 
 
-async def list_stores(db: Client) -> list[StoreResponse]:
-    result = db.table("stores").select("*").order("created_at", desc=True).execute()
+@db_timed
+async def list_stores(db: AsyncClient, limit: int | None = None, cursor: str | None = None) -> list[StoreResponse]:
+    query = db.table("stores").select("*").order("created_at", desc=True).order("id", desc=True)
+    if cursor:
+        query = query.or_(keyset_filter("created_at", cursor))
+    if limit:
+        query = query.limit(limit)
+    result = await query.execute()
     return [StoreResponse(**r) for r in result.data]
 
 
-async def delete_store(db: Client, store_id: str) -> None:
-    db.table("stores").delete().eq("id", store_id).execute()
+@db_timed
+async def delete_store(db: AsyncClient, store_id: str) -> None:
+    # Keywords (and their snapshots) are removed by ON DELETE CASCADE, so
+    # look them up first to drop their cached rankings too.
+    kw_result = await db.table("tracked_keywords").select("id").eq("store_id", store_id).execute()
+    await db.table("stores").delete().eq("id", store_id).execute()
+    response_cache.invalidate(
+        DASHBOARD_ALL_TAG, store_tag(store_id), *(keyword_tag(kw["id"]) for kw in kw_result.data)
+    )
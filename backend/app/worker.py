@@ -0,0 +1,176 @@
+"""Collection worker: python -m app.worker
+
+Leases collection jobs queued by the scheduler (COLLECT_MODE=queue, see
+migration 008) and writes their snapshots. Any number of workers can run
+side by side, on any machine that can reach Supabase.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import socket
+from contextlib import suppress
+
+from prometheus_client import start_http_server
+from supabase import AsyncClient
+
+from app.collector.circuit import CircuitOpenError
+from app.collector.naver_map import collector, fetch_timings
+from app.config import settings
+from app.deps import close_supabase, get_supabase
+from app.metrics import JOB_SECONDS
+from app.scheduler.engine import CollectionStats
+from app.services import queue_service, ranking_service
+
+logger = logging.getLogger(__name__)
+
+
+async def renew_lease(db: AsyncClient, lease_token: str) -> None:
+    """Keep a batch's lease alive until cancelled, so slow batches are not collected twice."""
+    while True:
+        await asyncio.sleep(settings.WORKER_LEASE_SECONDS / 3)
+        try:
+            await queue_service.renew_jobs(db, lease_token)
+        except Exception:
+            logger.exception("Failed to renew lease %s", lease_token)
+
+
+async def process_jobs(db: AsyncClient, jobs: list[dict], concurrency: int) -> CollectionStats:
+    """Collect one leased batch; every group shares a single SERP fetch.
+
+    Results are committed together with their jobs, failed groups are handed
+    back for a retry, and groups skipped by the circuit breaker are handed
+    back without counting an attempt. The lease is renewed while the batch
+    runs.
+    """
+    lease_token = jobs[0]["lease_token"]
+    groups = ranking_service.group_by_keyword(jobs)
+    stats = CollectionStats(keywords=len(jobs), searches=len(groups))
+    semaphore = asyncio.Semaphore(concurrency)
+    results: list[dict] = []
+    serps: list[dict] = []
+
+    async def collect(keyword: str, targets: list[dict]) -> None:
+        job_ids = [t["job_id"] for t in targets]
+        async with semaphore:
+            try:
+                rows, serp_row = await ranking_service.rank_keyword_group(keyword, targets)
+            except CircuitOpenError as e:
+                stats.deferred.extend(targets)
+                stats.resume_in = max(stats.resume_in, e.retry_in)
+                await queue_service.release_jobs(db, lease_token, job_ids, None, e.retry_in, count_attempt=False)
+                return
+            except Exception as e:
+                stats.failed += len(targets)
+                logger.exception("Failed to collect ranking for keyword '%s'", keyword)
+                await queue_service.release_jobs(
+                    db, lease_token, job_ids, f"{type(e).__name__}: {e}", settings.WORKER_RETRY_DELAY_SECONDS
+                )
+                return
+        results.extend({**row, "job_id": t["job_id"]} for t, row in zip(targets, rows))
+        if serp_row:
+            serps.append({**serp_row, "job_ids": job_ids})
+        stats.not_found += sum(1 for row in rows if row["rank_position"] is None)
+
+    token = fetch_timings.set(stats.fetch_latencies)
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    renewer = asyncio.create_task(renew_lease(db, lease_token))
+    try:
+        # Every group runs to the end even if handing another one back failed
+        outcomes = await asyncio.gather(
+            *(collect(kw, targets) for kw, targets in groups.items()), return_exceptions=True
+        )
+        for (keyword, targets), outcome in zip(groups.items(), outcomes):
+            if isinstance(outcome, Exception):
+                # Their lease expires and another worker picks them up
+                logger.error(
+                    "Failed to release %d jobs for keyword '%s': %s", len(targets), keyword, outcome, exc_info=outcome
+                )
+            elif isinstance(outcome, BaseException):
+                raise outcome
+        if results:
+            inserted = await queue_service.complete_jobs(db, lease_token, results, serps)
+            stats.written = len(inserted)
+    finally:
+        renewer.cancel()
+        with suppress(asyncio.CancelledError):
+            await renewer
+        stats.elapsed = loop.time() - started
+        fetch_timings.reset(token)
+        stats.observe()
+        JOB_SECONDS.labels("worker_batch").observe(stats.elapsed)
+    return stats
+
+
+async def release_batch(db: AsyncClient, jobs: list[dict], error: str) -> None:
+    """Hand back whatever a failed batch still holds; completed jobs are left alone."""
+    try:
+        await queue_service.release_jobs(
+            db, jobs[0]["lease_token"], [job["job_id"] for job in jobs], error, settings.WORKER_RETRY_DELAY_SECONDS
+        )
+    except Exception:
+        # The lease expires and another worker picks the jobs up
+        logger.exception("Failed to release %d jobs", len(jobs))
+
+
+async def run_worker(worker_id: str, concurrency: int, batch_size: int, stop: asyncio.Event) -> None:
+    db = await get_supabase()
+    logger.info("Worker %s started (concurrency=%d, batch=%d)", worker_id, concurrency, batch_size)
+
+    while not stop.is_set():
+        # Don't lease jobs only to hand them straight back.
+        idle = collector.circuit_breaker.retry_in()
+        if not idle:
+            try:
+                jobs = await queue_service.lease_jobs(db, worker_id, batch_size)
+            except Exception:
+                logger.exception("Failed to lease collection jobs")
+                jobs = []
+            if jobs:
+                try:
+                    stats = await process_jobs(db, jobs, concurrency)
+                    logger.info("Batch finished: %s", stats.summary())
+                except Exception as e:
+                    logger.exception("Batch of %d jobs failed, releasing it", len(jobs))
+                    await release_batch(db, jobs, f"{type(e).__name__}: {e}")
+                continue
+            idle = settings.WORKER_POLL_SECONDS
+        with suppress(TimeoutError):
+            await asyncio.wait_for(stop.wait(), idle)
+
+    logger.info("Worker %s stopped", worker_id)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.worker")
+    parser.add_argument("--id", default=f"{socket.gethostname()}:{os.getpid()}", help="worker name recorded on leases")
+    parser.add_argument("--concurrency", type=int, default=settings.COLLECT_CONCURRENCY)
+    parser.add_argument("--batch-size", type=int, default=settings.WORKER_BATCH_SIZE)
+    parser.add_argument("--metrics-port", type=int, default=None, help="serve Prometheus metrics on this port")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    if args.metrics_port:
+        start_http_server(args.metrics_port)
+    asyncio.run(_run(args))
+
+
+async def _run(args: argparse.Namespace) -> None:
+    # Finish the current batch on SIGINT/SIGTERM; unfinished leases expire
+    # and are picked up by another worker.
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    try:
+        await collector.start()
+        await run_worker(args.id, args.concurrency, args.batch_size, stop)
+    finally:
+        await collector.close()
+        await close_supabase()
+
+
+if __name__ == "__main__":
+    main()
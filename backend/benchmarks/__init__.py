@@ -0,0 +1,14 @@
+"""Benchmarks for the collector and services. Run from backend/ as `python -m benchmarks.<name>`."""
+
+import os
+
+# app.config requires Supabase settings at import time; benchmarks that never
+# touch a real project only need placeholders.
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "benchmark")
+os.environ.setdefault("SUPABASE_ANON_KEY", "benchmark")
+# Exercise the Local Search API enrichment path against replayed fixtures.
+os.environ.setdefault("NAVER_CLIENT_ID", "benchmark")
+os.environ.setdefault("NAVER_CLIENT_SECRET", "benchmark")
+# Replayed responses need no politeness delay unless --delay asks for one.
+os.environ.setdefault("REQUEST_JITTER", "0")
@@ -0,0 +1,81 @@
+"""CPU time and peak memory of __APOLLO_STATE__ extraction.
+
+    python -m benchmarks.apollo_parse [--pages DIR] [--repeat 50]
+
+Compares the current extractor against the previous brace-counting one over
+recorded pcmap pages (see benchmarks.fixtures) and prints one JSON line per page.
+"""
+
+import argparse
+import json
+import logging
+import re
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+
+from benchmarks.fixtures import load_pcmap_pages
+
+from app.collector.apollo import extract_state
+
+_APOLLO_STATE_RE = re.compile(r"window\.__APOLLO_STATE__\s*=\s*")
+
+
+def _extract_apollo_state_legacy(html: str) -> dict | None:
+    """The original per-character brace counter, kept as the baseline."""
+    m = _APOLLO_STATE_RE.search(html)
+    if not m:
+        return None
+    start = m.end()
+    depth = 0
+    for i, ch in enumerate(html[start:], start):
+        if ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                try:
+                    return json.loads(html[start : i + 1])
+                except json.JSONDecodeError:
+                    return None
+    return None
+
+
+def measure(fn: Callable[[str], dict | None], html: str, repeat: int) -> dict:
+    started = time.process_time()
+    for _ in range(repeat):
+        state = fn(html)
+    cpu_ms = (time.process_time() - started) / repeat * 1000
+
+    tracemalloc.start()
+    fn(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"cpu_ms": round(cpu_ms, 3), "peak_kb": round(peak / 1024, 1), "ok": bool(state and "ROOT_QUERY" in state)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=Path, default=None, help="directory of recorded pcmap .html pages")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    for name, html in load_pcmap_pages(args.pages).items():
+        current = measure(extract_state, html, args.repeat)
+        legacy = measure(_extract_apollo_state_legacy, html, args.repeat)
+        speedup = legacy["cpu_ms"] / current["cpu_ms"] if current["cpu_ms"] else None
+        print(json.dumps({
+            "benchmark": "apollo_parse",
+            "page": name,
+            "page_kb": round(len(html.encode()) / 1024, 1),
+            "current": current,
+            "legacy": legacy,
+            "speedup": round(speedup, 1) if speedup else None,
+        }, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Recorded and synthetic Naver responses for benchmarks.
+
+Recorded pcmap list pages live in benchmarks/fixtures/pcmap/*.html and Local
+Search API responses in benchmarks/fixtures/local_api/*.json (save raw response
+bodies there). When none are present, synthetic responses with the same layout
+are generated so the benchmarks still run.
+"""
+
+import asyncio
+import itertools
+import json
+import random
+from pathlib import Path
+
+import httpx
+
+from app.collector.naver_map import NAVER_API_URL, PLACE_DETAIL_URL, SEARCH_URL
+
+FIXTURE_DIR = Path(__file__).parent / "fixtures"
+PCMAP_DIR = FIXTURE_DIR / "pcmap"
+LOCAL_API_DIR = FIXTURE_DIR / "local_api"
+
+
+def load_pcmap_pages(directory: Path | None = None) -> dict[str, str]:
+    """Recorded pages by file name, or one synthetic page if there are none."""
+    directory = directory or PCMAP_DIR
+    pages = {p.name: p.read_text(encoding="utf-8") for p in sorted(directory.glob("*.html"))}
+    return pages or {"synthetic.html": synthetic_search_page()}
+
+
+def synthetic_search_page(
+    place_ids: list[str] | None = None,
+    extra_entries: int = 1500,
+    seed: int = 0,
+) -> str:
+    """A pcmap list page whose __APOLLO_STATE__ mimics the real layout.
+
+    `extra_entries` unrelated Apollo entries pad the state to roughly the size
+    of a real page (a few hundred KB).
+    """
+    rng = random.Random(seed)
+    place_ids = place_ids or [str(1_000_000 + i) for i in range(50)]
+
+    state: dict[str, object] = {}
+    refs = []
+    for pid in place_ids:
+        ref = f"RestaurantListSummary:{pid}"
+        refs.append({"__ref": ref})
+        state[ref] = {
+            "__typename": "RestaurantListSummary",
+            "id": pid,
+            "name": f"테스트 식당 {pid}",
+            "category": "한식>고기요리",
+            "roadAddress": "서울 강남구 테헤란로 {}길".format(rng.randint(1, 99)),
+            "visitorReviewCount": str(rng.randint(0, 20000)),
+            "blogCafeReviewCount": str(rng.randint(0, 5000)),
+            # Balanced braces inside strings: the legacy brace counter still
+            # parses these, so both extractors can be compared.
+            "microReview": ["분위기 {최고} 입니다", "가성비 좋아요"],
+            "imageUrl": f"https://ldb-phinf.pstatic.net/{pid}/image.jpg",
+        }
+    for i in range(extra_entries):
+        state[f"Image:{i}"] = {
+            "__typename": "Image",
+            "url": f"https://ldb-phinf.pstatic.net/{i}/{rng.getrandbits(64):x}.jpg",
+            "desc": "메뉴 사진 " * rng.randint(1, 8),
+        }
+    state["ROOT_QUERY"] = {
+        "__typename": "Query",
+        'restaurantList({"input":{"query":"강남 맛집","start":1,"display":50}})': {
+            "__typename": "RestaurantListResult",
+            "total": len(place_ids),
+            "items": refs,
+        },
+    }
+
+    body = json.dumps(state, ensure_ascii=False)
+    return (
+        "<!DOCTYPE html><html><head><title>네이버 지도</title></head><body><div id=\"app-root\"></div>"
+        f"<script>window.__APOLLO_STATE__ = {body};</script>"
+        "<script>window.__PLACE_STATE__ = {\"loaded\": true};</script>"
+        "</body></html>"
+    )
+
+
+def synthetic_detail_page(place_id: str) -> str:
+    """A pcmap place detail page with a single PlaceDetailBase entry."""
+    state = {
+        f"PlaceDetailBase:{place_id}": {
+            "__typename": "PlaceDetailBase",
+            "id": place_id,
+            "name": f"테스트 식당 {place_id}",
+            "category": "한식",
+            "roadAddress": "서울 강남구 테헤란로 1",
+        },
+        "ROOT_QUERY": {"__typename": "Query"},
+    }
+    body = json.dumps(state, ensure_ascii=False)
+    return f"<html><body><script>window.__APOLLO_STATE__ = {body};</script></body></html>"
+
+
+def load_local_api_responses(directory: Path | None = None) -> list[dict]:
+    directory = directory or LOCAL_API_DIR
+    return [json.loads(p.read_text(encoding="utf-8")) for p in sorted(directory.glob("*.json"))]
+
+
+def synthetic_local_api_response(query: str) -> dict:
+    return {
+        "total": 1,
+        "start": 1,
+        "display": 1,
+        "items": [
+            {
+                "title": f"<b>{query}</b>",
+                "link": "",
+                "category": "한식>고기요리",
+                "roadAddress": "서울특별시 강남구 테헤란로 1",
+                "address": "서울특별시 강남구 역삼동 1",
+            }
+        ],
+    }
+
+
+def replay_transport(
+    place_ids: list[str],
+    latency: float = 0.0,
+    seed: int = 0,
+) -> httpx.MockTransport:
+    """Serve pcmap and Local API requests from fixtures.
+
+    Search pages are recorded pages round-robin when any exist, otherwise a
+    synthetic page ranking a random 50 of `place_ids` (stable per query), so
+    seeded stores are actually found. `latency` seconds are added per request.
+    """
+    recorded_pages = [p.read_text(encoding="utf-8") for p in sorted(PCMAP_DIR.glob("*.html"))]
+    page_cycle = itertools.cycle(recorded_pages) if recorded_pages else None
+    api_responses = load_local_api_responses()
+    api_cycle = itertools.cycle(api_responses) if api_responses else None
+    synthetic_pages: dict[str, str] = {}
+
+    def search_page(query: str) -> str:
+        if page_cycle is not None:
+            return next(page_cycle)
+        if query not in synthetic_pages:
+            rng = random.Random(f"{seed}:{query}")
+            ranked = rng.sample(place_ids, min(50, len(place_ids)))
+            synthetic_pages[query] = synthetic_search_page(ranked, extra_entries=300, seed=seed)
+        return synthetic_pages[query]
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if latency:
+            await asyncio.sleep(latency)
+        url = str(request.url.copy_with(query=None))
+        if url == SEARCH_URL:
+            return httpx.Response(200, text=search_page(request.url.params.get("query", "")))
+        if url.startswith(PLACE_DETAIL_URL + "/"):
+            return httpx.Response(200, text=synthetic_detail_page(url.rsplit("/", 1)[-1]))
+        if url == NAVER_API_URL:
+            body = next(api_cycle) if api_cycle else synthetic_local_api_response(request.url.params.get("query", ""))
+            return httpx.Response(200, json=body)
+        return httpx.Response(404)
+
+    return httpx.MockTransport(handler)
@@ -0,0 +1,6 @@
+#!/bin/sh
+# Apply supabase/migrations in order before the benchmark seed function.
+set -e
+for f in /migrations/*.sql; do
+    psql -v ON_ERROR_STOP=1 -U "$POSTGRES_USER" -d "$POSTGRES_DB" -f "$f"
+done
@@ -0,0 +1,64 @@
+-- 벤치마크 전용: 합성 매장/키워드/순위 이력 생성 (운영 DB 에 적용 금지)
+-- SELECT bench_seed(200, 10, 90);  -- 매장 200, 매장당 키워드 10, 90일 hourly 이력
+CREATE FUNCTION bench_seed(
+    p_stores integer,
+    p_keywords_per_store integer,
+    p_days integer,
+    p_distinct_keywords integer DEFAULT 500,
+    p_interval_minutes integer DEFAULT 60
+) RETURNS json
+LANGUAGE plpgsql AS $$
+DECLARE
+    n_snapshots bigint;
+    m DATE;
+BEGIN
+    TRUNCATE stores CASCADE;
+    TRUNCATE keyword_latest_rank;
+
+    INSERT INTO stores (naver_place_id, name, category, address, naver_place_url)
+    SELECT (1000000 + i)::text, '테스트 식당 ' || i, '한식', '서울 강남구',
+           'https://pcmap.place.naver.com/place/' || (1000000 + i)
+    FROM generate_series(0, p_stores - 1) AS i;
+
+    -- 매장 간 키워드 공유 (SERP 중복 제거 효과 재현), 매장 내에서는 유일
+    INSERT INTO tracked_keywords (store_id, keyword)
+    SELECT s.id, '벤치 키워드 ' || ((s.rn + j) % greatest(p_distinct_keywords, p_keywords_per_store))
+    FROM (SELECT id, row_number() OVER (ORDER BY naver_place_id) AS rn FROM stores) s
+    CROSS JOIN generate_series(0, p_keywords_per_store - 1) AS j;
+
+    -- 이력 기간의 월 파티션 (ensure_snapshot_partitions 는 이번 달부터만 생성, DEFAULT 파티션 없음)
+    FOR m IN
+        SELECT DISTINCT date_trunc('month', d AT TIME ZONE 'UTC')::date
+        FROM generate_series(now() - make_interval(days => p_days), now(), interval '1 day') AS d
+    LOOP
+        PERFORM create_snapshot_partition(m);
+    END LOOP;
+
+    INSERT INTO ranking_snapshots (
+        tracked_keyword_id, rank_position, total_results, visitor_count, blog_review_count, collected_at
+    )
+    SELECT k.id,
+           CASE WHEN random() < 0.1 THEN NULL ELSE 1 + floor(random() * 50)::int END,
+           50,
+           floor(random() * 20000)::int,
+           floor(random() * 5000)::int,
+           t
+    FROM tracked_keywords k
+    CROSS JOIN generate_series(
+        now() - make_interval(days => p_days), now(), make_interval(mins => p_interval_minutes)
+    ) AS t;
+    GET DIAGNOSTICS n_snapshots = ROW_COUNT;
+
+    ANALYZE stores;
+    ANALYZE tracked_keywords;
+    ANALYZE ranking_snapshots;
+
+    RETURN json_build_object(
+        'stores', p_stores,
+        'keywords', p_stores * p_keywords_per_store,
+        'snapshots', n_snapshots
+    );
+END;
+$$;
+
+NOTIFY pgrst, 'reload schema';
@@ -0,0 +1,16 @@
+import statistics
+
+
+def percentiles(samples: list[float]) -> dict[str, float | None]:
+    """p50/p95/mean of latencies in seconds, reported in milliseconds."""
+    if not samples:
+        return {"p50_ms": None, "p95_ms": None, "mean_ms": None}
+    if len(samples) == 1:
+        value = round(samples[0] * 1000, 2)
+        return {"p50_ms": value, "p95_ms": value, "mean_ms": value}
+    q = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        "p50_ms": round(q[49] * 1000, 2),
+        "p95_ms": round(q[94] * 1000, 2),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 2),
+    }
@@ -0,0 +1,165 @@
+"""Benchmark suite: parse time, collection throughput, dashboard latency.
+
+    # parse + enrichment only (no database)
+    python -m benchmarks.suite
+
+    # full suite against the local Postgres/PostgREST stand-in
+    docker compose -f benchmarks/docker-compose.yml up -d
+    python -m benchmarks.suite --postgrest-url http://localhost:3000 --seed --stores 200 --days 90
+
+Naver responses are replayed from benchmarks/fixtures through an
+httpx.MockTransport, so no request leaves the machine. Every result is one
+JSON line on stdout; redirect it to a file to track regressions.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+
+from postgrest import AsyncPostgrestClient
+
+from benchmarks.apollo_parse import measure
+from benchmarks.fixtures import load_pcmap_pages, replay_transport
+from benchmarks.stats import percentiles
+
+from app.cache import response_cache
+from app.collector.apollo import extract_state
+from app.collector.naver_map import NaverMapCollector
+from app.scheduler.engine import run_collection
+from app.services import dashboard_service, ranking_service
+
+SECTIONS = ("parse", "enrich", "collection", "dashboard")
+
+
+def emit(benchmark: str, **fields: object) -> None:
+    print(json.dumps({"benchmark": benchmark, **fields}, ensure_ascii=False), flush=True)
+
+
+def bench_parse(args: argparse.Namespace) -> None:
+    for name, html in load_pcmap_pages().items():
+        result = measure(extract_state, html, args.repeat)
+        emit("parse", page=name, page_kb=round(len(html.encode()) / 1024, 1), **result)
+
+
+async def bench_enrich(args: argparse.Namespace) -> None:
+    place_ids = [str(2_000_000 + i) for i in range(args.enrich_count)]
+    collector = NaverMapCollector(transport=replay_transport(place_ids, args.latency), request_delay=args.delay)
+    latencies: list[float] = []
+
+    async def enrich(place_id: str) -> None:
+        started = time.perf_counter()
+        await collector.get_store_info(place_id)
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for place_id in place_ids:
+        await enrich(place_id)
+    elapsed = time.perf_counter() - started
+    await collector.close()
+    emit("enrich", stores=len(place_ids), elapsed_s=round(elapsed, 3),
+         stores_per_s=round(len(place_ids) / elapsed, 1), **percentiles(latencies))
+
+
+async def bench_collection(args: argparse.Namespace, db: AsyncPostgrestClient) -> None:
+    stores = (await db.table("stores").select("naver_place_id").execute()).data
+    place_ids = [s["naver_place_id"] for s in stores]
+    keywords = await ranking_service.list_active_keywords(db)
+
+    collector = NaverMapCollector(transport=replay_transport(place_ids, args.latency), request_delay=args.delay)
+    try:
+        stats = await run_collection(db, keywords, args.concurrency, collector=collector)
+    finally:
+        await collector.close()
+
+    emit(
+        "collection",
+        keywords=stats.keywords,
+        searches=stats.searches,
+        failed=stats.failed,
+        written=stats.written,
+        write_failed=stats.write_failed,
+        concurrency=args.concurrency,
+        elapsed_s=round(stats.elapsed, 3),
+        keywords_per_s=round(stats.keywords_per_second, 1),
+        fetch=percentiles(stats.fetch_latencies),
+    )
+
+
+async def bench_dashboard(args: argparse.Namespace, db: AsyncPostgrestClient) -> None:
+    stores = (await db.table("stores").select("id").execute()).data
+    keywords = (await db.table("tracked_keywords").select("id").execute()).data
+    rng = random.Random(0)
+
+    async def timed(label: str, make_call) -> None:
+        latencies = []
+        for _ in range(args.repeat):
+            response_cache.clear()
+            started = time.perf_counter()
+            await make_call()
+            latencies.append(time.perf_counter() - started)
+        emit("dashboard", call=label, stores=len(stores), keywords=len(keywords), **percentiles(latencies))
+
+    await timed("get_all_dashboard", lambda: dashboard_service.get_all_dashboard(db))
+    if stores:
+        await timed("get_dashboard", lambda: dashboard_service.get_dashboard(db, rng.choice(stores)["id"]))
+    if keywords:
+        await timed("get_rankings", lambda: ranking_service.get_rankings(db, rng.choice(keywords)["id"]))
+
+
+async def run(args: argparse.Namespace) -> None:
+    sections = set(args.only.split(",")) if args.only else set(SECTIONS)
+    if "parse" in sections:
+        bench_parse(args)
+    if "enrich" in sections:
+        await bench_enrich(args)
+
+    if not args.postgrest_url:
+        if sections & {"collection", "dashboard"}:
+            logging.getLogger(__name__).warning("--postgrest-url not given, skipping collection/dashboard")
+        return
+
+    db = AsyncPostgrestClient(args.postgrest_url, timeout=600)
+    try:
+        if args.seed:
+            started = time.perf_counter()
+            seeded = (await db.rpc("bench_seed", {
+                "p_stores": args.stores,
+                "p_keywords_per_store": args.keywords_per_store,
+                "p_days": args.days,
+                "p_distinct_keywords": args.distinct_keywords,
+            }).execute()).data
+            emit("seed", elapsed_s=round(time.perf_counter() - started, 1), **seeded)
+        if "dashboard" in sections:
+            await bench_dashboard(args, db)
+        if "collection" in sections:
+            await bench_collection(args, db)
+    finally:
+        await db.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", help=f"comma-separated subset of {','.join(SECTIONS)}")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--postgrest-url")
+    parser.add_argument("--seed", action="store_true", help="reseed the database with bench_seed() first")
+    parser.add_argument("--stores", type=int, default=200)
+    parser.add_argument("--keywords-per-store", type=int, default=10)
+    parser.add_argument("--distinct-keywords", type=int, default=500)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated Naver response time (s)")
+    parser.add_argument("--delay", type=float, default=0.0, help="per-host request delay (s)")
+    parser.add_argument("--enrich-count", type=int, default=50)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger("app").setLevel(logging.WARNING)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
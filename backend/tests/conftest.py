@@ -0,0 +1,13 @@
+import os
+
+import pytest
+
+# Settings are read at import time; tests never reach Supabase or Naver.
+os.environ.setdefault("SUPABASE_URL", "http://supabase.test")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "test")
+os.environ.setdefault("SUPABASE_ANON_KEY", "test")
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
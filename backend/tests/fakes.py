@@ -0,0 +1,44 @@
+from collections.abc import Callable
+from types import SimpleNamespace
+
+
+class FakeQuery:
+    """Chainable stand-in for a postgrest request builder.
+
+    Every builder call is recorded; `execute()` hands the table (or
+    "rpc:<name>") and the recorded calls to the database's handler.
+    """
+
+    def __init__(self, db: "FakeDB", target: str) -> None:
+        self.db = db
+        self.target = target
+        self.calls: list[tuple[str, tuple, dict]] = []
+
+    def __getattr__(self, name: str) -> Callable[..., "FakeQuery"]:
+        def record(*args, **kwargs) -> "FakeQuery":
+            self.calls.append((name, args, kwargs))
+            return self
+
+        return record
+
+    def call(self, name: str) -> tuple | None:
+        """Arguments of the first recorded `name` call."""
+        return next((args for n, args, _ in self.calls if n == name), None)
+
+    async def execute(self) -> SimpleNamespace:
+        self.db.executed.append(self)
+        return SimpleNamespace(data=self.db.handler(self))
+
+
+class FakeDB:
+    def __init__(self, handler: Callable[[FakeQuery], object] = lambda query: []) -> None:
+        self.handler = handler
+        self.executed: list[FakeQuery] = []
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    def rpc(self, name: str, params: dict | None = None) -> FakeQuery:
+        query = FakeQuery(self, f"rpc:{name}")
+        query.calls.append(("rpc", (params,), {}))
+        return query
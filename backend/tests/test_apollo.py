@@ -0,0 +1,35 @@
+import json
+
+from app.collector.apollo import extract_state, parse_search_page
+
+STATE = {
+    "ROOT_QUERY": {
+        "restaurants": {"items": [{"__ref": "RestaurantListSummary:1"}, {"__ref": "RestaurantListSummary:2"}]}
+    },
+    "RestaurantListSummary:1": {"id": "1", "name": "Cafe }{ Brace", "visitorReviewCount": "12"},
+    "RestaurantListSummary:2": {"id": "2", "name": "Quote \\\" and { open", "blogCafeReviewCount": 3},
+}
+
+
+def page(state_json: str, after: str = "") -> str:
+    return f"<html><script>window.__APOLLO_STATE__ = {state_json};{after}</script></html>"
+
+
+def test_braces_inside_strings():
+    assert extract_state(page(json.dumps(STATE))) == STATE
+
+
+def test_state_followed_by_more_script():
+    trailing = (
+        'window.__PLACE_STATE__ = {"a": {"b": 1}};</script>'
+        '<script>var tpl = "}}}"; function f() { return {x: 1}; }'
+    )
+    assert extract_state(page(json.dumps(STATE), trailing)) == STATE
+
+
+def test_search_entries_in_rank_order():
+    assert parse_search_page(page(json.dumps(STATE))) == [
+        {"ref": "RestaurantListSummary:1", "id": "1", "visitorReviewCount": "12"},
+        {"ref": "RestaurantListSummary:2", "id": "2", "blogCafeReviewCount": 3},
+    ]
+
@@ -0,0 +1,84 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app import cache
+from app.cache import TTLCache
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache, "time", SimpleNamespace(monotonic=clock))
+    return clock
+
+
+def test_get_set_and_ttl(clock):
+    c = TTLCache(maxsize=4, ttl=10)
+    assert c.get("a") is None
+    c.set("a", 1)
+    assert c.get("a") == 1
+    clock.now += 10
+    assert c.get("a") is None
+    assert (c.stats.hits, c.stats.misses, c.stats.expirations) == (1, 2, 1)
+    assert len(c) == 0
+
+
+def test_lru_eviction(clock):
+    c = TTLCache(maxsize=2, ttl=10)
+    c.set("a", 1)
+    c.set("b", 2)
+    c.get("a")
+    c.set("c", 3)
+    assert c.get("b") is None
+    assert c.get("a") == 1 and c.get("c") == 3
+    assert c.stats.evictions == 1
+
+
+def test_invalidate_by_tag(clock):
+    c = TTLCache(maxsize=4, ttl=10)
+    c.set("a", 1, ["keyword:1", "store:1"])
+    c.set("b", 2, ["keyword:2"])
+    c.invalidate("store:1")
+    assert c.get("a") is None
+    assert c.get("b") == 2
+    # The dropped entry no longer pins its other tags
+    c.invalidate("keyword:1")
+    assert c.stats.invalidations == 1
+
+
+def test_replacing_entry_updates_tags(clock):
+    c = TTLCache(maxsize=4, ttl=10)
+    c.set("a", 1, ["keyword:1"])
+    c.set("a", 2, ["keyword:2"])
+    c.invalidate("keyword:1")
+    assert c.get("a") == 2
+
+
+def test_set_after_overlapping_invalidation_is_dropped(clock):
+    c = TTLCache(maxsize=4, ttl=10)
+    version = c.version()
+    # A write lands and invalidates while the read is in flight
+    c.invalidate("keyword:1")
+    c.set("a", "read before the write", ["keyword:1"], version=version)
+    assert c.get("a") is None
+    assert c.stats.stale_sets == 1
+
+
+def test_set_unaffected_by_other_tags_invalidation(clock):
+    c = TTLCache(maxsize=4, ttl=10)
+    version = c.version()
+    c.invalidate("keyword:2")
+    c.set("a", 1, ["keyword:1"], version=version)
+    assert c.get("a") == 1
+    # Reads started after the invalidation cache normally
+    c.set("b", 2, ["keyword:2"], version=c.version())
+    assert c.get("b") == 2
@@ -0,0 +1,136 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app.collector import circuit
+from app.collector.circuit import CircuitBreaker, CircuitOpenError
+from app.collector.naver_map import NaverMapCollector
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    # Only the breaker's clock: the event loop keeps the real time.monotonic
+    monkeypatch.setattr(circuit, "time", SimpleNamespace(monotonic=clock))
+    return clock
+
+
+def open_breaker(clock: Clock) -> CircuitBreaker:
+    breaker = CircuitBreaker(error_rate=0.5, min_requests=4, cooldown=60)
+    for _ in range(4):
+        breaker.check()
+        breaker.record(False)
+    assert breaker.is_open
+    return breaker
+
+
+def test_stays_closed_below_min_requests(clock):
+    breaker = CircuitBreaker(error_rate=0.5, min_requests=4, cooldown=60)
+    for _ in range(3):
+        breaker.record(False)
+    assert not breaker.is_open
+    assert breaker.check() is False
+
+
+def test_opens_on_error_rate(clock):
+    breaker = CircuitBreaker(error_rate=0.5, min_requests=4, cooldown=60)
+    for ok in (True, False, True, False):
+        breaker.record(ok)
+    assert breaker.is_open
+    with pytest.raises(CircuitOpenError) as e:
+        breaker.check()
+    assert e.value.retry_in == pytest.approx(60)
+
+
+def test_half_open_allows_single_probe(clock):
+    breaker = open_breaker(clock)
+    clock.now += 61
+    assert breaker.check() is True
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+
+
+def test_probe_success_closes(clock):
+    breaker = open_breaker(clock)
+    clock.now += 61
+    breaker.check()
+    breaker.record(True)
+    assert not breaker.is_open
+    assert breaker.check() is False
+
+
+def test_probe_failure_reopens(clock):
+    breaker = open_breaker(clock)
+    clock.now += 61
+    breaker.check()
+    breaker.record(False)
+    assert breaker.is_open
+    assert breaker.retry_in() == pytest.approx(60)
+
+
+def test_cancelled_probe_lets_next_request_probe(clock):
+    breaker = open_breaker(clock)
+    clock.now += 61
+    assert breaker.check() is True
+    breaker.cancel_probe()
+    assert breaker.check() is True
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "error",
+    [httpx.TooManyRedirects("loop"), httpx.DecodingError("bad br")],
+    ids=["redirects", "decoding"],
+)
+async def test_fetch_probe_ending_in_request_error_does_not_wedge_breaker(clock, error):
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise error
+        return httpx.Response(200, text="ok")
+
+    collector = NaverMapCollector(transport=httpx.MockTransport(handler), request_delay=0)
+    collector.circuit_breaker = open_breaker(clock)
+    clock.now += 61
+    try:
+        with pytest.raises(type(error)):
+            await collector._fetch_html("https://pcmap.place.naver.com/place/list")
+        # Without clearing the probe this would raise CircuitOpenError forever
+        assert await collector._fetch_html("https://pcmap.place.naver.com/place/list") == "ok"
+        assert not collector.circuit_breaker.is_open
+    finally:
+        await collector.close()
+
+
+@pytest.mark.anyio
+async def test_fetch_probe_cancelled_in_rate_limiter_does_not_wedge_breaker(clock):
+    collector = NaverMapCollector(transport=httpx.MockTransport(lambda request: httpx.Response(200)))
+    collector.circuit_breaker = open_breaker(clock)
+    clock.now += 61
+    waiting = asyncio.Event()
+
+    async def wait(url: str) -> None:
+        waiting.set()
+        await asyncio.Event().wait()
+
+    collector._rate_limiter.wait = wait
+    task = asyncio.create_task(collector._fetch_html("https://pcmap.place.naver.com/place/list"))
+    await waiting.wait()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert collector.circuit_breaker.check() is True
+    await collector.close()
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from app.collector.base import RankingResult
+from app.collector.naver_map import fetch_timings
+from app.scheduler import engine
+
+KEYWORDS = [{"id": f"k{i}", "keyword": f"keyword {i}", "stores": {"naver_place_id": str(i)}} for i in range(12)]
+
+
+class SlowCollector:
+    """Answers every search after a short wait, tracking how many overlap."""
+
+    def __init__(self) -> None:
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def find_store_ranks(self, keyword, place_ids, max_depth=None, serp=None):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            self.in_flight -= 1
+        fetch_timings.get().append(0.01 * (1 + int(next(iter(place_ids)))))
+        return {pid: RankingResult(1, 10, None, None, pid) for pid in place_ids}
+
+
+@pytest.fixture
+def written(monkeypatch):
+    rows: list[dict] = []
+
+    async def insert_snapshots(db, chunk):
+        rows.extend(chunk)
+        return chunk, []
+
+    async def insert_serps(db, serps):
+        return len(serps)
+
+    monkeypatch.setattr(engine.ranking_service, "insert_snapshots", insert_snapshots)
+    monkeypatch.setattr(engine.ranking_service, "insert_serps", insert_serps)
+    return rows
+
+
+@pytest.mark.anyio
+async def test_concurrency_is_bounded(written):
+    collector = SlowCollector()
+    stats = await engine.run_collection(object(), KEYWORDS, 3, collector=collector)
+
+    assert collector.max_in_flight == 3
+    assert stats.searches == stats.written == len(written) == len(KEYWORDS)
+
+
+@pytest.mark.anyio
+async def test_summary_reports_throughput_and_latency(written):
+    stats = await engine.run_collection(object(), KEYWORDS, 4, collector=SlowCollector())
+
+    assert stats.keywords_per_second > 0
+    # Fetch latencies are 10..120 ms
+    assert stats.latency_percentile(50) == pytest.approx(0.065)
+    assert 0.11 < stats.latency_percentile(95) <= 0.12
+    assert "12 keywords" in stats.summary()
+    assert "p50=65ms" in stats.summary()
@@ -0,0 +1,65 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.config import settings
+from app.events import RESYNC, Event, EventBroker
+from app.services import queue_service
+
+
+@pytest.mark.anyio
+async def test_slow_subscriber_gets_single_resync():
+    broker = EventBroker(queue_size=2)
+    subscription = broker.subscribe()
+    for i in range(5):
+        broker.publish(Event("rank", {"i": i}))
+    assert await subscription.get(0.1) == RESYNC
+    assert await subscription.get(0.01) is None
+
+
+@pytest.mark.anyio
+async def test_interval_row_is_published_at_valid_to():
+    broker = EventBroker(queue_size=4)
+    subscription = broker.subscribe()
+    broker.publish_snapshots([{"tracked_keyword_id": "k", "collected_at": "t0", "valid_to": "t5"}])
+    event = await subscription.get(0.1)
+    assert (event.name, event.data["collected_at"]) == ("rank", "t5")
+
+
+@pytest.mark.anyio
+async def test_relay_publishes_each_worker_rank_once(monkeypatch):
+    now = datetime.now(timezone.utc)
+    at = [(now + timedelta(seconds=s)).isoformat() for s in range(3)]
+    polls = [
+        [{"tracked_keyword_id": "a", "collected_at": at[0]}],
+        # "a" is still inside the lookback window and must not be sent again
+        [{"tracked_keyword_id": "a", "collected_at": at[0]}, {"tracked_keyword_id": "b", "collected_at": at[1]}],
+        [{"tracked_keyword_id": "b", "collected_at": at[1]}, {"tracked_keyword_id": "a", "collected_at": at[2]}],
+    ]
+    done = asyncio.Event()
+
+    async def latest_ranks_since(db, since):
+        if not polls:
+            done.set()
+            return []
+        return polls.pop(0)
+
+    published: list[tuple[str, str]] = []
+    invalidated: list[str] = []
+    monkeypatch.setattr(settings, "EVENTS_RELAY_SECONDS", 0)
+    monkeypatch.setattr(queue_service, "_latest_ranks_since", latest_ranks_since)
+    monkeypatch.setattr(queue_service, "invalidate_snapshots", invalidated.extend)
+    monkeypatch.setattr(
+        queue_service.event_broker,
+        "publish_snapshots",
+        lambda rows: published.extend((r["tracked_keyword_id"], r["collected_at"]) for r in rows),
+    )
+
+    relay = asyncio.create_task(queue_service.relay_worker_snapshots(None))
+    await asyncio.wait_for(done.wait(), 5)
+    relay.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await relay
+    assert published == [("a", at[0]), ("b", at[1]), ("a", at[2])]
+    assert invalidated == ["a", "b", "a"]
@@ -0,0 +1,59 @@
+import base64
+import json
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException, Response
+
+from app.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor, keyset_filter, set_next_cursor
+
+AT = datetime(2026, 10, 1, 9, 30, tzinfo=timezone.utc)
+ID = "5b0e7c1e-8a7f-4c4e-9d55-2f3f1f0c9a11"
+
+
+def raw_cursor(value: object) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("row_id", [ID, f"{ID}:3", "daily:2026-09-30"])
+def test_cursor_round_trip(row_id):
+    assert decode_cursor(encode_cursor(AT, row_id)) == (AT.isoformat(), row_id)
+
+
+def test_cursor_normalizes_timestamp():
+    assert decode_cursor(encode_cursor("2026-10-01T18:30:00+09:00", ID))[0] == "2026-10-01T18:30:00+09:00"
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not base64!",
+        raw_cursor({"a": 1}),
+        raw_cursor(["yesterday", ID]),
+        raw_cursor([AT.isoformat(), 'x"),id.gt.(0']),
+        raw_cursor([AT.isoformat(), "a,b"]),
+        raw_cursor([AT.isoformat(), f"{ID}\n"]),
+        raw_cursor([AT.isoformat(), 7]),
+        raw_cursor(['2026-10-01T00:00:00",id.gt."0', ID]),
+    ],
+)
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as e:
+        decode_cursor(cursor)
+    assert e.value.status_code == 400
+
+
+def test_keyset_filter():
+    assert keyset_filter("created_at", encode_cursor(AT, ID)) == (
+        f'created_at.lt."{AT.isoformat()}",and(created_at.eq."{AT.isoformat()}",id.lt."{ID}")'
+    )
+
+
+def test_next_cursor_only_for_full_pages():
+    items = [SimpleNamespace(id=ID, created_at=AT)]
+    response = Response()
+    set_next_cursor(response, items, 2, "created_at")
+    assert NEXT_CURSOR_HEADER not in response.headers
+    set_next_cursor(response, items, 1, "created_at")
+    assert decode_cursor(response.headers[NEXT_CURSOR_HEADER]) == (AT.isoformat(), ID)
@@ -0,0 +1,57 @@
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from app.collector.apollo import ApolloStateError, extract_state, parse_search_page
+from app.collector.parse_pool import ParsePool
+
+
+def _crash(html: str) -> None:
+    os._exit(1)
+
+
+class Timer:
+    def __init__(self) -> None:
+        self.observed: list[float] = []
+
+    def observe(self, seconds: float) -> None:
+        self.observed.append(seconds)
+
+
+def test_corrupt_state_raises():
+    assert extract_state("<html></html>") is None
+    with pytest.raises(ApolloStateError):
+        parse_search_page("<script>window.__APOLLO_STATE__ = {broken</script>")
+
+
+@pytest.mark.anyio
+async def test_inline_parse_is_timed():
+    pool = ParsePool(processes=0, inline_max_chars=0)
+    timer = Timer()
+    assert await pool.run(len, "abc", timer=timer) == 3
+    assert len(timer.observed) == 1
+
+
+@pytest.mark.anyio
+async def test_pool_parse_is_timed_in_worker():
+    pool = ParsePool(processes=1, inline_max_chars=0)
+    timer = Timer()
+    try:
+        assert await pool.run(len, "abc", timer=timer) == 3
+    finally:
+        pool.close()
+    # Spawning the worker takes far longer than len(); only the call itself is observed
+    assert timer.observed[0] < 0.05
+
+
+@pytest.mark.anyio
+async def test_page_that_breaks_the_pool_is_dropped():
+    pool = ParsePool(processes=1, inline_max_chars=0)
+    try:
+        with pytest.raises(BrokenProcessPool):
+            await pool.run(_crash, "poison")
+        # The pool is recreated for the next page
+        assert await pool.run(len, "abc") == 3
+    finally:
+        pool.close()
@@ -0,0 +1,34 @@
+import pytest
+
+from app.collector.base import StoreInfo
+from app.collector.circuit import CircuitOpenError
+from app.services import place_service
+from tests.fakes import FakeDB
+
+QUEUE = [
+    {"store_id": f"s{i}", "naver_place_id": str(i), "name": f"old {i}", "category": None, "address": None, "failures": 0}
+    for i in range(4)
+]
+
+
+@pytest.mark.anyio
+async def test_open_breaker_stops_refresh_without_recording_failures(monkeypatch):
+    failures: list[str] = []
+
+    async def refresh_place_info(db, place_id):
+        if place_id == "2":
+            raise CircuitOpenError(30)
+        if place_id == "1":
+            raise RuntimeError("timeout")
+        return StoreInfo(f"old {place_id}", None, None, f"https://pcmap.place.naver.com/place/{place_id}", place_id)
+
+    async def record_refresh_failure(db, place_id, failures_so_far):
+        failures.append(place_id)
+
+    monkeypatch.setattr(place_service, "refresh_place_info", refresh_place_info)
+    monkeypatch.setattr(place_service, "_record_refresh_failure", record_refresh_failure)
+    db = FakeDB(lambda query: QUEUE if query.target == "store_place_refresh_queue" else [])
+
+    assert await place_service.refresh_tracked_stores(db, 10) == 1
+    # Only the store that failed on its own is backed off; "3" was never tried
+    assert failures == ["1"]
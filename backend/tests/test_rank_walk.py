@@ -0,0 +1,53 @@
+import pytest
+
+from app.collector.naver_map import SEARCH_PAGE_SIZE, NaverMapCollector
+
+TOTAL = 120
+
+
+@pytest.fixture
+async def collector(monkeypatch):
+    collector = NaverMapCollector(request_delay=0)
+    collector.starts = []
+
+    async def search_page(keyword: str, start: int = 1) -> list[dict]:
+        collector.starts.append(start)
+        ids = range(start, min(start + SEARCH_PAGE_SIZE, TOTAL + 1))
+        return [{"ref": f"RestaurantListSummary:{i}", "id": str(i)} for i in ids]
+
+    monkeypatch.setattr(collector, "_search_page", search_page)
+    yield collector
+    await collector.close()
+
+
+@pytest.mark.anyio
+async def test_pages_past_the_first_fifty(collector):
+    ranks = await collector.find_store_ranks("cafe", {"7", "77", "117"}, max_depth=150)
+    assert {pid: r.rank_position for pid, r in ranks.items()} == {"7": 7, "77": 77, "117": 117}
+    assert collector.starts == [1, 51, 101]
+
+
+@pytest.mark.anyio
+async def test_max_depth_cuts_off_the_walk(collector):
+    serp = []
+    ranks = await collector.find_store_ranks("cafe", {"7", "77"}, max_depth=60, serp=serp)
+    assert ranks["7"].rank_position == 7
+    assert ranks["77"] is None
+    assert collector.starts == [1, 51]
+    assert [r.rank_position for r in serp] == list(range(1, 61))
+
+
+@pytest.mark.anyio
+async def test_walk_stops_once_every_place_is_found(collector):
+    ranks = await collector.find_store_ranks("cafe", {"3", "60"}, max_depth=150)
+    assert {pid: r.rank_position for pid, r in ranks.items()} == {"3": 3, "60": 60}
+    assert collector.starts == [1, 51]
+
+
+@pytest.mark.anyio
+async def test_serp_capture_finishes_the_page_but_fetches_no_more(collector):
+    serp = []
+    await collector.find_store_ranks("cafe", {"3", "60"}, max_depth=150, serp=serp)
+    assert collector.starts == [1, 51]
+    # The page holding the last place is recorded in full
+    assert [r.rank_position for r in serp] == list(range(1, 101))
@@ -0,0 +1,75 @@
+import re
+from pathlib import Path
+
+import pytest
+
+from app.collector.base import RankingResult
+from app.services import ranking_service
+from tests.fakes import FakeDB
+
+
+class RecordingCollector:
+    def __init__(self) -> None:
+        self.searched: list[str] = []
+
+    async def find_store_ranks(self, keyword, place_ids, max_depth=None, serp=None):
+        self.searched.append(keyword)
+        result = RankingResult(rank_position=1, total_results=1, visitor_count=None, blog_review_count=None, place_id="1")
+        if serp is not None:
+            serp.append(result)
+        return {"1": result}
+
+
+@pytest.mark.anyio
+async def test_group_is_searched_with_an_original_spelling():
+    rows = [
+        {"id": "k1", "keyword": "Gangnam Cafe", "stores": {"naver_place_id": "1"}},
+        {"id": "k2", "keyword": "gangnam  cafe", "stores": {"naver_place_id": "2"}},
+        {"id": "k3", "keyword": "Gangnam Cafe ", "stores": {"naver_place_id": "3"}},
+    ]
+    [(keyword, targets)] = ranking_service.group_by_keyword(rows).items()
+    collector = RecordingCollector()
+
+    snapshots, serp_row = await ranking_service.rank_keyword_group(keyword, targets, collector=collector)
+
+    assert collector.searched == ["Gangnam Cafe"]
+    assert serp_row["keyword"] == "gangnam cafe"
+    assert [s["rank_position"] for s in snapshots] == [1, None, None]
+
+
+@pytest.mark.anyio
+async def test_failed_chunk_is_retried_row_by_row(monkeypatch):
+    monkeypatch.setattr(ranking_service.settings, "SNAPSHOT_STORAGE", "points")
+    rows = [{"tracked_keyword_id": f"k{i}", "rank_position": i} for i in range(1, 6)]
+
+    def handler(query):
+        written = query.call("insert")[0]
+        # "k3" violates a constraint, so any insert including it fails
+        if any(row["tracked_keyword_id"] == "k3" for row in written):
+            raise RuntimeError("insert or update violates foreign key constraint")
+        return [{**row, "id": row["tracked_keyword_id"]} for row in written]
+
+    db = FakeDB(handler)
+    inserted, failed = await ranking_service.insert_snapshots(db, rows, chunk_size=3)
+
+    assert [r["tracked_keyword_id"] for r in inserted] == ["k1", "k2", "k4", "k5"]
+    assert failed == [rows[2]]
+    # First chunk: one failed batch, then three single rows; second chunk: one batch
+    assert [len(q.call("insert")[0]) for q in db.executed] == [3, 1, 1, 1, 2]
+
+
+@pytest.mark.parametrize(
+    "keyword",
+    ["Gangnam Cafe", " gangnam\tcafe ", "GANGNAM\u3000CAFE", "gangnam \u00a0\n cafe", "\u3000Gangnam  Cafe\t"],
+)
+def test_normalize_keyword_collapses_any_whitespace(keyword):
+    assert ranking_service.normalize_keyword(keyword) == "gangnam cafe"
+
+
+def test_whitespace_set_matches_migration():
+    sql = (Path(__file__).parents[2] / "supabase/migrations/002_collection_minute.sql").read_text()
+    [sql_class] = re.findall(r"regexp_replace\(p_keyword, '([^']+)'", sql)
+    assert sql_class == ranking_service.KEYWORD_SPACE_RE.pattern
+    # ... and that set is exactly what str.isspace() accepts
+    space = {chr(c) for c in range(0x110000) if chr(c).isspace()}
+    assert {ch for ch in map(chr, range(0x110000)) if ranking_service.KEYWORD_SPACE_RE.fullmatch(ch)} == space
@@ -0,0 +1,71 @@
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app.collector import naver_map, rate_limit
+from app.collector.naver_map import NaverMapCollector
+from app.collector.rate_limit import HostRateLimiter
+
+URL = "https://pcmap.place.naver.com/place/list"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def test_throttle_backs_off_and_success_recovers():
+    limiter = HostRateLimiter(1.0, max_delay=8.0, recovery=0.5)
+
+    for expected in (2.0, 4.0, 8.0, 8.0):
+        limiter.record_throttle(URL)
+        assert limiter.delay(URL) == expected
+
+    for expected in (7.5, 7.0):
+        limiter.record_success(URL)
+        assert limiter.delay(URL) == expected
+    for _ in range(20):
+        limiter.record_success(URL)
+    assert limiter.delay(URL) == 1.0
+    # Other hosts keep the base delay throughout
+    assert limiter.delay("https://openapi.naver.com/v1/search/local.json") == 1.0
+
+
+@pytest.mark.anyio
+async def test_retry_after_holds_the_next_slot(clock, monkeypatch):
+    slept: list[float] = []
+
+    async def sleep(seconds):
+        slept.append(seconds)
+
+    monkeypatch.setattr(rate_limit.asyncio, "sleep", sleep)
+    limiter = HostRateLimiter(1.0)
+    await limiter.wait(URL)
+    limiter.record_throttle(URL, retry_after=30)
+    await limiter.wait(URL)
+    assert slept == [30]
+
+
+@pytest.mark.anyio
+async def test_collector_backs_off_on_429_and_recovers(monkeypatch):
+    responses = iter([httpx.Response(429), httpx.Response(200, text="ok")])
+    delays: list[float] = []
+    collector = NaverMapCollector(transport=httpx.MockTransport(lambda request: next(responses)), request_delay=0)
+    limiter = collector._rate_limiter
+    record_throttle = limiter.record_throttle
+
+    def throttled(url, retry_after=None):
+        record_throttle(url, retry_after)
+        delays.append(limiter.delay(url))
+
+    monkeypatch.setattr(limiter, "record_throttle", throttled)
+    monkeypatch.setattr(naver_map, "_backoff", lambda attempt: 0)
+    try:
+        assert await collector._fetch_html(URL) == "ok"
+    finally:
+        await collector.close()
+    assert delays[0] > 0
+    assert limiter.delay(URL) == 0
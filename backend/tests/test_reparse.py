@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from app.collector.archive import ArchivedPage
+from app.services.reparse_service import WALK_MAX_SECONDS, iter_walks, rank_walk
+
+T0 = datetime(2026, 10, 1, tzinfo=timezone.utc)
+
+
+def entry(place_id: str, visitors: int | None = None) -> dict:
+    return {"ref": f"PlaceSummary:{place_id}", "id": place_id, "visitorReviewCount": visitors}
+
+
+def page(keyword: str, start: int, seconds: float) -> ArchivedPage:
+    return ArchivedPage(T0 + timedelta(seconds=seconds), "search", Path("x"), keyword=keyword, start=start)
+
+
+def test_rank_walk_ranks_across_pages():
+    pages = [[entry("1"), entry("2")], [entry("3", visitors=40)]]
+    ranks = rank_walk(pages, {"3", "9"})
+    assert ranks["9"] is None
+    assert ranks["3"].rank_position == 3
+    assert ranks["3"].total_results == 3
+    assert ranks["3"].visitor_count == 40
+
+
+def test_rank_walk_skips_entries_repeated_on_deeper_pages():
+    pages = [[entry("1"), entry("2")], [entry("2"), entry("3")]]
+    assert rank_walk(pages, {"3"})["3"].rank_position == 3
+
+
+def test_rank_walk_stops_at_empty_page():
+    pages = [[entry("1")], [], [entry("2")]]
+    assert rank_walk(pages, {"2"}) == {"2": None}
+
+
+def test_rank_walk_unparsed_first_page_is_not_unranked():
+    assert rank_walk([None, [entry("1")]], {"1"}) is None
+    assert rank_walk([], {"1"}) is None
+
+
+def test_iter_walks_groups_deeper_pages_by_normalized_keyword():
+    pages = [
+        page("Gangnam  Cafe", 1, 0),
+        page("seoul pizza", 1, 5),
+        page("gangnam cafe", 71, 10),
+        page("gangnam cafe", 1, 60),
+    ]
+    walks = list(iter_walks(pages))
+    assert [(w.keyword, len(w.pages)) for w in walks] == [
+        ("gangnam cafe", 2),
+        ("gangnam cafe", 1),
+        ("seoul pizza", 1),
+    ]
+
+
+def test_iter_walks_drops_deeper_pages_without_recent_first_page():
+    pages = [page("cafe", 1, 0), page("cafe", 71, WALK_MAX_SECONDS + 1), page("pizza", 71, 0)]
+    assert [len(w.pages) for w in iter_walks(pages)] == [1]
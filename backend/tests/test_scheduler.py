@@ -0,0 +1,87 @@
+import asyncio
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+from app.config import settings
+from app.scheduler import jobs
+
+TZ = ZoneInfo(settings.SCHEDULER_TIMEZONE)
+
+
+@pytest.mark.anyio
+async def test_executor_exposes_fire_time():
+    seen: list[datetime | None] = []
+    done = asyncio.Event()
+
+    async def job() -> None:
+        seen.append(jobs.scheduled_fire_time.get())
+        done.set()
+
+    scheduler = AsyncIOScheduler(timezone=TZ, executors={"default": jobs.FireTimeExecutor()})
+    run_date = datetime.now(TZ) + timedelta(milliseconds=200)
+    scheduler.add_job(job, "date", run_date=run_date)
+    scheduler.start()
+    try:
+        await asyncio.wait_for(done.wait(), 5)
+    finally:
+        scheduler.shutdown(wait=False)
+    assert seen == [run_date]
+    assert jobs.scheduled_fire_time.get() is None
+
+
+@pytest.mark.anyio
+async def test_due_slot_follows_fire_time_not_clock(monkeypatch):
+    requested: list[list[int]] = []
+
+    async def get_supabase():
+        return object()
+
+    async def list_active_keywords(db, collection_minutes=None):
+        requested.append(collection_minutes)
+        return []
+
+    monkeypatch.setattr(settings, "COLLECT_MODE", "inline")
+    monkeypatch.setattr(jobs, "get_supabase", get_supabase)
+    monkeypatch.setattr(jobs.ranking_service, "list_active_keywords", list_active_keywords)
+
+    # Fired for 09:59 but started in the next minute
+    token = jobs.scheduled_fire_time.set(datetime(2026, 3, 2, 9, 59, tzinfo=TZ))
+    try:
+        await jobs.collect_due_rankings()
+    finally:
+        jobs.scheduled_fire_time.reset(token)
+    assert requested == [jobs.due_minutes(9 * 60 + 59, settings.COLLECT_INTERVAL_MINUTES)]
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("won", [True, False])
+async def test_maintenance_runs_only_when_claimed(monkeypatch, won):
+    claims: list[tuple[str, datetime]] = []
+    refreshed: list[int] = []
+
+    async def get_supabase():
+        return object()
+
+    async def claim_scheduled_run(db, job, fire_time):
+        claims.append((job, fire_time))
+        return won
+
+    async def refresh_tracked_stores(db, limit):
+        refreshed.append(limit)
+        return 0
+
+    monkeypatch.setattr(jobs, "get_supabase", get_supabase)
+    monkeypatch.setattr(jobs.queue_service, "claim_scheduled_run", claim_scheduled_run)
+    monkeypatch.setattr(jobs.place_service, "refresh_tracked_stores", refresh_tracked_stores)
+
+    fire_time = datetime(2026, 3, 2, 10, 0, tzinfo=TZ)
+    token = jobs.scheduled_fire_time.set(fire_time)
+    try:
+        await jobs.refresh_place_details()
+    finally:
+        jobs.scheduled_fire_time.reset(token)
+    assert claims == [("refresh_place_details", fire_time)]
+    assert refreshed == ([settings.PLACE_REFRESH_BATCH] if won else [])
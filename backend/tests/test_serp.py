@@ -0,0 +1,59 @@
+import pytest
+from pydantic import ValidationError
+
+from app.cache import response_cache
+from app.collector.base import RankingResult
+from app.models.stores import StoreCreate
+from app.services import competitor_service
+from app.services.ranking_service import _serp_row
+from tests.fakes import FakeDB
+
+
+def result(rank: int | None, place_id: str, visitors: int | None = None) -> RankingResult:
+    return RankingResult(rank, 120, visitors, None, place_id)
+
+
+def test_serp_row_indexes_by_rank():
+    row = _serp_row("gangnam cafe", [result(3, "30", 7), result(1, "10", 5), result(4, "")])
+    assert row == {
+        "keyword": "gangnam cafe",
+        "total_results": 120,
+        # rank 2 was not captured and rank 4 has no usable place ID
+        "place_ids": [10, None, 30],
+        "visitor_counts": [5, None, 7],
+        "blog_review_counts": [None, None, None],
+    }
+
+
+def test_serp_row_without_ranked_places():
+    assert _serp_row("gangnam cafe", [result(None, "10"), result(2, "")]) is None
+
+
+@pytest.mark.parametrize("place_id", ["abc", "12a", "", "1" * 21])
+def test_store_create_rejects_non_numeric_place_ids(place_id):
+    with pytest.raises(ValidationError):
+        StoreCreate(naver_place_id=place_id)
+
+
+def test_store_create_strips_place_id():
+    assert StoreCreate(naver_place_id=" 1234 ").naver_place_id == "1234"
+
+
+@pytest.mark.anyio
+async def test_competitors_above_calls_serp_above():
+    response_cache.clear()
+    rows = [
+        {"rank_position": 1, "naver_place_id": "10", "name": "A", "visitor_count": 5,
+         "blog_review_count": None, "collected_at": "2026-10-01T00:00:00+00:00"},
+    ]
+    db = FakeDB(lambda query: rows)
+
+    competitors = await competitor_service.get_competitors_above(db, "k1")
+
+    [query] = db.executed
+    assert query.target == "rpc:serp_above"
+    assert query.call("rpc") == ({"p_keyword_id": "k1", "p_at": None},)
+    assert [(c.rank_position, c.naver_place_id, c.name) for c in competitors] == [(1, "10", "A")]
+    # Served from the cache until a snapshot for the keyword invalidates it
+    await competitor_service.get_competitors_above(db, "k1")
+    assert len(db.executed) == 1
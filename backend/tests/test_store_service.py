@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from app.collector.base import StoreInfo
+from app.collector.circuit import CircuitOpenError
+from app.models.stores import StoreBulkCreate
+from app.services import place_service, store_service
+from tests.fakes import FakeDB
+
+TIMESTAMP = "2026-10-01T00:00:00+00:00"
+
+
+def store(row: dict) -> dict:
+    return {**row, "id": f"store-{row['naver_place_id']}", "created_at": TIMESTAMP, "updated_at": TIMESTAMP}
+
+
+class FakeCollector:
+    def __init__(self, errors: dict[str, Exception] | None = None) -> None:
+        self.errors = errors or {}
+        self.looked_up: list[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def get_store_info(self, place_id: str) -> StoreInfo | None:
+        self.looked_up.append(place_id)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            self.in_flight -= 1
+        if place_id in self.errors:
+            raise self.errors[place_id]
+        return StoreInfo(f"place {place_id}", "cafe", None, f"https://pcmap.place.naver.com/place/{place_id}", place_id)
+
+
+def stores_db(existing: list[str] = (), bad_rows: set[str] = frozenset()) -> FakeDB:
+    def handler(query):
+        if query.target != "stores":
+            return []
+        if query.call("in_"):
+            ids = query.call("in_")[1]
+            return [store({"naver_place_id": pid, "name": f"place {pid}"}) for pid in ids if pid in existing]
+        batch = query.call("upsert")[0]
+        if any(row["naver_place_id"] in bad_rows for row in batch):
+            raise RuntimeError("value too long for type character varying(255)")
+        return [store(row) for row in batch]
+
+    return FakeDB(handler)
+
+
+@pytest.fixture
+def collector(monkeypatch):
+    collector = FakeCollector({"3": RuntimeError("timeout")})
+    monkeypatch.setattr(place_service, "collector", collector)
+    return collector
+
+
+@pytest.mark.anyio
+async def test_bulk_dedups_and_reports_each_id(collector):
+    db = stores_db(existing=["5"])
+    payload = StoreBulkCreate(naver_place_ids=["1", "2", "1", "3", "5", "2"])
+
+    items = await store_service.create_stores_bulk(db, payload)
+
+    assert [(i.naver_place_id, i.status) for i in items] == [
+        ("1", "created"), ("2", "created"), ("3", "failed"), ("5", "exists"),
+    ]
+    assert items[0].store.name == "place 1"
+    assert items[2].error == "timeout"
+    # Each new ID is looked up once; existing stores are not looked up
+    assert sorted(collector.looked_up) == ["1", "2", "3"]
+    [upsert] = [q for q in db.executed if q.target == "stores" and q.call("upsert")]
+    assert [row["naver_place_id"] for row in upsert.call("upsert")[0]] == ["1", "2"]
+
+
+@pytest.mark.anyio
+async def test_bulk_enrichment_is_bounded(collector, monkeypatch):
+    monkeypatch.setattr(store_service.settings, "COLLECT_CONCURRENCY", 2)
+    await store_service.create_stores_bulk(stores_db(), StoreBulkCreate(naver_place_ids=[str(i) for i in range(10, 16)]))
+    assert collector.max_in_flight == 2
+
+
+@pytest.mark.anyio
+async def test_bulk_insert_falls_back_to_rows(collector):
+    db = stores_db(bad_rows={"2"})
+
+    items = await store_service.create_stores_bulk(db, StoreBulkCreate(naver_place_ids=["1", "2", "4"]))
+
+    assert [(i.naver_place_id, i.status) for i in items] == [("1", "created"), ("2", "failed"), ("4", "created")]
+    assert "character varying" in items[1].error
+
+
+@pytest.mark.anyio
+async def test_bulk_open_breaker_fails_the_request(monkeypatch):
+    monkeypatch.setattr(place_service, "collector", FakeCollector({"2": CircuitOpenError(30)}))
+    with pytest.raises(CircuitOpenError):
+        await store_service.create_stores_bulk(stores_db(), StoreBulkCreate(naver_place_ids=["1", "2"]))
@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+
+from app import worker
+from app.config import settings
+
+JOBS = [
+    {"id": "k1", "keyword": "cafe", "stores": {"naver_place_id": "1"}, "job_id": 1, "lease_token": "t"},
+    {"id": "k2", "keyword": "pizza", "stores": {"naver_place_id": "2"}, "job_id": 2, "lease_token": "t"},
+]
+
+
+class FakeQueue:
+    def __init__(self, stop: asyncio.Event) -> None:
+        self.stop = stop
+        self.leases = [JOBS]
+        self.released: list[tuple[list[int], str | None]] = []
+        self.renewed = 0
+
+    async def lease_jobs(self, db, worker_id, limit):
+        if not self.leases:
+            self.stop.set()
+            return []
+        return self.leases.pop(0)
+
+    async def release_jobs(self, db, lease_token, job_ids, error, delay_seconds, count_attempt=True):
+        self.released.append((job_ids, error))
+        return len(job_ids)
+
+    async def renew_jobs(self, db, lease_token):
+        self.renewed += 1
+        return 2
+
+    async def complete_jobs(self, db, lease_token, results, serps):
+        raise RuntimeError("connection reset")
+
+
+@pytest.fixture
+def fake_queue(monkeypatch):
+    stop = asyncio.Event()
+    queue = FakeQueue(stop)
+    monkeypatch.setattr(worker, "queue_service", queue)
+
+    async def get_supabase():
+        return None
+
+    monkeypatch.setattr(worker, "get_supabase", get_supabase)
+    return queue
+
+
+@pytest.mark.anyio
+async def test_failed_batch_is_released_and_worker_keeps_running(fake_queue, monkeypatch):
+    async def rank_keyword_group(keyword, targets):
+        return [{"tracked_keyword_id": t["id"], "rank_position": 1} for t in targets], None
+
+    monkeypatch.setattr(worker.ranking_service, "rank_keyword_group", rank_keyword_group)
+    await asyncio.wait_for(worker.run_worker("w", 2, 10, fake_queue.stop), 5)
+    assert fake_queue.released == [([1, 2], "RuntimeError: connection reset")]
+    # The loop went on to lease again after the failure
+    assert not fake_queue.leases
+
+
+@pytest.mark.anyio
+async def test_lease_is_renewed_during_long_batch(fake_queue, monkeypatch):
+    monkeypatch.setattr(settings, "WORKER_LEASE_SECONDS", 0.03)
+
+    async def rank_keyword_group(keyword, targets):
+        await asyncio.sleep(0.05)
+        return [{"tracked_keyword_id": t["id"], "rank_position": 1} for t in targets], None
+
+    monkeypatch.setattr(worker.ranking_service, "rank_keyword_group", rank_keyword_group)
+    with pytest.raises(RuntimeError):
+        await worker.process_jobs(None, JOBS, 2)
+    assert fake_queue.renewed >= 2
+
+
+@pytest.mark.anyio
+async def test_failed_release_does_not_orphan_other_groups(fake_queue, monkeypatch):
+    completed: list[dict] = []
+    jobs = JOBS + [{"id": "k3", "keyword": "ramen", "stores": {"naver_place_id": "3"}, "job_id": 3, "lease_token": "t"}]
+
+    async def rank_keyword_group(keyword, targets):
+        if keyword == "cafe":
+            raise RuntimeError("search failed")
+        await asyncio.sleep(0.02)
+        return [{"tracked_keyword_id": t["id"], "rank_position": 1} for t in targets], None
+
+    async def release_jobs(db, lease_token, job_ids, error, delay_seconds, count_attempt=True):
+        raise RuntimeError("connection reset")
+
+    async def complete_jobs(db, lease_token, results, serps):
+        completed.extend(results)
+        return results
+
+    monkeypatch.setattr(worker.ranking_service, "rank_keyword_group", rank_keyword_group)
+    monkeypatch.setattr(fake_queue, "release_jobs", release_jobs)
+    monkeypatch.setattr(fake_queue, "complete_jobs", complete_jobs)
+
+    stats = await worker.process_jobs(None, jobs, 3)
+
+    assert sorted(r["job_id"] for r in completed) == [2, 3]
+    assert stats.failed == 1
+    assert stats.written == 2
@@ -1,7 +1,9 @@
 import { useState, useEffect, useCallback } from 'react';
-import type { Store, DashboardStore } from '@/types';
+import type { Store, DashboardStore, RankingSnapshot } from '@/types';
 
 const API_BASE = import.meta.env.VITE_API_URL || '';
+// Refetch the dashboard after this long without any event from the stream
+const EVENTS_FALLBACK_POLL_MS = 5 * 60 * 1000;
 
 export function useStores() {
   const [stores, setStores] = useState<Store[]>([]);
@@ -78,5 +80,66 @@ export function useDashboard() {
     fetchDashboard();
   }, [fetchDashboard]);
 
+  // Apply rank updates as they are collected instead of refetching the dashboard
+  useEffect(() => {
+    const events = new EventSource(`${API_BASE}/api/dashboard/events`);
+    let lastEventAt = Date.now();
+    let disconnected = false;
+    events.addEventListener('rank', (e) => {
+      lastEventAt = Date.now();
+      const snapshot: RankingSnapshot = JSON.parse((e as MessageEvent).data);
+      setStores((prev) =>
+        prev.map((store) => ({
+          ...store,
+          keywords: store.keywords.map((kw) => {
+            if (kw.id !== snapshot.tracked_keyword_id) return kw;
+            const latestAt = kw.latest_collected_at ? Date.parse(kw.latest_collected_at) : null;
+            const snapshotAt = Date.parse(snapshot.collected_at);
+            if (latestAt !== null && latestAt > snapshotAt) return kw;
+            // The same snapshot delivered twice (e.g. after a resync) keeps its previous rank
+            const prevRank = latestAt === snapshotAt ? kw.prev_rank : kw.latest_rank;
+            return {
+              ...kw,
+              latest_rank: snapshot.rank_position,
+              prev_rank: prevRank,
+              rank_change:
+                snapshot.rank_position !== null && prevRank !== null ? prevRank - snapshot.rank_position : null,
+              latest_visitor_count: snapshot.visitor_count,
+              latest_blog_review_count: snapshot.blog_review_count,
+              latest_collected_at: snapshot.collected_at,
+            };
+          }),
+        })),
+      );
+    });
+    // A finished run's ranks already arrived as `rank` events; this only shows the stream is alive
+    events.addEventListener('collection', () => {
+      lastEventAt = Date.now();
+    });
+    // Sent when this client fell behind and missed updates
+    events.addEventListener('resync', () => {
+      lastEventAt = Date.now();
+      fetchDashboard();
+    });
+    // Updates published while the stream was down are lost; catch up once it is back
+    events.addEventListener('error', () => {
+      disconnected = true;
+    });
+    events.addEventListener('open', () => {
+      if (disconnected) fetchDashboard();
+      disconnected = false;
+    });
+    // Fallback when the stream goes quiet, e.g. a proxy buffering it
+    const poll = setInterval(() => {
+      if (Date.now() - lastEventAt < EVENTS_FALLBACK_POLL_MS) return;
+      lastEventAt = Date.now();
+      fetchDashboard();
+    }, EVENTS_FALLBACK_POLL_MS / 5);
+    return () => {
+      clearInterval(poll);
+      events.close();
+    };
+  }, [fetchDashboard]);
+
   return { stores, loading, error, fetchDashboard };
 }
@@ -148,8 +148,9 @@ export function DashboardPage() {
         /* continue */
       }
     }
-    toast.success(`전체 수집 완료 - ${success}/${activeKeywords.length}개 키워드의 지표가 수집되었습니다`);
+    // Ranks also arrive over the event stream, but don't rely on it being connected
     fetchDashboard();
+    toast.success(`전체 수집 완료 - ${success}/${activeKeywords.length}개 키워드의 지표가 수집되었습니다`);
   };
 
   const handleAddKeyword = async (storeId: string, keyword: string, collectionTime: string, alertEnabled: boolean) => {
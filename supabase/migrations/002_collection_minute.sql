@@ -0,0 +1,32 @@
+-- tracked_keywords.collection_minute: 수집 슬롯 (하루 중 분, 0~1439)
+-- collection_time(정시 단위) + 키워드 해시 기반 0~59분 분산 오프셋.
+-- 같은 키워드는 항상 같은 슬롯에 배정되어 SERP 1회 조회를 공유하고,
+-- 같은 시각(예: 기본값 15:00)의 키워드들은 한 시간에 걸쳐 고르게 분산됨.
+
+-- 키워드 정규화 (SERP 키 / 슬롯 공통, migration 009 에서도 사용).
+-- 공백 문자 집합을 명시해 DB 로캘과 무관하게 Python str.isspace() 와 같게 맞춤
+-- (탭, 전각 공백 U+3000 등). 연속 공백은 한 칸으로, 앞뒤 공백 제거, 소문자.
+-- 백엔드 ranking_service.normalize_keyword 와 반드시 같은 규칙이어야 함.
+CREATE OR REPLACE FUNCTION normalize_keyword(p_keyword TEXT)
+RETURNS TEXT
+LANGUAGE sql
+IMMUTABLE
+AS $$
+    SELECT lower(btrim(regexp_replace(p_keyword, '[\u0009-\u000d\u001c-\u0020\u0085\u00a0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000]+', ' ', 'g'), ' '));
+$$;
+
+ALTER TABLE tracked_keywords
+    ADD COLUMN collection_minute SMALLINT GENERATED ALWAYS AS (
+        (
+            (
+                EXTRACT(HOUR FROM COALESCE(collection_time, TIME '15:00'))::int * 60
+                + EXTRACT(MINUTE FROM COALESCE(collection_time, TIME '15:00'))::int
+                + ((hashtext(normalize_keyword(keyword))::bigint % 60) + 60) % 60
+            ) % 1440
+        )::smallint
+    ) STORED;
+
+-- 스케줄러는 매 분 도래한 슬롯의 활성 키워드만 조회
+CREATE INDEX idx_keywords_active_minute
+    ON tracked_keywords(collection_minute)
+    WHERE is_active;
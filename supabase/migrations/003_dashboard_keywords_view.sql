@@ -0,0 +1,36 @@
+-- dashboard_keywords: 키워드별 최신/직전 순위를 한 번에 조회하는 뷰
+-- 대시보드가 키워드마다 ranking_snapshots 를 따로 조회하던 N+1 을 제거.
+-- LATERAL + LIMIT 으로 키워드당 idx_snapshots_keyword_time 인덱스 상위 2건만 읽음.
+CREATE VIEW dashboard_keywords AS
+SELECT
+    k.id,
+    k.store_id,
+    k.keyword,
+    k.is_active,
+    k.collection_time,
+    k.alert_enabled,
+    k.created_at,
+    k.updated_at,
+    latest.id AS latest_snapshot_id,
+    latest.rank_position AS latest_rank,
+    latest.total_results AS latest_total_results,
+    latest.visitor_count AS latest_visitor_count,
+    latest.blog_review_count AS latest_blog_review_count,
+    latest.collected_at AS latest_collected_at,
+    prev.rank_position AS prev_rank
+FROM tracked_keywords k
+LEFT JOIN LATERAL (
+    SELECT s.id, s.rank_position, s.total_results, s.visitor_count, s.blog_review_count, s.collected_at
+    FROM ranking_snapshots s
+    WHERE s.tracked_keyword_id = k.id
+    ORDER BY s.collected_at DESC
+    LIMIT 1
+) latest ON true
+LEFT JOIN LATERAL (
+    SELECT s.rank_position
+    FROM ranking_snapshots s
+    WHERE s.tracked_keyword_id = k.id
+    ORDER BY s.collected_at DESC
+    OFFSET 1
+    LIMIT 1
+) prev ON true;
@@ -0,0 +1,104 @@
+-- keyword_latest_rank: 키워드별 최신/직전 순위 materialization
+-- ranking_snapshots INSERT 시 트리거로 갱신되어, 대시보드 조회는
+-- 이력 크기와 무관하게 키워드 수만큼의 PK 조회로 끝남.
+CREATE TABLE keyword_latest_rank (
+    tracked_keyword_id UUID PRIMARY KEY REFERENCES tracked_keywords(id) ON DELETE CASCADE,
+    snapshot_id UUID NOT NULL,
+    rank_position INTEGER,
+    total_results INTEGER,
+    visitor_count INTEGER,
+    blog_review_count INTEGER,
+    collected_at TIMESTAMPTZ NOT NULL,
+    prev_rank_position INTEGER,
+    prev_collected_at TIMESTAMPTZ
+);
+
+-- 수집 배치(다중 행 INSERT)당 1회 실행되는 statement-level 트리거.
+-- 기존 최신값보다 오래된 스냅샷은 무시 (늦게 도착한 과거 데이터는 rebuild 로 반영).
+CREATE FUNCTION apply_snapshots_to_latest_rank() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO keyword_latest_rank AS l (
+        tracked_keyword_id, snapshot_id, rank_position, total_results,
+        visitor_count, blog_review_count, collected_at
+    )
+    SELECT DISTINCT ON (n.tracked_keyword_id)
+        n.tracked_keyword_id, n.id, n.rank_position, n.total_results,
+        n.visitor_count, n.blog_review_count, n.collected_at
+    FROM new_rows n
+    ORDER BY n.tracked_keyword_id, n.collected_at DESC
+    ON CONFLICT (tracked_keyword_id) DO UPDATE SET
+        snapshot_id = EXCLUDED.snapshot_id,
+        rank_position = EXCLUDED.rank_position,
+        total_results = EXCLUDED.total_results,
+        visitor_count = EXCLUDED.visitor_count,
+        blog_review_count = EXCLUDED.blog_review_count,
+        collected_at = EXCLUDED.collected_at,
+        prev_rank_position = l.rank_position,
+        prev_collected_at = l.collected_at
+    WHERE EXCLUDED.collected_at >= l.collected_at;
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER trg_snapshots_latest_rank
+    AFTER INSERT ON ranking_snapshots
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION apply_snapshots_to_latest_rank();
+
+-- 전체 재구성: ranking_snapshots 로부터 keyword_latest_rank 를 다시 계산
+-- (python -m app.cli rebuild-latest-rank, 또는 SQL 에서 직접 호출)
+CREATE FUNCTION rebuild_keyword_latest_rank() RETURNS integer
+LANGUAGE plpgsql AS $$
+DECLARE
+    n integer;
+BEGIN
+    DELETE FROM keyword_latest_rank;
+
+    WITH ranked AS (
+        SELECT s.*, row_number() OVER (
+            PARTITION BY s.tracked_keyword_id ORDER BY s.collected_at DESC
+        ) AS rn
+        FROM ranking_snapshots s
+    )
+    INSERT INTO keyword_latest_rank (
+        tracked_keyword_id, snapshot_id, rank_position, total_results,
+        visitor_count, blog_review_count, collected_at,
+        prev_rank_position, prev_collected_at
+    )
+    SELECT
+        l.tracked_keyword_id, l.id, l.rank_position, l.total_results,
+        l.visitor_count, l.blog_review_count, l.collected_at,
+        p.rank_position, p.collected_at
+    FROM ranked l
+    LEFT JOIN ranked p ON p.tracked_keyword_id = l.tracked_keyword_id AND p.rn = 2
+    WHERE l.rn = 1;
+
+    GET DIAGNOSTICS n = ROW_COUNT;
+    RETURN n;
+END;
+$$;
+
+SELECT rebuild_keyword_latest_rank();
+
+-- dashboard_keywords 뷰를 materialization 기반으로 교체 (컬럼 구성 동일)
+CREATE OR REPLACE VIEW dashboard_keywords AS
+SELECT
+    k.id,
+    k.store_id,
+    k.keyword,
+    k.is_active,
+    k.collection_time,
+    k.alert_enabled,
+    k.created_at,
+    k.updated_at,
+    r.snapshot_id AS latest_snapshot_id,
+    r.rank_position AS latest_rank,
+    r.total_results AS latest_total_results,
+    r.visitor_count AS latest_visitor_count,
+    r.blog_review_count AS latest_blog_review_count,
+    r.collected_at AS latest_collected_at,
+    r.prev_rank_position AS prev_rank
+FROM tracked_keywords k
+LEFT JOIN keyword_latest_rank r ON r.tracked_keyword_id = k.id;
@@ -0,0 +1,149 @@
+-- ranking_daily: 키워드별 일 단위 순위 집계 (Asia/Seoul 기준 날짜)
+-- 장기간 차트는 원본 hourly 스냅샷 대신 이 테이블에서 day/week 해상도로 조회.
+-- avg 는 rank_sum / found 로 계산 (주 단위 재집계 시에도 정확).
+CREATE TABLE ranking_daily (
+    tracked_keyword_id UUID NOT NULL REFERENCES tracked_keywords(id) ON DELETE CASCADE,
+    day DATE NOT NULL,
+    samples INTEGER NOT NULL,
+    found INTEGER NOT NULL,
+    rank_sum BIGINT NOT NULL,
+    min_rank INTEGER,
+    max_rank INTEGER,
+    last_visitor_count INTEGER,
+    last_blog_review_count INTEGER,
+    last_collected_at TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY (tracked_keyword_id, day)
+);
+
+-- 수집 배치(다중 행 INSERT)마다 해당 키워드/날짜 집계를 증분 갱신
+CREATE FUNCTION apply_snapshots_to_daily() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO ranking_daily AS d (
+        tracked_keyword_id, day, samples, found, rank_sum, min_rank, max_rank,
+        last_visitor_count, last_blog_review_count, last_collected_at
+    )
+    SELECT
+        n.tracked_keyword_id,
+        (n.collected_at AT TIME ZONE 'Asia/Seoul')::date,
+        count(*),
+        count(n.rank_position),
+        coalesce(sum(n.rank_position), 0),
+        min(n.rank_position),
+        max(n.rank_position),
+        (array_agg(n.visitor_count ORDER BY n.collected_at DESC))[1],
+        (array_agg(n.blog_review_count ORDER BY n.collected_at DESC))[1],
+        max(n.collected_at)
+    FROM new_rows n
+    GROUP BY 1, 2
+    ON CONFLICT (tracked_keyword_id, day) DO UPDATE SET
+        samples = d.samples + EXCLUDED.samples,
+        found = d.found + EXCLUDED.found,
+        rank_sum = d.rank_sum + EXCLUDED.rank_sum,
+        min_rank = LEAST(d.min_rank, EXCLUDED.min_rank),
+        max_rank = GREATEST(d.max_rank, EXCLUDED.max_rank),
+        last_visitor_count = CASE WHEN EXCLUDED.last_collected_at >= d.last_collected_at
+            THEN EXCLUDED.last_visitor_count ELSE d.last_visitor_count END,
+        last_blog_review_count = CASE WHEN EXCLUDED.last_collected_at >= d.last_collected_at
+            THEN EXCLUDED.last_blog_review_count ELSE d.last_blog_review_count END,
+        last_collected_at = GREATEST(d.last_collected_at, EXCLUDED.last_collected_at);
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER trg_snapshots_daily
+    AFTER INSERT ON ranking_snapshots
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION apply_snapshots_to_daily();
+
+-- 전체 재구성 (python -m app.cli rebuild-daily-rollup)
+CREATE FUNCTION rebuild_ranking_daily() RETURNS integer
+LANGUAGE plpgsql AS $$
+DECLARE
+    n integer;
+BEGIN
+    DELETE FROM ranking_daily;
+
+    INSERT INTO ranking_daily (
+        tracked_keyword_id, day, samples, found, rank_sum, min_rank, max_rank,
+        last_visitor_count, last_blog_review_count, last_collected_at
+    )
+    SELECT
+        s.tracked_keyword_id,
+        (s.collected_at AT TIME ZONE 'Asia/Seoul')::date,
+        count(*),
+        count(s.rank_position),
+        coalesce(sum(s.rank_position), 0),
+        min(s.rank_position),
+        max(s.rank_position),
+        (array_agg(s.visitor_count ORDER BY s.collected_at DESC))[1],
+        (array_agg(s.blog_review_count ORDER BY s.collected_at DESC))[1],
+        max(s.collected_at)
+    FROM ranking_snapshots s
+    GROUP BY 1, 2;
+
+    GET DIAGNOSTICS n = ROW_COUNT;
+    RETURN n;
+END;
+$$;
+
+SELECT rebuild_ranking_daily();
+
+-- 해상도별 순위 시계열 (hour: 원본 스냅샷, day/week: ranking_daily)
+-- p_from / p_to 는 Asia/Seoul 기준 날짜 (양 끝 포함)
+CREATE FUNCTION ranking_series(
+    p_keyword_id UUID,
+    p_resolution TEXT,
+    p_from DATE DEFAULT NULL,
+    p_to DATE DEFAULT NULL
+) RETURNS TABLE (
+    bucket TIMESTAMPTZ,
+    samples BIGINT,
+    min_rank INTEGER,
+    max_rank INTEGER,
+    avg_rank NUMERIC,
+    not_found_ratio NUMERIC,
+    visitor_count INTEGER,
+    blog_review_count INTEGER,
+    collected_at TIMESTAMPTZ
+)
+LANGUAGE sql STABLE AS $$
+    SELECT
+        date_trunc('hour', s.collected_at),
+        count(*),
+        min(s.rank_position),
+        max(s.rank_position),
+        round(avg(s.rank_position), 2),
+        round(1 - count(s.rank_position)::numeric / count(*), 4),
+        (array_agg(s.visitor_count ORDER BY s.collected_at DESC))[1],
+        (array_agg(s.blog_review_count ORDER BY s.collected_at DESC))[1],
+        max(s.collected_at)
+    FROM ranking_snapshots s
+    WHERE p_resolution = 'hour'
+      AND s.tracked_keyword_id = p_keyword_id
+      AND (p_from IS NULL OR s.collected_at >= p_from::timestamp AT TIME ZONE 'Asia/Seoul')
+      AND (p_to IS NULL OR s.collected_at < (p_to + 1)::timestamp AT TIME ZONE 'Asia/Seoul')
+    GROUP BY 1
+
+    UNION ALL
+
+    SELECT
+        date_trunc(p_resolution, d.day::timestamp) AT TIME ZONE 'Asia/Seoul',
+        sum(d.samples),
+        min(d.min_rank),
+        max(d.max_rank),
+        round(sum(d.rank_sum)::numeric / nullif(sum(d.found), 0), 2),
+        round(1 - sum(d.found)::numeric / sum(d.samples), 4),
+        (array_agg(d.last_visitor_count ORDER BY d.last_collected_at DESC))[1],
+        (array_agg(d.last_blog_review_count ORDER BY d.last_collected_at DESC))[1],
+        max(d.last_collected_at)
+    FROM ranking_daily d
+    WHERE p_resolution IN ('day', 'week')
+      AND d.tracked_keyword_id = p_keyword_id
+      AND (p_from IS NULL OR d.day >= p_from)
+      AND (p_to IS NULL OR d.day <= p_to)
+    GROUP BY 1
+
+    ORDER BY 1 DESC;
+$$;
@@ -0,0 +1,235 @@
+-- ranking_snapshots 월 단위 RANGE 파티셔닝 + 보존 정책
+-- - 파티션: ranking_snapshots_yYYYYmMM (collected_at 기준, Asia/Seoul 아닌 UTC 월 경계,
+--   경계는 세션 TimeZone 과 무관하게 AT TIME ZONE 'UTC' 로 지정)
+-- - ensure_snapshot_partitions(n): 이번 달부터 n개월 앞까지 파티션 생성 (스케줄러가 매일 호출)
+-- - apply_snapshot_retention(days): days 보다 오래된 월 파티션 삭제
+--   (삭제 전 데이터는 이미 ranking_daily 에 집계되어 있음, migration 005)
+-- PK 에 파티션 키가 포함되어야 하므로 (id, collected_at) 로 변경.
+
+ALTER TABLE ranking_snapshots RENAME TO ranking_snapshots_legacy;
+ALTER INDEX idx_snapshots_keyword_time RENAME TO idx_snapshots_legacy_keyword_time;
+
+CREATE TABLE ranking_snapshots (
+    id UUID NOT NULL DEFAULT gen_random_uuid(),
+    tracked_keyword_id UUID NOT NULL REFERENCES tracked_keywords(id) ON DELETE CASCADE,
+    rank_position INTEGER,
+    total_results INTEGER,
+    visitor_count INTEGER,
+    blog_review_count INTEGER,
+    collected_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (id, collected_at)
+) PARTITION BY RANGE (collected_at);
+
+CREATE INDEX idx_snapshots_keyword_time
+    ON ranking_snapshots(tracked_keyword_id, collected_at DESC);
+
+-- DEFAULT 파티션은 두지 않음: 파티션이 없는 구간의 INSERT 는 조용히 쌓이지 않고 오류로 드러남.
+-- (DEFAULT 에 행이 있으면 같은 범위의 월 파티션 생성이 실패하고, 보존 정책도 적용되지 않음)
+-- 스케줄러가 매일 SNAPSHOT_PARTITIONS_AHEAD 개월 앞까지 미리 생성.
+
+CREATE FUNCTION create_snapshot_partition(p_month DATE) RETURNS void
+LANGUAGE plpgsql AS $$
+DECLARE
+    start_at DATE := date_trunc('month', p_month)::date;
+BEGIN
+    EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS %I PARTITION OF ranking_snapshots FOR VALUES FROM (%L) TO (%L)',
+        'ranking_snapshots_' || to_char(start_at, '"y"YYYY"m"MM'),
+        start_at::timestamp AT TIME ZONE 'UTC',
+        (start_at + interval '1 month')::timestamp AT TIME ZONE 'UTC'
+    );
+END;
+$$;
+
+CREATE FUNCTION ensure_snapshot_partitions(p_months_ahead INTEGER DEFAULT 3) RETURNS integer
+LANGUAGE plpgsql AS $$
+DECLARE
+    m INTEGER;
+BEGIN
+    FOR m IN 0..p_months_ahead LOOP
+        PERFORM create_snapshot_partition((date_trunc('month', now() AT TIME ZONE 'UTC') + make_interval(months => m))::date);
+    END LOOP;
+    RETURN p_months_ahead + 1;
+END;
+$$;
+
+-- 기존 데이터 구간의 파티션 생성 후 이관 (트리거는 이관 후에 생성하여 집계 중복 방지)
+DO $$
+DECLARE
+    first_month DATE;
+    m DATE;
+BEGIN
+    SELECT date_trunc('month', min(collected_at) AT TIME ZONE 'UTC')::date INTO first_month
+    FROM ranking_snapshots_legacy;
+    IF first_month IS NOT NULL THEN
+        m := first_month;
+        WHILE m <= (now() AT TIME ZONE 'UTC')::date LOOP
+            PERFORM create_snapshot_partition(m);
+            m := (m + interval '1 month')::date;
+        END LOOP;
+    END IF;
+END;
+$$;
+
+SELECT ensure_snapshot_partitions(3);
+
+INSERT INTO ranking_snapshots (
+    id, tracked_keyword_id, rank_position, total_results, visitor_count, blog_review_count, collected_at
+)
+SELECT id, tracked_keyword_id, rank_position, total_results, visitor_count, blog_review_count,
+       coalesce(collected_at, now())
+FROM ranking_snapshots_legacy;
+
+DROP TABLE ranking_snapshots_legacy;
+
+CREATE TRIGGER trg_snapshots_latest_rank
+    AFTER INSERT ON ranking_snapshots
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION apply_snapshots_to_latest_rank();
+
+CREATE TRIGGER trg_snapshots_daily
+    AFTER INSERT ON ranking_snapshots
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION apply_snapshots_to_daily();
+
+-- 보존 기간이 지난 월 파티션 삭제. 해당 월 전체가 기준 시점 이전일 때만 삭제.
+CREATE FUNCTION apply_snapshot_retention(p_raw_days INTEGER) RETURNS integer
+LANGUAGE plpgsql AS $$
+DECLARE
+    cutoff DATE := date_trunc('month', (now() AT TIME ZONE 'UTC') - make_interval(days => p_raw_days))::date;
+    part RECORD;
+    dropped INTEGER := 0;
+BEGIN
+    FOR part IN
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'ranking_snapshots'::regclass
+          AND c.relname ~ '^ranking_snapshots_y\d{4}m\d{2}$'
+          AND to_date(substring(c.relname from 'y(\d{4}m\d{2})$'), 'YYYY"m"MM') < cutoff
+    LOOP
+        EXECUTE format('DROP TABLE %I', part.relname);
+        dropped := dropped + 1;
+    END LOOP;
+    RETURN dropped;
+END;
+$$;
+
+-- 원본이 삭제된 기간의 집계를 보존하도록 재구성 함수들을 원본이 남아 있는 범위로 한정
+CREATE OR REPLACE FUNCTION rebuild_ranking_daily() RETURNS integer
+LANGUAGE plpgsql AS $$
+DECLARE
+    first_day DATE;
+    n integer;
+BEGIN
+    SELECT (min(collected_at) AT TIME ZONE 'Asia/Seoul')::date INTO first_day FROM ranking_snapshots;
+    IF first_day IS NULL THEN
+        RETURN 0;
+    END IF;
+
+    DELETE FROM ranking_daily WHERE day >= first_day;
+
+    INSERT INTO ranking_daily (
+        tracked_keyword_id, day, samples, found, rank_sum, min_rank, max_rank,
+        last_visitor_count, last_blog_review_count, last_collected_at
+    )
+    SELECT
+        s.tracked_keyword_id,
+        (s.collected_at AT TIME ZONE 'Asia/Seoul')::date,
+        count(*),
+        count(s.rank_position),
+        coalesce(sum(s.rank_position), 0),
+        min(s.rank_position),
+        max(s.rank_position),
+        (array_agg(s.visitor_count ORDER BY s.collected_at DESC))[1],
+        (array_agg(s.blog_review_count ORDER BY s.collected_at DESC))[1],
+        max(s.collected_at)
+    FROM ranking_snapshots s
+    GROUP BY 1, 2;
+
+    GET DIAGNOSTICS n = ROW_COUNT;
+    RETURN n;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION rebuild_keyword_latest_rank() RETURNS integer
+LANGUAGE plpgsql AS $$
+DECLARE
+    n integer;
+BEGIN
+    WITH ranked AS (
+        SELECT s.*, row_number() OVER (
+            PARTITION BY s.tracked_keyword_id ORDER BY s.collected_at DESC
+        ) AS rn
+        FROM ranking_snapshots s
+    )
+    INSERT INTO keyword_latest_rank AS r (
+        tracked_keyword_id, snapshot_id, rank_position, total_results,
+        visitor_count, blog_review_count, collected_at,
+        prev_rank_position, prev_collected_at
+    )
+    SELECT
+        l.tracked_keyword_id, l.id, l.rank_position, l.total_results,
+        l.visitor_count, l.blog_review_count, l.collected_at,
+        p.rank_position, p.collected_at
+    FROM ranked l
+    LEFT JOIN ranked p ON p.tracked_keyword_id = l.tracked_keyword_id AND p.rn = 2
+    WHERE l.rn = 1
+    ON CONFLICT (tracked_keyword_id) DO UPDATE SET
+        snapshot_id = EXCLUDED.snapshot_id,
+        rank_position = EXCLUDED.rank_position,
+        total_results = EXCLUDED.total_results,
+        visitor_count = EXCLUDED.visitor_count,
+        blog_review_count = EXCLUDED.blog_review_count,
+        collected_at = EXCLUDED.collected_at,
+        prev_rank_position = EXCLUDED.prev_rank_position,
+        prev_collected_at = EXCLUDED.prev_collected_at;
+
+    GET DIAGNOSTICS n = ROW_COUNT;
+    RETURN n;
+END;
+$$;
+
+-- 원본 + 집계를 이어 붙인 순위 이력 (get_rankings 용).
+-- 키워드의 가장 오래된 원본 스냅샷 이전 구간은 ranking_daily 의 일 평균 순위로 채움.
+CREATE FUNCTION ranking_history(
+    p_keyword_id UUID,
+    p_from TIMESTAMPTZ DEFAULT NULL,
+    p_to TIMESTAMPTZ DEFAULT NULL
+) RETURNS TABLE (
+    id TEXT,
+    tracked_keyword_id UUID,
+    rank_position INTEGER,
+    total_results INTEGER,
+    visitor_count INTEGER,
+    blog_review_count INTEGER,
+    collected_at TIMESTAMPTZ
+)
+LANGUAGE sql STABLE AS $$
+    WITH horizon AS (
+        SELECT min(s.collected_at) AS raw_since
+        FROM ranking_snapshots s
+        WHERE s.tracked_keyword_id = p_keyword_id
+    )
+    SELECT s.id::text, s.tracked_keyword_id, s.rank_position, s.total_results,
+           s.visitor_count, s.blog_review_count, s.collected_at
+    FROM ranking_snapshots s
+    WHERE s.tracked_keyword_id = p_keyword_id
+      AND (p_from IS NULL OR s.collected_at >= p_from)
+      AND (p_to IS NULL OR s.collected_at <= p_to)
+
+    UNION ALL
+
+    SELECT 'daily:' || d.day, d.tracked_keyword_id,
+           round(d.rank_sum::numeric / nullif(d.found, 0))::int, NULL,
+           d.last_visitor_count, d.last_blog_review_count, d.last_collected_at
+    FROM ranking_daily d, horizon h
+    WHERE d.tracked_keyword_id = p_keyword_id
+      AND (h.raw_since IS NULL OR d.last_collected_at < h.raw_since)
+      AND (p_from IS NULL OR d.last_collected_at >= p_from)
+      AND (p_to IS NULL OR d.last_collected_at <= p_to)
+
+    ORDER BY collected_at DESC;
+$$;
@@ -0,0 +1,39 @@
+-- place_info_cache: pcmap 상세 페이지에서 파싱한 매장 정보 캐시 (naver_place_id 기준)
+-- 매장 삭제 후 재등록 / 대량 등록 시 상세 페이지 재수집을 피하고,
+-- 스케줄러가 오래된 항목부터 소량씩 백그라운드 갱신.
+-- stores 와 FK 를 두지 않음 (삭제된 매장의 캐시도 재등록 시 재사용).
+CREATE TABLE place_info_cache (
+    naver_place_id VARCHAR(20) PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    category VARCHAR(100),
+    address TEXT,
+    naver_place_url TEXT,
+    fetched_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- 백그라운드 갱신 실패 기록 (성공 시 삭제). 실패할 때마다 retry_at 을 지수적으로 늦춰
+-- 계속 실패하는 매장이 갱신 대기열 앞자리를 차지하지 않도록 함.
+CREATE TABLE place_refresh_failures (
+    naver_place_id VARCHAR(20) PRIMARY KEY,
+    failures INTEGER NOT NULL DEFAULT 1,
+    attempted_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    retry_at TIMESTAMPTZ NOT NULL
+);
+
+-- 추적 중인 매장별 캐시 갱신 시각 (NULL = 캐시 없음) + 마지막 시도 / 재시도 가능 시각. 갱신 대상 선택용.
+-- attempted_at: 성공(fetched_at)과 실패 중 최근 시도 → 오래 시도하지 않은 매장부터 갱신
+-- 현재 stores 값(name/category/address)은 변경 여부 비교용.
+CREATE VIEW store_place_refresh_queue AS
+SELECT
+    s.id AS store_id,
+    s.naver_place_id,
+    s.name,
+    s.category,
+    s.address,
+    c.fetched_at,
+    greatest(c.fetched_at, f.attempted_at) AS attempted_at,
+    coalesce(f.retry_at, '-infinity') AS retry_at,
+    coalesce(f.failures, 0) AS failures
+FROM stores s
+LEFT JOIN place_info_cache c ON c.naver_place_id = s.naver_place_id
+LEFT JOIN place_refresh_failures f ON f.naver_place_id = s.naver_place_id;
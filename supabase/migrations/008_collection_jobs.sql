@@ -0,0 +1,178 @@
+-- collection_jobs: 수집 작업 큐 (키워드 × 수집 슬롯)
+-- 스케줄러(들)는 도래한 슬롯의 작업을 적재만 하고, 별도 워커 프로세스(python -m app.worker)가
+-- FOR UPDATE SKIP LOCKED 로 작업을 임대(lease)해 수집. 워커는 여러 대 실행 가능.
+-- (tracked_keyword_id, slot_at) 유니크 → 여러 스케줄러가 같은 슬롯을 적재해도 중복 없음.
+CREATE TABLE collection_jobs (
+    id BIGSERIAL PRIMARY KEY,
+    tracked_keyword_id UUID NOT NULL REFERENCES tracked_keywords(id) ON DELETE CASCADE,
+    slot_at TIMESTAMPTZ NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending'
+        CHECK (status IN ('pending', 'leased', 'done', 'failed')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    lease_token UUID,
+    leased_by TEXT,
+    lease_expires_at TIMESTAMPTZ,
+    last_error TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    completed_at TIMESTAMPTZ,
+    UNIQUE (tracked_keyword_id, slot_at)
+);
+
+CREATE INDEX idx_collection_jobs_open
+    ON collection_jobs (slot_at)
+    WHERE status IN ('pending', 'leased');
+
+-- 슬롯 적재: collection_minute 이 p_minutes 에 속한 활성 키워드마다 작업 1건
+CREATE OR REPLACE FUNCTION enqueue_collection_jobs(p_slot_at TIMESTAMPTZ, p_minutes INTEGER[])
+RETURNS INTEGER
+LANGUAGE sql
+AS $$
+    WITH inserted AS (
+        INSERT INTO collection_jobs (tracked_keyword_id, slot_at)
+        SELECT id, p_slot_at
+        FROM tracked_keywords
+        WHERE is_active AND collection_minute = ANY(p_minutes)
+        ON CONFLICT (tracked_keyword_id, slot_at) DO NOTHING
+        RETURNING 1
+    )
+    SELECT count(*)::int FROM inserted;
+$$;
+
+-- 작업 임대: 대기 중이거나 임대가 만료된 작업을 최대 p_limit 건, 같은 키워드끼리 붙여서 반환
+-- (워커가 SERP 1회 조회를 공유하도록). 임대 만료 + 재시도 소진 작업은 failed 처리.
+CREATE OR REPLACE FUNCTION lease_collection_jobs(
+    p_worker TEXT,
+    p_limit INTEGER,
+    p_lease_seconds INTEGER,
+    p_max_attempts INTEGER
+)
+RETURNS TABLE (
+    job_id BIGINT,
+    lease_token UUID,
+    tracked_keyword_id UUID,
+    keyword VARCHAR,
+    naver_place_id VARCHAR,
+    slot_at TIMESTAMPTZ,
+    attempts INTEGER
+)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_token UUID := gen_random_uuid();
+BEGIN
+    UPDATE collection_jobs j
+    SET status = 'failed', lease_token = NULL, last_error = coalesce(j.last_error, 'lease expired')
+    WHERE j.status = 'leased' AND j.lease_expires_at < now() AND j.attempts >= p_max_attempts;
+
+    RETURN QUERY
+    WITH picked AS (
+        SELECT j.id
+        FROM collection_jobs j
+        JOIN tracked_keywords k ON k.id = j.tracked_keyword_id
+        WHERE (j.status = 'pending' AND j.available_at <= now())
+           OR (j.status = 'leased' AND j.lease_expires_at < now())
+        ORDER BY j.slot_at, lower(k.keyword)
+        LIMIT p_limit
+        FOR UPDATE OF j SKIP LOCKED
+    )
+    UPDATE collection_jobs j
+    SET status = 'leased',
+        lease_token = v_token,
+        leased_by = p_worker,
+        lease_expires_at = now() + make_interval(secs => p_lease_seconds),
+        attempts = j.attempts + 1
+    FROM picked, tracked_keywords k, stores s
+    WHERE j.id = picked.id AND k.id = j.tracked_keyword_id AND s.id = k.store_id
+    RETURNING j.id, v_token, j.tracked_keyword_id, k.keyword, s.naver_place_id, j.slot_at, j.attempts;
+END;
+$$;
+
+-- 작업 완료: 아직 같은 임대를 보유한 작업만 done 처리하고, 그 작업의 스냅샷만 기록.
+-- 임대가 만료되어 다른 워커가 가져간 작업의 결과는 버려지므로 (키워드, 슬롯)당 스냅샷은 1건.
+-- p_snapshots: [{job_id, tracked_keyword_id, rank_position, total_results, visitor_count, blog_review_count}]
+CREATE OR REPLACE FUNCTION complete_collection_jobs(p_lease_token UUID, p_snapshots JSONB)
+RETURNS SETOF ranking_snapshots
+LANGUAGE sql
+AS $$
+    WITH results AS (
+        SELECT *
+        FROM jsonb_to_recordset(p_snapshots) AS r(
+            job_id BIGINT,
+            tracked_keyword_id UUID,
+            rank_position INTEGER,
+            total_results INTEGER,
+            visitor_count INTEGER,
+            blog_review_count INTEGER
+        )
+    ),
+    done AS (
+        UPDATE collection_jobs j
+        SET status = 'done', completed_at = now(), lease_token = NULL, last_error = NULL
+        FROM results r
+        WHERE j.id = r.job_id AND j.lease_token = p_lease_token AND j.status = 'leased'
+        RETURNING j.id
+    )
+    INSERT INTO ranking_snapshots (tracked_keyword_id, rank_position, total_results, visitor_count, blog_review_count)
+    SELECT r.tracked_keyword_id, r.rank_position, r.total_results, r.visitor_count, r.blog_review_count
+    FROM results r
+    JOIN done d ON d.id = r.job_id
+    RETURNING *;
+$$;
+
+-- 임대 연장: 배치 처리 중인 워커가 주기적으로 호출해 긴 배치가 임대 시간을 넘기지 않도록 함.
+-- 아직 같은 임대를 보유한 작업만 연장 (다른 워커가 가져간 작업은 그대로). 연장된 작업 수 반환.
+CREATE OR REPLACE FUNCTION renew_collection_jobs(p_lease_token UUID, p_lease_seconds INTEGER)
+RETURNS INTEGER
+LANGUAGE sql
+AS $$
+    WITH renewed AS (
+        UPDATE collection_jobs j
+        SET lease_expires_at = now() + make_interval(secs => p_lease_seconds)
+        WHERE j.lease_token = p_lease_token AND j.status = 'leased'
+        RETURNING 1
+    )
+    SELECT count(*)::int FROM renewed;
+$$;
+
+-- 작업 반납: 수집 실패 시 p_delay_seconds 후 재시도 (시도 횟수 소진 시 failed).
+-- circuit breaker 로 보류된 작업은 p_count_attempt = false 로 시도 횟수에서 제외.
+CREATE OR REPLACE FUNCTION release_collection_jobs(
+    p_lease_token UUID,
+    p_job_ids BIGINT[],
+    p_error TEXT,
+    p_delay_seconds INTEGER,
+    p_max_attempts INTEGER,
+    p_count_attempt BOOLEAN DEFAULT true
+)
+RETURNS INTEGER
+LANGUAGE sql
+AS $$
+    WITH released AS (
+        UPDATE collection_jobs j
+        SET attempts = j.attempts - CASE WHEN p_count_attempt THEN 0 ELSE 1 END,
+            status = CASE
+                WHEN p_count_attempt AND j.attempts >= p_max_attempts THEN 'failed'
+                ELSE 'pending'
+            END,
+            available_at = now() + make_interval(secs => p_delay_seconds),
+            lease_token = NULL,
+            last_error = p_error
+        WHERE j.id = ANY(p_job_ids) AND j.lease_token = p_lease_token AND j.status = 'leased'
+        RETURNING 1
+    )
+    SELECT count(*)::int FROM released;
+$$;
+
+-- 완료/실패 작업 정리 (일일 유지보수 작업에서 호출)
+CREATE OR REPLACE FUNCTION prune_collection_jobs(p_days INTEGER)
+RETURNS INTEGER
+LANGUAGE sql
+AS $$
+    WITH deleted AS (
+        DELETE FROM collection_jobs
+        WHERE status IN ('done', 'failed') AND slot_at < now() - make_interval(days => p_days)
+        RETURNING 1
+    )
+    SELECT count(*)::int FROM deleted;
+$$;
@@ -0,0 +1,156 @@
+-- serp_snapshots: 키워드 수집 1회당 검색 결과 전체(순위 순서)를 1행으로 저장
+-- 순위 수집 시 이미 파싱한 결과를 그대로 기록하므로 경쟁 매장 분석에 추가 요청 없음.
+-- 배열 인덱스 = 순위 (1부터). place_id 를 알 수 없는 순위는 NULL.
+
+-- keyword 는 normalize_keyword (migration 002) 결과: 수집 슬롯과 같은 키
+
+CREATE TABLE serp_snapshots (
+    id BIGSERIAL PRIMARY KEY,
+    keyword TEXT NOT NULL,
+    total_results INTEGER,
+    place_ids BIGINT[] NOT NULL,
+    visitor_counts INTEGER[] NOT NULL,
+    blog_review_counts INTEGER[] NOT NULL,
+    collected_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX idx_serp_snapshots_keyword_time
+    ON serp_snapshots (keyword, collected_at DESC);
+
+-- "내 위에 누가 있나": p_at 시점(기본 현재) 최신 SERP 에서 추적 매장보다 높은 순위의 매장들.
+-- 추적 매장이 결과에 없으면 전체 목록 반환.
+CREATE OR REPLACE FUNCTION serp_above(p_keyword_id UUID, p_at TIMESTAMPTZ DEFAULT NULL)
+RETURNS TABLE (
+    rank_position INTEGER,
+    naver_place_id TEXT,
+    name TEXT,
+    visitor_count INTEGER,
+    blog_review_count INTEGER,
+    collected_at TIMESTAMPTZ
+)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH target AS (
+        SELECT normalize_keyword(k.keyword) AS keyword, s.naver_place_id
+        FROM tracked_keywords k
+        JOIN stores s ON s.id = k.store_id
+        WHERE k.id = p_keyword_id
+    ),
+    serp AS (
+        -- 텍스트로 비교: 숫자가 아닌 place ID 가 등록돼 있어도 캐스트 오류 없이 순위 없음으로 처리
+        SELECT x.*, array_position(x.place_ids::text[], t.naver_place_id) AS own_rank
+        FROM target t
+        JOIN LATERAL (
+            SELECT *
+            FROM serp_snapshots ss
+            WHERE ss.keyword = t.keyword AND ss.collected_at <= coalesce(p_at, now())
+            ORDER BY ss.collected_at DESC
+            LIMIT 1
+        ) x ON true
+    )
+    SELECT
+        e.rank::int,
+        e.place_id::text,
+        coalesce(st.name, pc.name),
+        serp.visitor_counts[e.rank],
+        serp.blog_review_counts[e.rank],
+        serp.collected_at
+    FROM serp
+    CROSS JOIN LATERAL unnest(serp.place_ids) WITH ORDINALITY AS e(place_id, rank)
+    LEFT JOIN stores st ON st.naver_place_id = e.place_id::text
+    LEFT JOIN place_info_cache pc ON pc.naver_place_id = e.place_id::text
+    WHERE e.place_id IS NOT NULL
+      AND e.rank < coalesce(serp.own_rank, cardinality(serp.place_ids) + 1)
+    ORDER BY e.rank;
+$$;
+
+-- 경쟁 매장 순위 이력: 추적 키워드의 SERP 에서 p_place_id 의 순위 (결과에 없으면 rank_position NULL)
+CREATE OR REPLACE FUNCTION serp_rank_history(
+    p_keyword_id UUID,
+    p_place_id TEXT,
+    p_from TIMESTAMPTZ DEFAULT NULL,
+    p_to TIMESTAMPTZ DEFAULT NULL
+)
+RETURNS TABLE (
+    rank_position INTEGER,
+    total_results INTEGER,
+    visitor_count INTEGER,
+    blog_review_count INTEGER,
+    collected_at TIMESTAMPTZ
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT p.pos, x.total_results, x.visitor_counts[p.pos], x.blog_review_counts[p.pos], x.collected_at
+    FROM serp_snapshots x
+    CROSS JOIN LATERAL (SELECT array_position(x.place_ids::text[], p_place_id) AS pos) p
+    WHERE x.keyword = (SELECT normalize_keyword(keyword) FROM tracked_keywords WHERE id = p_keyword_id)
+      AND x.collected_at >= coalesce(p_from, '-infinity')
+      AND x.collected_at <= coalesce(p_to, 'infinity')
+    ORDER BY x.collected_at DESC;
+$$;
+
+-- 보존 기간 지난 SERP 삭제 (일일 유지보수 작업에서 SNAPSHOT_RETENTION_DAYS 로 호출)
+CREATE OR REPLACE FUNCTION prune_serp_snapshots(p_days INTEGER)
+RETURNS INTEGER
+LANGUAGE sql
+AS $$
+    WITH deleted AS (
+        DELETE FROM serp_snapshots
+        WHERE collected_at < now() - make_interval(days => p_days)
+        RETURNING 1
+    )
+    SELECT count(*)::int FROM deleted;
+$$;
+
+-- 워커 작업 완료 시 SERP 도 같은 트랜잭션에서 기록 (migration 008 의 함수를 교체).
+-- p_serps: [{job_ids, keyword, total_results, place_ids, visitor_counts, blog_review_counts}]
+-- 임대가 유지된 작업이 하나라도 포함된 SERP 만 기록.
+DROP FUNCTION complete_collection_jobs(UUID, JSONB);
+
+CREATE FUNCTION complete_collection_jobs(
+    p_lease_token UUID,
+    p_snapshots JSONB,
+    p_serps JSONB DEFAULT '[]'
+)
+RETURNS SETOF ranking_snapshots
+LANGUAGE sql
+AS $$
+    WITH results AS (
+        SELECT *
+        FROM jsonb_to_recordset(p_snapshots) AS r(
+            job_id BIGINT,
+            tracked_keyword_id UUID,
+            rank_position INTEGER,
+            total_results INTEGER,
+            visitor_count INTEGER,
+            blog_review_count INTEGER
+        )
+    ),
+    done AS (
+        UPDATE collection_jobs j
+        SET status = 'done', completed_at = now(), lease_token = NULL, last_error = NULL
+        FROM results r
+        WHERE j.id = r.job_id AND j.lease_token = p_lease_token AND j.status = 'leased'
+        RETURNING j.id
+    ),
+    serps AS (
+        INSERT INTO serp_snapshots (keyword, total_results, place_ids, visitor_counts, blog_review_counts)
+        SELECT s.keyword, s.total_results, s.place_ids, s.visitor_counts, s.blog_review_counts
+        FROM jsonb_to_recordset(p_serps) AS s(
+            job_ids BIGINT[],
+            keyword TEXT,
+            total_results INTEGER,
+            place_ids BIGINT[],
+            visitor_counts INTEGER[],
+            blog_review_counts INTEGER[]
+        )
+        WHERE s.job_ids && ARRAY(SELECT id FROM done)
+    )
+    INSERT INTO ranking_snapshots (tracked_keyword_id, rank_position, total_results, visitor_count, blog_review_count)
+    SELECT r.tracked_keyword_id, r.rank_position, r.total_results, r.visitor_count, r.blog_review_count
+    FROM results r
+    JOIN done d ON d.id = r.job_id
+    RETURNING *;
+$$;
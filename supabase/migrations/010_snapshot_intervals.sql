@@ -0,0 +1,373 @@
+-- ranking_snapshots 변경 감지 저장 (SNAPSHOT_STORAGE=intervals, 선택)
+-- 직전 스냅샷과 순위/결과 수/방문자/블로그 리뷰 수가 모두 같으면 새 행 대신 직전 행의 유효 구간을 연장.
+-- - collected_at = valid_from (파티션 키 유지), valid_to = 마지막 관측 시각, samples = 관측 횟수
+-- - observed_at = 실제 관측 시각 전체 (연장된 행만, samples = 1 이면 NULL)
+-- - 연장은 같은 날(Asia/Seoul) 안에서만 → 하루 최대 1행/키워드, 구간 길이 < 1일,
+--   보존 정책(월 파티션 삭제)과 충돌 없음
+-- - 읽기는 ranking_points 뷰가 구간을 실제 관측 지점으로 다시 펼침
+-- 기본(points) 모드의 쓰기는 기존과 동일 (samples = 1, valid_to = NULL).
+
+ALTER TABLE ranking_snapshots
+    ADD COLUMN valid_to TIMESTAMPTZ,
+    ADD COLUMN samples INTEGER NOT NULL DEFAULT 1,
+    ADD COLUMN observed_at TIMESTAMPTZ[];
+
+-- 구간 → 관측 지점. id 는 첫 지점이 원래 snapshot id, 이후 지점은 '<id>:<n>'.
+-- 조회 시 valid_from(= 원본 collected_at) 조건을 함께 걸어야 인덱스/파티션 범위가 한정됨.
+CREATE VIEW ranking_points AS
+SELECT
+    CASE WHEN o.i = 1 THEN s.id::text ELSE s.id::text || ':' || (o.i - 1) END AS id,
+    s.id AS snapshot_id,
+    s.tracked_keyword_id,
+    s.rank_position,
+    s.total_results,
+    s.visitor_count,
+    s.blog_review_count,
+    o.at AS collected_at,
+    s.collected_at AS valid_from,
+    coalesce(s.valid_to, s.collected_at) AS valid_to
+FROM ranking_snapshots s
+CROSS JOIN LATERAL unnest(coalesce(s.observed_at, ARRAY[s.collected_at])) WITH ORDINALITY AS o(at, i);
+
+-- 스냅샷 기록. p_extend_unchanged = true 면 변경 없는 키워드는 최신 행(keyword_latest_rank.snapshot_id)을 연장.
+-- p_rows: [{tracked_keyword_id, rank_position, total_results, visitor_count, blog_review_count}]
+CREATE FUNCTION record_snapshots(p_rows JSONB, p_extend_unchanged BOOLEAN DEFAULT false)
+RETURNS SETOF ranking_snapshots
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    today_start TIMESTAMPTZ := date_trunc('day', now() AT TIME ZONE 'Asia/Seoul') AT TIME ZONE 'Asia/Seoul';
+BEGIN
+    IF NOT p_extend_unchanged THEN
+        RETURN QUERY
+        INSERT INTO ranking_snapshots (tracked_keyword_id, rank_position, total_results, visitor_count, blog_review_count)
+        SELECT r.tracked_keyword_id, r.rank_position, r.total_results, r.visitor_count, r.blog_review_count
+        FROM jsonb_to_recordset(p_rows) AS r(
+            tracked_keyword_id UUID, rank_position INTEGER, total_results INTEGER,
+            visitor_count INTEGER, blog_review_count INTEGER
+        )
+        RETURNING *;
+        RETURN;
+    END IF;
+
+    RETURN QUERY
+    WITH incoming AS (
+        SELECT *
+        FROM jsonb_to_recordset(p_rows) AS r(
+            tracked_keyword_id UUID, rank_position INTEGER, total_results INTEGER,
+            visitor_count INTEGER, blog_review_count INTEGER
+        )
+    ),
+    extended AS (
+        UPDATE ranking_snapshots s
+        SET valid_to = now(),
+            samples = s.samples + 1,
+            observed_at = coalesce(s.observed_at, ARRAY[s.collected_at]) || now()
+        FROM incoming i
+        JOIN keyword_latest_rank l ON l.tracked_keyword_id = i.tracked_keyword_id
+        WHERE s.id = l.snapshot_id
+          AND s.collected_at >= today_start
+          AND s.tracked_keyword_id = i.tracked_keyword_id
+          AND s.rank_position IS NOT DISTINCT FROM i.rank_position
+          AND s.total_results IS NOT DISTINCT FROM i.total_results
+          AND s.visitor_count IS NOT DISTINCT FROM i.visitor_count
+          AND s.blog_review_count IS NOT DISTINCT FROM i.blog_review_count
+        RETURNING s.*
+    ),
+    inserted AS (
+        INSERT INTO ranking_snapshots (tracked_keyword_id, rank_position, total_results, visitor_count, blog_review_count)
+        SELECT i.tracked_keyword_id, i.rank_position, i.total_results, i.visitor_count, i.blog_review_count
+        FROM incoming i
+        WHERE NOT EXISTS (SELECT 1 FROM extended e WHERE e.tracked_keyword_id = i.tracked_keyword_id)
+        RETURNING *
+    )
+    SELECT * FROM extended
+    UNION ALL
+    SELECT * FROM inserted;
+END;
+$$;
+
+-- 구간 연장(UPDATE) 시 추가된 관측을 keyword_latest_rank / ranking_daily 에 반영.
+-- INSERT 트리거(migration 004, 005)와 같은 결과가 되도록 valid_to 시각의 관측으로 취급.
+CREATE FUNCTION apply_extended_snapshots() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE keyword_latest_rank l
+    SET collected_at = n.valid_to,
+        prev_rank_position = l.rank_position,
+        prev_collected_at = l.collected_at
+    FROM new_rows n
+    JOIN old_rows o ON o.id = n.id AND o.collected_at = n.collected_at
+    WHERE l.tracked_keyword_id = n.tracked_keyword_id
+      AND l.snapshot_id = n.id
+      AND n.samples > o.samples
+      AND n.valid_to >= l.collected_at;
+
+    INSERT INTO ranking_daily AS d (
+        tracked_keyword_id, day, samples, found, rank_sum, min_rank, max_rank,
+        last_visitor_count, last_blog_review_count, last_collected_at
+    )
+    SELECT
+        n.tracked_keyword_id,
+        (n.valid_to AT TIME ZONE 'Asia/Seoul')::date,
+        sum(n.samples - o.samples),
+        sum(CASE WHEN n.rank_position IS NULL THEN 0 ELSE n.samples - o.samples END),
+        coalesce(sum(n.rank_position::bigint * (n.samples - o.samples)), 0),
+        min(n.rank_position),
+        max(n.rank_position),
+        (array_agg(n.visitor_count ORDER BY n.valid_to DESC))[1],
+        (array_agg(n.blog_review_count ORDER BY n.valid_to DESC))[1],
+        max(n.valid_to)
+    FROM new_rows n
+    JOIN old_rows o ON o.id = n.id AND o.collected_at = n.collected_at
+    WHERE n.samples > o.samples
+    GROUP BY 1, 2
+    ON CONFLICT (tracked_keyword_id, day) DO UPDATE SET
+        samples = d.samples + EXCLUDED.samples,
+        found = d.found + EXCLUDED.found,
+        rank_sum = d.rank_sum + EXCLUDED.rank_sum,
+        min_rank = LEAST(d.min_rank, EXCLUDED.min_rank),
+        max_rank = GREATEST(d.max_rank, EXCLUDED.max_rank),
+        last_visitor_count = CASE WHEN EXCLUDED.last_collected_at >= d.last_collected_at
+            THEN EXCLUDED.last_visitor_count ELSE d.last_visitor_count END,
+        last_blog_review_count = CASE WHEN EXCLUDED.last_collected_at >= d.last_collected_at
+            THEN EXCLUDED.last_blog_review_count ELSE d.last_blog_review_count END,
+        last_collected_at = GREATEST(d.last_collected_at, EXCLUDED.last_collected_at);
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER trg_snapshots_extended
+    AFTER UPDATE ON ranking_snapshots
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION apply_extended_snapshots();
+
+-- 재구성 함수들은 펼친 관측 지점 기준으로 집계
+CREATE OR REPLACE FUNCTION rebuild_ranking_daily() RETURNS integer
+LANGUAGE plpgsql AS $$
+DECLARE
+    first_day DATE;
+    n integer;
+BEGIN
+    SELECT (min(collected_at) AT TIME ZONE 'Asia/Seoul')::date INTO first_day FROM ranking_snapshots;
+    IF first_day IS NULL THEN
+        RETURN 0;
+    END IF;
+
+    DELETE FROM ranking_daily WHERE day >= first_day;
+
+    INSERT INTO ranking_daily (
+        tracked_keyword_id, day, samples, found, rank_sum, min_rank, max_rank,
+        last_visitor_count, last_blog_review_count, last_collected_at
+    )
+    SELECT
+        p.tracked_keyword_id,
+        (p.collected_at AT TIME ZONE 'Asia/Seoul')::date,
+        count(*),
+        count(p.rank_position),
+        coalesce(sum(p.rank_position), 0),
+        min(p.rank_position),
+        max(p.rank_position),
+        (array_agg(p.visitor_count ORDER BY p.collected_at DESC))[1],
+        (array_agg(p.blog_review_count ORDER BY p.collected_at DESC))[1],
+        max(p.collected_at)
+    FROM ranking_points p
+    GROUP BY 1, 2;
+
+    GET DIAGNOSTICS n = ROW_COUNT;
+    RETURN n;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION rebuild_keyword_latest_rank() RETURNS integer
+LANGUAGE plpgsql AS $$
+DECLARE
+    n integer;
+BEGIN
+    WITH ranked AS (
+        SELECT p.*, row_number() OVER (
+            PARTITION BY p.tracked_keyword_id ORDER BY p.collected_at DESC
+        ) AS rn
+        FROM ranking_points p
+    )
+    INSERT INTO keyword_latest_rank AS r (
+        tracked_keyword_id, snapshot_id, rank_position, total_results,
+        visitor_count, blog_review_count, collected_at,
+        prev_rank_position, prev_collected_at
+    )
+    SELECT
+        l.tracked_keyword_id, l.snapshot_id, l.rank_position, l.total_results,
+        l.visitor_count, l.blog_review_count, l.collected_at,
+        p.rank_position, p.collected_at
+    FROM ranked l
+    LEFT JOIN ranked p ON p.tracked_keyword_id = l.tracked_keyword_id AND p.rn = 2
+    WHERE l.rn = 1
+    ON CONFLICT (tracked_keyword_id) DO UPDATE SET
+        snapshot_id = EXCLUDED.snapshot_id,
+        rank_position = EXCLUDED.rank_position,
+        total_results = EXCLUDED.total_results,
+        visitor_count = EXCLUDED.visitor_count,
+        blog_review_count = EXCLUDED.blog_review_count,
+        collected_at = EXCLUDED.collected_at,
+        prev_rank_position = EXCLUDED.prev_rank_position,
+        prev_collected_at = EXCLUDED.prev_collected_at;
+
+    GET DIAGNOSTICS n = ROW_COUNT;
+    RETURN n;
+END;
+$$;
+
+-- 이력 조회도 펼친 지점 기준. 구간 길이 < 1일 이므로 valid_from > p_from - 1일 조건으로
+-- (tracked_keyword_id, collected_at) 인덱스와 파티션 범위를 한정.
+CREATE OR REPLACE FUNCTION ranking_history(
+    p_keyword_id UUID,
+    p_from TIMESTAMPTZ DEFAULT NULL,
+    p_to TIMESTAMPTZ DEFAULT NULL
+) RETURNS TABLE (
+    id TEXT,
+    tracked_keyword_id UUID,
+    rank_position INTEGER,
+    total_results INTEGER,
+    visitor_count INTEGER,
+    blog_review_count INTEGER,
+    collected_at TIMESTAMPTZ
+)
+LANGUAGE sql STABLE AS $$
+    WITH horizon AS (
+        SELECT min(s.collected_at) AS raw_since
+        FROM ranking_snapshots s
+        WHERE s.tracked_keyword_id = p_keyword_id
+    )
+    SELECT p.id, p.tracked_keyword_id, p.rank_position, p.total_results,
+           p.visitor_count, p.blog_review_count, p.collected_at
+    FROM ranking_points p
+    WHERE p.tracked_keyword_id = p_keyword_id
+      AND (p_from IS NULL OR (p.valid_from > p_from - interval '1 day' AND p.collected_at >= p_from))
+      AND (p_to IS NULL OR (p.valid_from <= p_to AND p.collected_at <= p_to))
+
+    UNION ALL
+
+    SELECT 'daily:' || d.day, d.tracked_keyword_id,
+           round(d.rank_sum::numeric / nullif(d.found, 0))::int, NULL,
+           d.last_visitor_count, d.last_blog_review_count, d.last_collected_at
+    FROM ranking_daily d, horizon h
+    WHERE d.tracked_keyword_id = p_keyword_id
+      AND (h.raw_since IS NULL OR d.last_collected_at < h.raw_since)
+      AND (p_from IS NULL OR d.last_collected_at >= p_from)
+      AND (p_to IS NULL OR d.last_collected_at <= p_to)
+
+    ORDER BY collected_at DESC;
+$$;
+
+CREATE OR REPLACE FUNCTION ranking_series(
+    p_keyword_id UUID,
+    p_resolution TEXT,
+    p_from DATE DEFAULT NULL,
+    p_to DATE DEFAULT NULL
+) RETURNS TABLE (
+    bucket TIMESTAMPTZ,
+    samples BIGINT,
+    min_rank INTEGER,
+    max_rank INTEGER,
+    avg_rank NUMERIC,
+    not_found_ratio NUMERIC,
+    visitor_count INTEGER,
+    blog_review_count INTEGER,
+    collected_at TIMESTAMPTZ
+)
+LANGUAGE sql STABLE AS $$
+    SELECT
+        date_trunc('hour', p.collected_at),
+        count(*),
+        min(p.rank_position),
+        max(p.rank_position),
+        round(avg(p.rank_position), 2),
+        round(1 - count(p.rank_position)::numeric / count(*), 4),
+        (array_agg(p.visitor_count ORDER BY p.collected_at DESC))[1],
+        (array_agg(p.blog_review_count ORDER BY p.collected_at DESC))[1],
+        max(p.collected_at)
+    FROM ranking_points p
+    WHERE p_resolution = 'hour'
+      AND p.tracked_keyword_id = p_keyword_id
+      AND (p_from IS NULL OR (p.valid_from > (p_from - 1)::timestamp AT TIME ZONE 'Asia/Seoul'
+                              AND p.collected_at >= p_from::timestamp AT TIME ZONE 'Asia/Seoul'))
+      AND (p_to IS NULL OR (p.valid_from < (p_to + 1)::timestamp AT TIME ZONE 'Asia/Seoul'
+                            AND p.collected_at < (p_to + 1)::timestamp AT TIME ZONE 'Asia/Seoul'))
+    GROUP BY 1
+
+    UNION ALL
+
+    SELECT
+        date_trunc(p_resolution, d.day::timestamp) AT TIME ZONE 'Asia/Seoul',
+        sum(d.samples),
+        min(d.min_rank),
+        max(d.max_rank),
+        round(sum(d.rank_sum)::numeric / nullif(sum(d.found), 0), 2),
+        round(1 - sum(d.found)::numeric / sum(d.samples), 4),
+        (array_agg(d.last_visitor_count ORDER BY d.last_collected_at DESC))[1],
+        (array_agg(d.last_blog_review_count ORDER BY d.last_collected_at DESC))[1],
+        max(d.last_collected_at)
+    FROM ranking_daily d
+    WHERE p_resolution IN ('day', 'week')
+      AND d.tracked_keyword_id = p_keyword_id
+      AND (p_from IS NULL OR d.day >= p_from)
+      AND (p_to IS NULL OR d.day <= p_to)
+    GROUP BY 1
+
+    ORDER BY 1 DESC;
+$$;
+
+-- 워커 작업 완료도 record_snapshots 를 거치도록 교체 (migration 009)
+DROP FUNCTION complete_collection_jobs(UUID, JSONB, JSONB);
+
+CREATE FUNCTION complete_collection_jobs(
+    p_lease_token UUID,
+    p_snapshots JSONB,
+    p_serps JSONB DEFAULT '[]',
+    p_extend_unchanged BOOLEAN DEFAULT false
+)
+RETURNS SETOF ranking_snapshots
+LANGUAGE sql
+AS $$
+    WITH results AS (
+        SELECT *
+        FROM jsonb_to_recordset(p_snapshots) AS r(
+            job_id BIGINT,
+            tracked_keyword_id UUID,
+            rank_position INTEGER,
+            total_results INTEGER,
+            visitor_count INTEGER,
+            blog_review_count INTEGER
+        )
+    ),
+    done AS (
+        UPDATE collection_jobs j
+        SET status = 'done', completed_at = now(), lease_token = NULL, last_error = NULL
+        FROM results r
+        WHERE j.id = r.job_id AND j.lease_token = p_lease_token AND j.status = 'leased'
+        RETURNING j.id
+    ),
+    serps AS (
+        INSERT INTO serp_snapshots (keyword, total_results, place_ids, visitor_counts, blog_review_counts)
+        SELECT s.keyword, s.total_results, s.place_ids, s.visitor_counts, s.blog_review_counts
+        FROM jsonb_to_recordset(p_serps) AS s(
+            job_ids BIGINT[],
+            keyword TEXT,
+            total_results INTEGER,
+            place_ids BIGINT[],
+            visitor_counts INTEGER[],
+            blog_review_counts INTEGER[]
+        )
+        WHERE s.job_ids && ARRAY(SELECT id FROM done)
+    )
+    SELECT *
+    FROM record_snapshots(
+        (
+            SELECT coalesce(jsonb_agg(to_jsonb(r) - 'job_id'), '[]'::jsonb)
+            FROM results r
+            JOIN done d ON d.id = r.job_id
+        ),
+        p_extend_unchanged
+    );
+$$;
@@ -0,0 +1,113 @@
+-- 보관된 pcmap 페이지 재파싱 결과 반영 (python -m app.cli reparse-archive)
+-- p_rows: [{tracked_keyword_id, rank_position, total_results, visitor_count, blog_review_count, collected_at}]
+-- 각 행은 보관 페이지의 수집 시각 기준 ±p_window_seconds (미포함) 구간의 관측 지점과 대응.
+-- - 기본: 대응하는 관측이 없는 행만 INSERT (누락 구간 채우기)
+-- - p_replace: 구간 안의 기존 관측을 지운 뒤 INSERT. 모든 관측이 구간 안인 스냅샷만 삭제하고,
+--   일부만 겹치는 intervals 모드의 연장 행은 observed_at 에서 해당 관측만 빼고
+--   collected_at / valid_to / samples 를 다시 계산 (행 유지)
+--   삭제/축소는 ranking_daily / keyword_latest_rank 에 반영되지 않으므로 호출 후 rebuild_* 실행 필요.
+-- 원본 보존 범위(남아 있는 가장 오래된 월 파티션) 이전의 행은 건너뜀: 해당 기간은 ranking_daily
+-- 집계로만 남아 있어, 원본을 다시 넣으면 rebuild_ranking_daily 가 집계를 덮어씀.
+-- 범위 안이지만 파티션이 없는 달은 먼저 생성 (migration 006 에 DEFAULT 파티션 없음).
+CREATE FUNCTION reparse_snapshots(
+    p_rows JSONB,
+    p_window_seconds INTEGER,
+    p_replace BOOLEAN DEFAULT false
+) RETURNS TABLE (deleted INTEGER, inserted INTEGER, skipped INTEGER)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    w INTERVAL := make_interval(secs => p_window_seconds);
+    raw_since TIMESTAMPTZ;
+    m DATE;
+    n_deleted INTEGER := 0;
+    n_inserted INTEGER;
+    n_skipped INTEGER;
+BEGIN
+    SELECT min(to_date(substring(c.relname from 'y(\d{4}m\d{2})$'), 'YYYY"m"MM'))::timestamp AT TIME ZONE 'UTC'
+    INTO raw_since
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = 'ranking_snapshots'::regclass
+      AND c.relname ~ '^ranking_snapshots_y\d{4}m\d{2}$';
+
+    CREATE TEMP TABLE reparse_rows AS
+    SELECT *
+    FROM jsonb_to_recordset(p_rows) AS r(
+        tracked_keyword_id UUID, rank_position INTEGER, total_results INTEGER,
+        visitor_count INTEGER, blog_review_count INTEGER, collected_at TIMESTAMPTZ
+    );
+
+    DELETE FROM reparse_rows r WHERE raw_since IS NULL OR r.collected_at < raw_since;
+    GET DIAGNOSTICS n_skipped = ROW_COUNT;
+
+    FOR m IN
+        SELECT DISTINCT date_trunc('month', r.collected_at AT TIME ZONE 'UTC')::date FROM reparse_rows r
+    LOOP
+        PERFORM create_snapshot_partition(m);
+    END LOOP;
+
+    IF p_replace THEN
+        -- 구간은 하루를 넘지 않으므로 (migration 010) collected_at 하한으로 인덱스 범위 한정
+        WITH hit AS (
+            SELECT s.id, s.collected_at, s.samples,
+                   ARRAY(
+                       SELECT o.at
+                       FROM unnest(coalesce(s.observed_at, ARRAY[s.collected_at])) AS o(at)
+                       WHERE NOT EXISTS (
+                           SELECT 1 FROM reparse_rows r
+                           WHERE r.tracked_keyword_id = s.tracked_keyword_id
+                             AND o.at > r.collected_at - w
+                             AND o.at < r.collected_at + w
+                       )
+                       ORDER BY o.at
+                   ) AS kept
+            FROM ranking_snapshots s
+            WHERE EXISTS (
+                SELECT 1 FROM reparse_rows r
+                WHERE r.tracked_keyword_id = s.tracked_keyword_id
+                  AND s.collected_at > r.collected_at - w - interval '1 day'
+                  AND s.collected_at < r.collected_at + w
+                  AND coalesce(s.valid_to, s.collected_at) > r.collected_at - w
+            )
+        ),
+        removed AS (
+            DELETE FROM ranking_snapshots s
+            USING hit h
+            WHERE s.id = h.id AND s.collected_at = h.collected_at AND cardinality(h.kept) = 0
+            RETURNING h.samples AS n
+        ),
+        truncated AS (
+            UPDATE ranking_snapshots s
+            SET collected_at = h.kept[1],
+                valid_to = CASE WHEN cardinality(h.kept) > 1 THEN h.kept[cardinality(h.kept)] END,
+                samples = cardinality(h.kept),
+                observed_at = CASE WHEN cardinality(h.kept) > 1 THEN h.kept END
+            FROM hit h
+            WHERE s.id = h.id AND s.collected_at = h.collected_at
+              AND cardinality(h.kept) BETWEEN 1 AND h.samples - 1
+            RETURNING h.samples - cardinality(h.kept) AS n
+        )
+        SELECT coalesce((SELECT sum(n) FROM removed), 0) + coalesce((SELECT sum(n) FROM truncated), 0)
+        INTO n_deleted;
+    END IF;
+
+    INSERT INTO ranking_snapshots (
+        tracked_keyword_id, rank_position, total_results, visitor_count, blog_review_count, collected_at
+    )
+    SELECT r.tracked_keyword_id, r.rank_position, r.total_results, r.visitor_count, r.blog_review_count, r.collected_at
+    FROM reparse_rows r
+    WHERE NOT EXISTS (
+        SELECT 1
+        FROM ranking_points p
+        WHERE p.tracked_keyword_id = r.tracked_keyword_id
+          AND p.valid_from > r.collected_at - w - interval '1 day'
+          AND p.collected_at > r.collected_at - w
+          AND p.collected_at < r.collected_at + w
+    );
+    GET DIAGNOSTICS n_inserted = ROW_COUNT;
+
+    DROP TABLE reparse_rows;
+    RETURN QUERY SELECT n_deleted, n_inserted, n_skipped;
+END;
+$$;
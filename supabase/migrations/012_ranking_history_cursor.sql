@@ -0,0 +1,83 @@
+-- ranking_history 키셋 페이지네이션을 함수 안으로 (get_rankings / CSV 내보내기)
+-- p_before_at / p_before_id: 이전 페이지 마지막 행 (collected_at DESC, id DESC 순서에서 그 다음 행부터)
+-- p_limit: 페이지 크기 (NULL = 전체)
+-- 결과에 PostgREST 필터를 거는 방식은 함수가 전체 이력을 만든 뒤 걸러서, 페이지마다 전 구간을 읽었음.
+-- 원본 스냅샷에서 커서 이전 p_limit 번째 행의 시작 시각(page_floor)을 인덱스로 먼저 찾고,
+-- 그 이후 지점만 펼쳐 정렬 → 페이지당 읽는 양이 페이지 크기 수준.
+-- (그 행들의 첫 관측만으로 한 페이지가 채워지고, 구간은 하루를 넘지 않음 - migration 010)
+DROP FUNCTION ranking_history(UUID, TIMESTAMPTZ, TIMESTAMPTZ);
+
+CREATE FUNCTION ranking_history(
+    p_keyword_id UUID,
+    p_from TIMESTAMPTZ DEFAULT NULL,
+    p_to TIMESTAMPTZ DEFAULT NULL,
+    p_before_at TIMESTAMPTZ DEFAULT NULL,
+    p_before_id TEXT DEFAULT NULL,
+    p_limit INTEGER DEFAULT NULL
+) RETURNS TABLE (
+    id TEXT,
+    tracked_keyword_id UUID,
+    rank_position INTEGER,
+    total_results INTEGER,
+    visitor_count INTEGER,
+    blog_review_count INTEGER,
+    collected_at TIMESTAMPTZ
+)
+LANGUAGE sql STABLE AS $$
+    WITH horizon AS (
+        SELECT min(s.collected_at) AS raw_since
+        FROM ranking_snapshots s
+        WHERE s.tracked_keyword_id = p_keyword_id
+    ),
+    page_floor AS (
+        -- 한 페이지가 안 되면 하한 없음
+        SELECT coalesce(CASE WHEN count(*) = p_limit THEN min(f.collected_at) END, '-infinity') AS since
+        FROM (
+            SELECT s.collected_at
+            FROM ranking_snapshots s
+            WHERE s.tracked_keyword_id = p_keyword_id
+              AND (p_from IS NULL OR s.collected_at >= p_from)
+              AND (p_to IS NULL OR s.collected_at <= p_to)
+              AND (p_before_at IS NULL OR s.collected_at < p_before_at)
+            ORDER BY s.collected_at DESC
+            LIMIT p_limit
+        ) f
+    ),
+    raw AS (
+        SELECT p.id, p.tracked_keyword_id, p.rank_position, p.total_results,
+               p.visitor_count, p.blog_review_count, p.collected_at
+        FROM ranking_points p, page_floor f
+        WHERE p.tracked_keyword_id = p_keyword_id
+          AND p.valid_from > f.since - interval '1 day'
+          AND p.collected_at >= f.since
+          AND (p_from IS NULL OR (p.valid_from > p_from - interval '1 day' AND p.collected_at >= p_from))
+          AND (p_to IS NULL OR (p.valid_from <= p_to AND p.collected_at <= p_to))
+          AND (p_before_at IS NULL OR (
+                p.valid_from <= p_before_at
+                AND (p.collected_at < p_before_at OR (p.collected_at = p_before_at AND p.id < p_before_id))
+          ))
+        ORDER BY p.collected_at DESC, p.id DESC
+        LIMIT p_limit
+    ),
+    daily AS (
+        SELECT 'daily:' || d.day AS id, d.tracked_keyword_id,
+               round(d.rank_sum::numeric / nullif(d.found, 0))::int AS rank_position, NULL::int AS total_results,
+               d.last_visitor_count, d.last_blog_review_count, d.last_collected_at
+        FROM ranking_daily d, horizon h
+        WHERE d.tracked_keyword_id = p_keyword_id
+          AND (h.raw_since IS NULL OR d.last_collected_at < h.raw_since)
+          AND (p_from IS NULL OR d.last_collected_at >= p_from)
+          AND (p_to IS NULL OR d.last_collected_at <= p_to)
+          AND (p_before_at IS NULL OR d.last_collected_at < p_before_at
+               OR (d.last_collected_at = p_before_at AND 'daily:' || d.day < p_before_id))
+        ORDER BY d.last_collected_at DESC, 1 DESC
+        LIMIT p_limit
+    )
+    SELECT * FROM (
+        SELECT * FROM raw
+        UNION ALL
+        SELECT * FROM daily
+    ) h
+    ORDER BY h.collected_at DESC, h.id DESC
+    LIMIT p_limit;
+$$;
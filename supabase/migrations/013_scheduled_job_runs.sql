@@ -0,0 +1,29 @@
+-- 유지보수 작업(파티션 관리, 매장 정보 갱신) 실행권: 예정 시각마다 한 프로세스만 실행
+-- 여러 API 프로세스가 같은 cron 스케줄로 동시에 깨어나도 (job, fire_time) 를 먼저 넣은 쪽만 실행.
+-- 수집 작업의 collection_jobs (tracked_keyword_id, slot_at) 유일성과 같은 방식 (migration 008).
+CREATE TABLE scheduled_job_runs (
+    job TEXT NOT NULL,
+    fire_time TIMESTAMPTZ NOT NULL,
+    claimed_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (job, fire_time)
+);
+
+-- 실행권을 얻으면 true. 같은 작업의 7일 지난 기록은 함께 정리.
+CREATE FUNCTION claim_scheduled_run(p_job TEXT, p_fire_time TIMESTAMPTZ)
+RETURNS boolean
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    claimed INTEGER;
+BEGIN
+    INSERT INTO scheduled_job_runs (job, fire_time)
+    VALUES (p_job, p_fire_time)
+    ON CONFLICT (job, fire_time) DO NOTHING;
+    GET DIAGNOSTICS claimed = ROW_COUNT;
+
+    DELETE FROM scheduled_job_runs
+    WHERE job = p_job AND fire_time < p_fire_time - interval '7 days';
+
+    RETURN claimed > 0;
+END;
+$$;